@@ -0,0 +1,258 @@
+"""
+[파일 경로] config/media_views.py
+[설명]
+앱 서버가 직접 미디어를 내보낼 때(로컬 개발 media 폴더, OCI 로컬 대역) 쓰는 뷰입니다.
+django.conf.urls.static 대신 사용하며, SERVE_MEDIA 설정이 켜져 있고 MEDIA_URL이 '/media/'처럼 이 앱 주소일 때만 등록됩니다.
+(운영 서버의 MEDIA_URL은 OCI 공개 버킷 주소라 브라우저가 OCI에서 바로 받음)
+1. Range 요청(bytes=a-b) -> 206 부분 응답 (영상 탐색, 이어받기)
+2. ETag / Last-Modified 조건부 요청 -> 304 (다시 불러올 때 본문 전송 없음)
+3. 내용 해시가 이름에 들어간 파생본(derivatives/)과 영상 포스터(posters/)는 1년 immutable 캐시, 나머지는 매번 재검증
+4. FileSystemStorage:
+   - 전체 응답은 FileResponse (gunicorn의 wsgi.file_wrapper -> sendfile, 사용자 공간 복사 없음)
+   - MEDIA_ACCEL_REDIRECT를 지정하면 X-Accel-Redirect로 nginx에 넘김 (Range도 nginx가 처리)
+5. OCIStorage: 객체를 청크 단위로 중계 (Range는 OCI에 그대로 전달, 메모리에 모으지 않음)
+   조건부 요청은 HEAD만 보내 확인하므로 304 응답에는 본문 GET이 없습니다.
+원본 보관 경로(originals/)는 관리자 전용이라 스태프만 받을 수 있습니다.
+"""
+import os
+import re
+import mimetypes
+import posixpath
+import oci
+from django.conf import settings
+from django.core.files.storage import default_storage, FileSystemStorage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse, Http404
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+CHUNK_SIZE = 256 * 1024
+
+# OCI에 그대로 넘길 수 있는 단일 구간 Range (여러 구간/잘못된 값은 전체 응답)
+SINGLE_RANGE_RE = re.compile(r'^bytes=(\d+-\d*|-\d+)$')
+
+# 내용 해시가 파일 이름에 들어가는 폴더 (내용이 바뀌면 이름도 바뀜 -> 장기 캐시 가능)
+IMMUTABLE_DIRS = ('derivatives', 'posters')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'  # 캐시는 하되 매번 ETag로 확인 (바뀌지 않았으면 304)
+
+
+def _cache_control(name):
+    return IMMUTABLE_CACHE_CONTROL if set(name.split('/')[:-1]) & set(IMMUTABLE_DIRS) else REVALIDATE_CACHE_CONTROL
+
+
+def _is_private(request, name):
+    """관리자 전용 원본(media_posts/originals/)은 스태프가 아니면 없는 파일처럼 처리"""
+    if 'originals' not in name.split('/')[:-1]:
+        return False
+    user = getattr(request, 'user', None)
+    return not (user is not None and user.is_authenticated and user.is_staff)
+
+
+def _parse_range(header, size):
+    """
+    Range 헤더 -> (start, end) 양끝 포함 구간
+
+    Returns:
+    --------
+    None
+        Range가 없거나 해석할 수 없음/여러 구간 (전체 응답으로 처리 - RFC 9110 허용)
+    'unsatisfiable'
+        파일 크기를 벗어난 구간 (416)
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    first, sep, last = header[len('bytes='):].strip().partition('-')
+    if not sep:
+        return None
+    try:
+        if first == '':
+            if not last or int(last) == 0:
+                return 'unsatisfiable'
+            start, end = max(0, size - int(last)), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if int(first) < 0 or (last and int(last) < start):
+                return None
+    except ValueError:
+        return None
+    if start >= size:
+        return 'unsatisfiable'
+    return start, end
+
+
+def _if_range_ok(request, etag, last_modified):
+    """If-Range가 없거나 현재 버전과 같으면 Range 적용, 다르면 전체를 새로 보냄"""
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if value.startswith('"') or value.startswith('W/'):
+        return value == etag  # 강한 비교 (약한 ETag는 Range에 쓸 수 없음)
+    return last_modified is not None and parse_http_date_safe(value) == last_modified
+
+
+def _set_headers(response, etag, last_modified, content_type, cache_control):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = cache_control
+    if content_type:
+        response['Content-Type'] = content_type
+    return response
+
+
+def _unsatisfiable(size, etag, last_modified, cache_control):
+    response = HttpResponse(status=416)
+    response['Content-Range'] = f"bytes */{size}"
+    return _set_headers(response, etag, last_modified, None, cache_control)
+
+
+# ----------------------------
+# 💾 FileSystemStorage (로컬 media 폴더)
+# ----------------------------
+def _file_slice(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _serve_file(request, storage, name, cache_control):
+    try:
+        path = safe_join(storage.location, name)
+    except Exception:
+        raise Http404
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(path):
+        raise Http404
+
+    size = stat.st_size
+    etag = quote_etag(f"{stat.st_mtime_ns:x}-{size:x}")
+    last_modified = int(stat.st_mtime)
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        return _set_headers(conditional, etag, last_modified, None, cache_control)
+
+    accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT', '')
+    if accel_prefix:
+        # nginx internal location이 Range/sendfile을 처리 (앱 워커는 헤더만 돌려줌)
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + name
+        return _set_headers(response, etag, last_modified, content_type, cache_control)
+
+    byte_range = _parse_range(request.headers.get('Range'), size) if _if_range_ok(request, etag, last_modified) else None
+    if byte_range == 'unsatisfiable':
+        return _unsatisfiable(size, etag, last_modified, cache_control)
+
+    if request.method == 'HEAD':
+        response = HttpResponse()
+        response['Content-Length'] = str(size)
+    elif byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(_file_slice(path, start, end - start + 1), status=206)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+    else:
+        response = FileResponse(open(path, 'rb'))
+    return _set_headers(response, etag, last_modified, content_type, cache_control)
+
+
+# ----------------------------
+# ☁️ OCIStorage (OCI / 로컬 대역) 중계
+# ----------------------------
+def _close(data):
+    close = getattr(data, 'close', None)
+    if close:
+        close()
+
+
+def _stream_body(data):
+    """OCI 응답 본문을 청크 단위로 전달하고 끝나면(중간에 끊겨도) 연결 반납"""
+    try:
+        yield from data.raw.stream(CHUNK_SIZE, decode_content=False)
+    finally:
+        _close(data)
+
+
+def _serve_object(request, storage, name, cache_control):
+    range_header = (request.headers.get('Range') or '').replace(' ', '')
+    if not SINGLE_RANGE_RE.match(range_header):
+        range_header = None
+    revalidating = request.headers.get('If-None-Match') or request.headers.get('If-Modified-Since')
+    try:
+        if request.method == 'HEAD' or revalidating:
+            # 메타데이터만으로 답할 수 있으면 본문을 받지 않음 (304는 HEAD 한 번으로 끝)
+            headers, status, data = storage.head(name), 200, None
+            if headers is None:
+                raise Http404
+            if request.method == 'GET' and get_conditional_response(
+                request, etag=quote_etag(headers['etag']),
+                last_modified=parse_http_date_safe(headers.get('last-modified', '')),
+            ) is None:
+                result = storage.open_stream(name, byte_range=range_header)
+                headers, status, data = result.headers, result.status, result.data
+        else:
+            result = storage.open_stream(name, byte_range=range_header)
+            headers, status, data = result.headers, result.status, result.data
+    except oci.exceptions.ServiceError as e:
+        if e.status == 404:
+            raise Http404
+        if e.status != 416:
+            raise
+        headers = storage.head(name)
+        if headers is None:
+            raise Http404
+        return _unsatisfiable(
+            headers['content-length'], quote_etag(headers['etag']),
+            parse_http_date_safe(headers.get('last-modified', '')), cache_control,
+        )
+
+    etag = quote_etag(headers['etag'])
+    last_modified = parse_http_date_safe(headers.get('last-modified', ''))
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        _close(data)
+        return _set_headers(conditional, etag, last_modified, None, cache_control)
+    if status == 206 and not _if_range_ok(request, etag, last_modified):
+        # 브라우저가 가진 버전과 달라졌으면 일부가 아니라 전체를 다시 보냄
+        _close(data)
+        result = storage.open_stream(name)
+        headers, status, data = result.headers, result.status, result.data
+
+    if data is None:
+        response = HttpResponse()
+    else:
+        response = StreamingHttpResponse(_stream_body(data), status=status)
+    response['Content-Length'] = headers['content-length']
+    if status == 206:
+        response['Content-Range'] = headers['content-range']
+    return _set_headers(response, etag, last_modified, headers.get('content-type'), cache_control)
+
+
+@require_safe
+def serve_media(request, path):
+    """MEDIA_URL 아래 파일 응답 (스토리지 종류에 따라 로컬 파일 / OCI 중계)"""
+    name = posixpath.normpath(path).lstrip('/')
+    if name.startswith('..') or name in ('', '.') or _is_private(request, name):
+        raise Http404
+    cache_control = _cache_control(name)
+
+    if isinstance(default_storage, FileSystemStorage):
+        return _serve_file(request, default_storage, name, cache_control)
+    if getattr(default_storage, 'object_storage', None) is not None:
+        return _serve_object(request, default_storage, name, cache_control)
+    raise Http404
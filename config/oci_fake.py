@@ -0,0 +1,440 @@
+"""
+[파일 경로] config/oci_fake.py
+[설명]
+OCI Object Storage 로컬 대역입니다. (ObjectStorageClient와 같은 메서드/응답 모양)
+settings.OCI_EMULATOR_ROOT를 지정하면 OCIStorage가 실제 OCI 대신 이 클라이언트를 사용합니다.
+- put/get/head/delete, 멀티파트(create/upload_part/commit/abort), list_objects를 로컬 디스크에 구현
+- Content-MD5 검증, ETag, Last-Modified, 404/412 등 실제 서비스와 같은 오류 코드
+- get_object의 range 지정(bytes=a-b) 지원 (206 응답)
+- 지연(latency ± jitter)과 오류율(503)을 주입해 느리거나 불안정한 스토리지를 흉내
+- 객체 쓰기용 사전 인증 요청(PAR) 발급/삭제, PAR URL로 올리기(put_object_with_par)
+  (브라우저가 PAR URL로 보내는 PUT은 config/oci_fake_views.py가 받아 여기로 전달)
+저장 구조:
+    <root>/<bucket>/<객체 이름>            객체 내용
+    <root>/.meta/<bucket>/<객체 이름>.json  content-type, md5, etag, 수정 시각
+    <root>/.uploads/<upload_id>/<파트 번호>  진행 중인 멀티파트 업로드
+    <root>/.par/<par_id>.json               발급된 PAR (버킷, 객체 이름, 만료 시각)
+"""
+import os
+import json
+import time
+import uuid
+import base64
+import random
+import shutil
+import hashlib
+import threading
+import tempfile
+from datetime import datetime, timezone
+from email.utils import formatdate
+import oci
+from oci.object_storage.models import MultipartUpload, ListObjects, ObjectSummary, PreauthenticatedRequest
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def _service_error(status, code, message):
+    return oci.exceptions.ServiceError(status, code, {}, message)
+
+
+class _Body:
+    """get_object 응답의 data (requests.Response와 비슷하게 content / iter_content / raw.stream 제공)"""
+
+    def __init__(self, path, start, length):
+        self._path = path
+        self._start = start
+        self._length = length
+        self.raw = self
+
+    def stream(self, chunk_size=CHUNK_SIZE, decode_content=True):
+        with open(self._path, 'rb') as f:
+            f.seek(self._start)
+            remaining = self._length
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def iter_content(self, chunk_size=CHUNK_SIZE):
+        return self.stream(chunk_size)
+
+    @property
+    def content(self):
+        return b''.join(self.stream())
+
+
+def _parse_range(value, size):
+    """'bytes=a-b' / 'bytes=a-' / 'bytes=-n' -> (start, end) 포함 구간. 범위를 벗어나면 416"""
+    try:
+        unit, spec = value.split('=', 1)
+        first, last = spec.split('-', 1)
+        if unit.strip() != 'bytes' or ',' in spec:
+            raise ValueError
+        if first == '':
+            start, end = max(0, size - int(last)), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        raise _service_error(400, 'InvalidRange', f"잘못된 Range 값입니다: {value}")
+    if start >= size or start > end:
+        raise _service_error(416, 'InvalidRange', f"요청 범위가 객체 크기({size})를 벗어났습니다.")
+    return start, end
+
+
+class FakeObjectStorageClient:
+    """
+    로컬 디스크 기반 ObjectStorageClient 대역
+
+    Parameters:
+    -----------
+    root : str
+        저장 폴더
+    latency_ms, jitter_ms : int
+        호출마다 latency_ms ± jitter_ms 만큼 대기
+    error_rate : float
+        0~1, 이 확률로 503 ServiceUnavailable 발생
+    error_operations : iterable
+        오류를 주입할 메서드 이름 (비우면 전체)
+    """
+
+    def __init__(self, root, latency_ms=0, jitter_ms=0, error_rate=0.0, error_operations=(), seed=None):
+        self.root = str(root)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_operations = set(error_operations)
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    # ----------------------------
+    # 🧪 지연 / 오류 주입
+    # ----------------------------
+    def _inject(self, operation):
+        with self._random_lock:
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self.error_rate and self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if fail and (not self.error_operations or operation in self.error_operations):
+            raise _service_error(503, 'ServiceUnavailable', f"[emulator] {operation} 오류 주입")
+
+    # ----------------------------
+    # 📁 경로 / 메타데이터
+    # ----------------------------
+    def _object_path(self, bucket_name, object_name):
+        path = os.path.normpath(os.path.join(self.root, bucket_name, object_name))
+        if not path.startswith(os.path.join(os.path.normpath(self.root), bucket_name) + os.sep):
+            raise _service_error(400, 'InvalidObjectName', f"허용되지 않는 객체 이름입니다: {object_name}")
+        return path
+
+    def _meta_path(self, bucket_name, object_name):
+        return os.path.join(self.root, '.meta', bucket_name, f"{object_name}.json")
+
+    def _upload_dir(self, upload_id):
+        return os.path.join(self.root, '.uploads', upload_id)
+
+    def _read_meta(self, bucket_name, object_name):
+        path = self._object_path(bucket_name, object_name)
+        if not os.path.isfile(path):
+            raise _service_error(404, 'ObjectNotFound', f"객체가 없습니다: {object_name}")
+        try:
+            with open(self._meta_path(bucket_name, object_name), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        stat = os.stat(path)
+        meta.setdefault('content_type', 'application/octet-stream')
+        meta.setdefault('etag', f"{stat.st_mtime_ns:x}")
+        meta['size'] = stat.st_size
+        meta['mtime'] = stat.st_mtime
+        return path, meta
+
+    def _headers(self, meta):
+        headers = {
+            'content-length': str(meta['size']),
+            'content-type': meta['content_type'],
+            'etag': meta['etag'],
+            'last-modified': formatdate(meta['mtime'], usegmt=True),
+            'accept-ranges': 'bytes',
+        }
+        if meta.get('md5'):
+            headers['opc-content-md5'] = meta['md5']
+        if meta.get('multipart_md5'):
+            headers['opc-multipart-md5'] = meta['multipart_md5']
+        return headers
+
+    def _write_object(self, bucket_name, object_name, source_path, content_type, md5, multipart_md5=None):
+        """임시 파일 -> 객체 경로로 교체 (읽는 쪽이 중간 상태를 보지 않도록)"""
+        path = self._object_path(bucket_name, object_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+
+        meta = {'content_type': content_type or 'application/octet-stream', 'etag': uuid.uuid4().hex}
+        if md5:
+            meta['md5'] = md5
+        if multipart_md5:
+            meta['multipart_md5'] = multipart_md5
+        meta_path = self._meta_path(bucket_name, object_name)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        with open(f"{meta_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+        return self._read_meta(bucket_name, object_name)[1]
+
+    def _spool(self, body):
+        """요청 본문(bytes/str/파일 객체) -> 임시 파일 (경로, 크기, md5 base64)"""
+        digest = hashlib.md5()
+        size = 0
+        os.makedirs(os.path.join(self.root, '.tmp'), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.root, '.tmp'))
+        with os.fdopen(fd, 'wb') as out:
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            if isinstance(body, (bytes, bytearray)):
+                chunks = [bytes(body)]
+            else:
+                chunks = iter(lambda: body.read(CHUNK_SIZE), b'')
+            for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                out.write(chunk)
+        return tmp_path, size, base64.b64encode(digest.digest()).decode('ascii')
+
+    def _check_preconditions(self, bucket_name, object_name, if_match=None, if_none_match=None):
+        exists = os.path.isfile(self._object_path(bucket_name, object_name))
+        if if_none_match == '*' and exists:
+            raise _service_error(412, 'IfNoneMatchFailed', f"이미 있는 객체입니다: {object_name}")
+        if if_match:
+            if not exists or self._read_meta(bucket_name, object_name)[1]['etag'] != if_match:
+                raise _service_error(412, 'IfMatchFailed', f"ETag가 일치하지 않습니다: {object_name}")
+
+    # ----------------------------
+    # 📦 객체 API
+    # ----------------------------
+    def put_object(self, namespace_name, bucket_name, object_name, put_object_body, **kwargs):
+        self._inject('put_object')
+        self._check_preconditions(bucket_name, object_name, kwargs.get('if_match'), kwargs.get('if_none_match'))
+        tmp_path, size, md5 = self._spool(put_object_body)
+        try:
+            if kwargs.get('content_md5') and kwargs['content_md5'] != md5:
+                raise _service_error(400, 'InvalidDigest', "Content-MD5가 받은 내용과 다릅니다.")
+            if kwargs.get('content_length') is not None and int(kwargs['content_length']) != size:
+                raise _service_error(400, 'InvalidContentLength', "Content-Length가 받은 내용과 다릅니다.")
+            meta = self._write_object(bucket_name, object_name, tmp_path, kwargs.get('content_type'), md5)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return oci.response.Response(200, self._headers(meta), None, None)
+
+    def head_object(self, namespace_name, bucket_name, object_name, **kwargs):
+        self._inject('head_object')
+        _, meta = self._read_meta(bucket_name, object_name)
+        return oci.response.Response(200, self._headers(meta), None, None)
+
+    def get_object(self, namespace_name, bucket_name, object_name, **kwargs):
+        self._inject('get_object')
+        path, meta = self._read_meta(bucket_name, object_name)
+        headers = self._headers(meta)
+        if kwargs.get('if_none_match') and kwargs['if_none_match'] == meta['etag']:
+            return oci.response.Response(304, headers, None, None)
+
+        start, end, status = 0, meta['size'] - 1, 200
+        if kwargs.get('range') and meta['size']:
+            start, end = _parse_range(kwargs['range'], meta['size'])
+            status = 206
+            headers['content-range'] = f"bytes {start}-{end}/{meta['size']}"
+        length = max(0, end - start + 1)
+        headers['content-length'] = str(length)
+        return oci.response.Response(status, headers, _Body(path, start, length), None)
+
+    def delete_object(self, namespace_name, bucket_name, object_name, **kwargs):
+        self._inject('delete_object')
+        path, _ = self._read_meta(bucket_name, object_name)
+        os.remove(path)
+        try:
+            os.remove(self._meta_path(bucket_name, object_name))
+        except FileNotFoundError:
+            pass
+        return oci.response.Response(204, {}, None, None)
+
+    def list_objects(self, namespace_name, bucket_name, prefix=None, limit=1000, start=None, **kwargs):
+        self._inject('list_objects')
+        bucket_root = os.path.join(self.root, bucket_name)
+        names = []
+        for directory, _, files in os.walk(bucket_root):
+            for filename in files:
+                names.append(os.path.relpath(os.path.join(directory, filename), bucket_root).replace(os.sep, '/'))
+        names = sorted(n for n in names if (not prefix or n.startswith(prefix)) and (not start or n >= start))
+        page, rest = names[:limit], names[limit:]
+        objects = [
+            ObjectSummary(name=name, size=os.path.getsize(os.path.join(bucket_root, name)))
+            for name in page
+        ]
+        data = ListObjects(objects=objects, next_start_with=rest[0] if rest else None)
+        return oci.response.Response(200, {}, data, None)
+
+    # ----------------------------
+    # 🧩 멀티파트 업로드
+    # ----------------------------
+    def create_multipart_upload(self, namespace_name, bucket_name, create_multipart_upload_details, **kwargs):
+        self._inject('create_multipart_upload')
+        upload_id = uuid.uuid4().hex
+        upload_dir = self._upload_dir(upload_id)
+        os.makedirs(upload_dir)
+        info = {
+            'bucket': bucket_name,
+            'object': create_multipart_upload_details.object,
+            'content_type': create_multipart_upload_details.content_type,
+        }
+        with open(os.path.join(upload_dir, 'upload.json'), 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+        data = MultipartUpload(
+            namespace=namespace_name, bucket=bucket_name,
+            object=info['object'], upload_id=upload_id,
+        )
+        return oci.response.Response(200, {}, data, None)
+
+    def _upload_info(self, upload_id, object_name):
+        path = os.path.join(self._upload_dir(upload_id), 'upload.json')
+        if not os.path.isfile(path):
+            raise _service_error(404, 'NoSuchUpload', f"진행 중인 업로드가 없습니다: {upload_id}")
+        with open(path, encoding='utf-8') as f:
+            info = json.load(f)
+        if info['object'] != object_name:
+            raise _service_error(400, 'InvalidParameter', "업로드 id와 객체 이름이 맞지 않습니다.")
+        return info
+
+    def upload_part(self, namespace_name, bucket_name, object_name, upload_id, upload_part_num, upload_part_body, **kwargs):
+        self._inject('upload_part')
+        self._upload_info(upload_id, object_name)
+        if not 1 <= int(upload_part_num) <= 10000:
+            raise _service_error(400, 'InvalidParameter', f"파트 번호는 1~10000입니다: {upload_part_num}")
+        tmp_path, _, md5 = self._spool(upload_part_body)
+        if kwargs.get('content_md5') and kwargs['content_md5'] != md5:
+            os.remove(tmp_path)
+            raise _service_error(400, 'InvalidDigest', "파트의 Content-MD5가 받은 내용과 다릅니다.")
+        part_path = os.path.join(self._upload_dir(upload_id), str(int(upload_part_num)))
+        os.replace(tmp_path, part_path)
+        # 파트 ETag = 파트 내용의 md5 (commit 시 클라이언트가 보낸 값과 비교)
+        etag = base64.b64decode(md5).hex()
+        return oci.response.Response(200, {'etag': etag, 'opc-content-md5': md5}, None, None)
+
+    def commit_multipart_upload(self, namespace_name, bucket_name, object_name, upload_id,
+                                commit_multipart_upload_details, **kwargs):
+        self._inject('commit_multipart_upload')
+        info = self._upload_info(upload_id, object_name)
+        upload_dir = self._upload_dir(upload_id)
+        parts = sorted(commit_multipart_upload_details.parts_to_commit, key=lambda p: p.part_num)
+        if not parts:
+            raise _service_error(400, 'InvalidParameter', "커밋할 파트가 없습니다.")
+
+        part_digests = hashlib.md5()
+        fd, tmp_path = tempfile.mkstemp(dir=upload_dir)
+        with os.fdopen(fd, 'wb') as out:
+            for part in parts:
+                part_path = os.path.join(upload_dir, str(part.part_num))
+                if not os.path.isfile(part_path):
+                    raise _service_error(400, 'InvalidParameter', f"업로드되지 않은 파트입니다: {part.part_num}")
+                digest = hashlib.md5()
+                with open(part_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                        out.write(chunk)
+                if digest.hexdigest() != part.etag:
+                    raise _service_error(400, 'InvalidParameter', f"파트 {part.part_num}의 ETag가 다릅니다.")
+                part_digests.update(digest.digest())
+
+        # OCI와 같은 형식: md5(파트 md5들을 이어 붙인 값)-파트 수
+        multipart_md5 = f"{base64.b64encode(part_digests.digest()).decode('ascii')}-{len(parts)}"
+        meta = self._write_object(bucket_name, object_name, tmp_path, info['content_type'], None, multipart_md5)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        return oci.response.Response(200, self._headers(meta), None, None)
+
+    def abort_multipart_upload(self, namespace_name, bucket_name, object_name, upload_id, **kwargs):
+        self._inject('abort_multipart_upload')
+        self._upload_info(upload_id, object_name)
+        shutil.rmtree(self._upload_dir(upload_id), ignore_errors=True)
+        return oci.response.Response(204, {}, None, None)
+
+    # ----------------------------
+    # 🔑 사전 인증 요청(PAR)
+    # ----------------------------
+    def _par_path(self, par_id):
+        if not par_id.isalnum():
+            raise _service_error(404, 'NotAuthenticated', "PAR이 없습니다.")
+        return os.path.join(self.root, '.par', f"{par_id}.json")
+
+    def create_preauthenticated_request(self, namespace_name, bucket_name, create_preauthenticated_request_details, **kwargs):
+        self._inject('create_preauthenticated_request')
+        details = create_preauthenticated_request_details
+        if details.access_type != 'ObjectWrite' or not details.object_name:
+            raise _service_error(400, 'InvalidParameter', "대역은 객체 하나에 대한 ObjectWrite PAR만 지원합니다.")
+        time_expires = details.time_expires
+        if time_expires.tzinfo is None:
+            time_expires = time_expires.replace(tzinfo=timezone.utc)
+
+        # 실제 OCI는 id와 URL 속 토큰이 다르지만, 대역에서는 같은 값을 사용
+        par_id = uuid.uuid4().hex
+        info = {
+            'name': details.name,
+            'bucket': bucket_name,
+            'object': details.object_name,
+            'access_type': details.access_type,
+            'time_expires': time_expires.timestamp(),
+        }
+        os.makedirs(os.path.join(self.root, '.par'), exist_ok=True)
+        with open(self._par_path(par_id), 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+        data = PreauthenticatedRequest(
+            id=par_id, name=details.name, object_name=details.object_name,
+            access_type=details.access_type, time_expires=time_expires,
+            time_created=datetime.now(timezone.utc),
+            access_uri=f"/p/{par_id}/n/{namespace_name}/b/{bucket_name}/o/{details.object_name}",
+        )
+        return oci.response.Response(200, {}, data, None)
+
+    def delete_preauthenticated_request(self, namespace_name, bucket_name, par_id, **kwargs):
+        self._inject('delete_preauthenticated_request')
+        try:
+            os.remove(self._par_path(par_id))
+        except FileNotFoundError:
+            raise _service_error(404, 'NotAuthorizedOrNotFound', f"PAR이 없습니다: {par_id}")
+        return oci.response.Response(204, {}, None, None)
+
+    def put_object_with_par(self, par_id, namespace_name, bucket_name, object_name, put_object_body, **kwargs):
+        """PAR URL로 들어온 PUT 처리 (PAR의 버킷/객체 이름/만료 시각 확인 후 put_object)"""
+        try:
+            with open(self._par_path(par_id), encoding='utf-8') as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            info = None
+        # 실제 서비스처럼 없는 PAR/만료/범위 밖 요청은 구분하지 않고 404
+        if (
+            info is None
+            or info['time_expires'] < time.time()
+            or info['bucket'] != bucket_name
+            or info['object'] != object_name
+        ):
+            raise _service_error(404, 'NotAuthenticated', "PAR이 없거나 만료되었습니다.")
+        return self.put_object(namespace_name, bucket_name, object_name, put_object_body, **kwargs)
+
+
+_fake_clients = {}
+_fake_clients_lock = threading.Lock()
+
+
+def get_fake_client(root, latency_ms=0, jitter_ms=0, error_rate=0.0, error_operations=()):
+    """설정이 같으면 프로세스 안에서 같은 대역 클라이언트를 재사용 (get_shared_client와 같은 역할)"""
+    key = (str(root), latency_ms, jitter_ms, error_rate, tuple(sorted(error_operations)))
+    with _fake_clients_lock:
+        client = _fake_clients.get(key)
+        if client is None:
+            client = _fake_clients[key] = FakeObjectStorageClient(
+                root, latency_ms=latency_ms, jitter_ms=jitter_ms,
+                error_rate=error_rate, error_operations=error_operations,
+            )
+        return client
@@ -0,0 +1,38 @@
+"""
+[파일 경로] config/oci_fake_views.py
+[설명]
+OCI 로컬 대역(config/oci_fake.py)의 PAR 업로드 주소입니다. (OCI_EMULATOR_ROOT를 지정했을 때만 등록)
+브라우저가 /oci-emulator/p/<토큰>/n/<네임스페이스>/b/<버킷>/o/<객체 이름> 으로 보내는 PUT을 받아
+실제 OCI의 PAR URL처럼 (로그인/CSRF 없이) PAR 토큰만으로 객체를 저장합니다.
+"""
+import logging
+import oci
+from django.core.files.storage import default_storage
+from django.http import HttpResponse, JsonResponse, Http404
+from django.views.decorators.csrf import csrf_exempt
+from config.oci_fake import FakeObjectStorageClient
+
+logger = logging.getLogger('django')
+
+
+@csrf_exempt
+def par_upload(request, par_id, namespace, bucket, name):
+    client = getattr(default_storage, 'object_storage', None)
+    if not isinstance(client, FakeObjectStorageClient):
+        raise Http404
+    if request.method != 'PUT':
+        return HttpResponse(status=405, headers={'Allow': 'PUT'})
+
+    try:
+        length = int(request.headers.get('Content-Length') or 0)
+        # 본문을 메모리에 모으지 않고 요청 스트림에서 바로 디스크로 (대역의 _spool이 청크 단위로 읽음)
+        response = client.put_object_with_par(
+            par_id, namespace, bucket, name, request,
+            content_length=length,
+            content_type=request.headers.get('Content-Type') or 'application/octet-stream',
+            content_md5=request.headers.get('Content-MD5'),
+        )
+    except oci.exceptions.ServiceError as e:
+        logger.warning(f"⚠️ [OCI Emulator] PAR 업로드 거부 ({e.status} {e.code}): {name}")
+        return JsonResponse({'code': e.code, 'message': e.message}, status=e.status)
+    return HttpResponse(status=200, headers={'ETag': response.headers['etag']})
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'photo.perf.PerfMiddleware',  # 요청별 성능 측정 (맨 앞에 두어야 전체 시간을 잼)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,12 +81,93 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# [데이터베이스] DB_ENGINE=sqlite(기본) | postgres
+# SQLite -> PostgreSQL 이전: DB_ENGINE=postgres 로 설정한 뒤 `python manage.py copy_sqlite_data`
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+# SQLite 연결마다 적용하는 설정 (gunicorn 워커 여러 개가 동시에 쓸 때 "database is locked" 방지)
+# - WAL: 읽기와 쓰기가 서로 막지 않음 / busy_timeout: 잠겨 있으면 바로 실패하지 않고 기다림
+# - synchronous=NORMAL: WAL에서는 안전하면서 커밋마다 fsync하지 않음
+# - mmap_size / cache_size: 읽기 성능 (cache_size 음수 = KB 단위)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))  # 256MB
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000'))          # 연결당 약 20MB
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;"
+    f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS};"
+    "PRAGMA synchronous=NORMAL;"
+    f"PRAGMA mmap_size={SQLITE_MMAP_SIZE};"
+    f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB};"
+    "PRAGMA temp_store=MEMORY;"
+)
+
+if DB_ENGINE == 'postgres':
+    # [PostgreSQL] pip install "psycopg[binary,pool]" 필요
+    # POSTGRES_POOL=True(기본): 워커 프로세스마다 psycopg 연결 풀 사용 (이 경우 CONN_MAX_AGE는 0이어야 함)
+    # POSTGRES_POOL=False     : 요청 사이에 연결을 유지하는 지속 연결(CONN_MAX_AGE) 사용
+    POSTGRES_POOL = os.getenv('POSTGRES_POOL', 'True') == 'True'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'school'),
+            'USER': os.getenv('POSTGRES_USER', 'school'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': 0 if POSTGRES_POOL else int(os.getenv('DB_CONN_MAX_AGE', '600')),
+            'CONN_HEALTH_CHECKS': not POSTGRES_POOL,  # 지속 연결은 재사용 전에 끊겼는지 확인
+            'OPTIONS': {
+                'connect_timeout': 5,
+            },
+        }
+    }
+    if POSTGRES_POOL:
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('POSTGRES_POOL_MIN', '2')),
+            'max_size': int(os.getenv('POSTGRES_POOL_MAX', '10')),  # 워커 프로세스당 최대 연결 수
+            'timeout': 10,  # 빈 연결을 기다리는 최대 시간(초)
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'init_command': SQLITE_PRAGMAS,
+                # 트랜잭션 시작 시 바로 쓰기 잠금을 잡아, 읽다가 쓰기로 바꿀 때 busy_timeout을 무시하고
+                # 바로 "database is locked"가 나는 경우를 막음
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+            },
+        }
     }
-}
+
+# [캐시] 메인 페이지 HTML 조각 캐시 저장소 (CACHE_BACKEND=file | redis | locmem)
+# 게시물은 웹 요청(gunicorn 워커 여러 개)과 run_jobs 워커가 함께 바꾸므로 기본값은 프로세스끼리 공유되는 file.
+# locmem은 프로세스마다 따로라 다른 프로세스의 수정이 만료 전까지 보이지 않음 (runserver 하나만 띄우는 개발용)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'file')
+CACHE_LOCATION = os.getenv('CACHE_LOCATION', '')
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv('FRAGMENT_CACHE_TIMEOUT', '3600'))  # 조각 보관 시간(초)
+
+if CACHE_BACKEND == 'redis':
+    _cache_config = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_LOCATION or 'redis://127.0.0.1:6379/1',
+    }
+elif CACHE_BACKEND == 'file':
+    _cache_config = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_LOCATION or str(BASE_DIR / '.cache'),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+else:
+    _cache_config = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'school-project',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+
+CACHES = {'default': {**_cache_config, 'KEY_PREFIX': 'school'}}
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -106,7 +188,16 @@ AWS_STORAGE_BUCKET_NAME = 'school-media'
 OCI_NAMESPACE = 'axypprkugw7b'
 OCI_REGION = 'ap-chuncheon-1'
 
-if DEBUG:
+# [OCI 로컬 대역] 지정하면 실제 OCI 대신 이 폴더에 저장하는 가짜 클라이언트 사용 (config/oci_fake.py)
+# DEBUG여도 OCIStorage 경로를 그대로 타므로 업로드/멀티파트/검증 동작을 오프라인에서 확인/부하 테스트할 수 있습니다.
+OCI_EMULATOR_ROOT = os.getenv('OCI_EMULATOR_ROOT', '')
+OCI_EMULATOR_LATENCY_MS = int(os.getenv('OCI_EMULATOR_LATENCY_MS', '0'))     # 호출마다 추가 지연(ms)
+OCI_EMULATOR_JITTER_MS = int(os.getenv('OCI_EMULATOR_JITTER_MS', '0'))       # 지연 흔들림 ±(ms)
+OCI_EMULATOR_ERROR_RATE = float(os.getenv('OCI_EMULATOR_ERROR_RATE', '0'))   # 503 오류 확률 (0~1)
+OCI_EMULATOR_ERROR_OPERATIONS = [op for op in os.getenv('OCI_EMULATOR_ERROR_OPERATIONS', '').split(',') if op]  # 예: put_object,upload_part
+OCI_EMULATOR_PAR_URL = os.getenv('OCI_EMULATOR_PAR_URL', '/oci-emulator')  # 대역 PAR URL 앞부분 (config/urls.py에 등록된 주소)
+
+if DEBUG and not OCI_EMULATOR_ROOT:
     # [로컬 개발] 내 컴퓨터의 'media' 폴더 사용
     STORAGES = {
         "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
@@ -121,6 +212,114 @@ else:
         "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
     }
     MEDIA_URL = f'https://objectstorage.{OCI_REGION}.oraclecloud.com/n/{OCI_NAMESPACE}/b/{AWS_STORAGE_BUCKET_NAME}/o/'
+    if OCI_EMULATOR_ROOT:
+        MEDIA_URL = '/media/'  # 로컬 대역 객체는 앱이 중계 (config/media_views.py)
+
+# [미디어 응답] SERVE_MEDIA가 켜져 있으면 config/media_views.py가 MEDIA_URL 요청에 Range/304/캐시 헤더와 함께 응답
+# 기본값은 로컬 개발(DEBUG) 또는 OCI 로컬 대역일 때만 켜짐 (운영은 OCI 공개 버킷 주소로 브라우저가 바로 받음)
+SERVE_MEDIA = os.getenv('SERVE_MEDIA', str(DEBUG or bool(OCI_EMULATOR_ROOT))) == 'True'
+# 지정하면 로컬 파일은 X-Accel-Redirect로 nginx에 넘김 (예: '/_media/' + nginx `location /_media/ { internal; alias .../media/; }`)
+MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT', '')
+
+# [OCI 업로드] 이 크기 이상은 멀티파트 병렬 업로드 (메모리 사용량 ≈ 파트 크기 x (동시 전송 수 + 1))
+OCI_MULTIPART_THRESHOLD = int(os.getenv('OCI_MULTIPART_THRESHOLD', str(64 * 1024 * 1024)))  # 64MB
+OCI_MULTIPART_PART_SIZE = int(os.getenv('OCI_MULTIPART_PART_SIZE', str(16 * 1024 * 1024)))  # 16MB
+OCI_UPLOAD_PARALLELISM = int(os.getenv('OCI_UPLOAD_PARALLELISM', '4'))  # 동시에 전송할 파트 수
+OCI_PART_MAX_ATTEMPTS = 3  # 파트별 최대 시도 횟수
+OCI_CONNECTION_POOL_SIZE = int(os.getenv('OCI_CONNECTION_POOL_SIZE', '16'))  # 공용 클라이언트 연결 풀 크기
+
+# [직접 업로드] 브라우저가 PAR URL로 버킷에 바로 올리고, 앱 서버는 발급/검사만 (photo/direct_upload.py)
+# OCIStorage(또는 로컬 대역)를 쓸 때만 동작하며, 사용할 수 없으면 기존 폼 업로드(media_create)로 자동 전환됩니다.
+# 실제 OCI에서는 브라우저가 objectstorage 도메인으로 PUT 하므로 PAR 요청에 대한 CORS 응답을 배포 전에 확인하세요.
+DIRECT_UPLOAD_ENABLED = os.getenv('DIRECT_UPLOAD_ENABLED', 'True') == 'True'
+DIRECT_UPLOAD_MAX_BYTES = int(os.getenv('DIRECT_UPLOAD_MAX_BYTES', str(500 * 1024 * 1024)))  # 파일 1개 최대 크기 (500MB)
+DIRECT_UPLOAD_EXPIRES = int(os.getenv('DIRECT_UPLOAD_EXPIRES', '900'))  # PAR URL 유효 시간(초)
+DIRECT_UPLOAD_CONTENT_TYPES = [
+    'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/heic', 'image/avif',
+    'video/mp4', 'video/quicktime', 'video/webm',
+]
+
+# [백그라운드 작업 큐] 웹툰 변환은 `python manage.py run_jobs` 워커가 처리합니다.
+JOB_WORKER_CONCURRENCY = int(os.getenv('JOB_WORKER_CONCURRENCY', '4'))  # 워커 동시 처리 수
+JOB_TIMEOUT = int(os.getenv('JOB_TIMEOUT', '300'))                      # 작업 1건 제한 시간(초)
+JOB_HEARTBEAT_INTERVAL = 10  # 워커가 처리 중인 작업의 생존 신호를 갱신하는 주기(초)
+JOB_HEARTBEAT_TIMEOUT = int(os.getenv('JOB_HEARTBEAT_TIMEOUT', '60'))   # 생존 신호가 이만큼 끊기면 워커가 죽은 것으로 보고 다른 워커가 가져감
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))              # 최대 시도 횟수
+JOB_RETRY_BASE_DELAY = 10   # 재시도 대기 시간 시작값(초), 실패할 때마다 2배
+JOB_RETRY_MAX_DELAY = 600   # 재시도 대기 시간 상한(초)
+
+# [웹툰 변환 캐시] 같은 사진은 다시 변환하지 않고 저장된 결과를 재사용 (초과 시 오래 안 쓴 것부터 삭제)
+WEBTOON_CACHE_MAX_BYTES = int(os.getenv('WEBTOON_CACHE_MAX_BYTES', str(2 * 1024 ** 3)))  # 기본 2GB
+
+# [웹툰 변환 엔진] remote(Fal AI) | local(OpenCV 만화 효과, 오프라인) | fallback(remote 실패 시 local)
+WEBTOON_ENGINE = os.getenv('WEBTOON_ENGINE', 'fallback')
+
+# [웹툰 변환 입력] AI에 보내기 전 긴 변을 줄이고 메타데이터를 제거한 JPEG로 다시 인코딩
+WEBTOON_INPUT_MAX_SIDE = int(os.getenv('WEBTOON_INPUT_MAX_SIDE', '2048'))   # 긴 변 최대 픽셀
+WEBTOON_INPUT_QUALITY = int(os.getenv('WEBTOON_INPUT_QUALITY', '85'))       # JPEG 품질
+WEBTOON_INPUT_TRANSPORT = os.getenv('WEBTOON_INPUT_TRANSPORT', 'upload')     # upload(Fal 스토리지 URL) | data_url(base64)
+
+# [영상 처리] photo/video.py - 포스터 장면/길이/해상도/코덱 기록 + 웹 재생용 사본
+VIDEO_POSTER_SECOND = float(os.getenv('VIDEO_POSTER_SECOND', '1.0'))  # 포스터로 쓸 장면 위치(초)
+VIDEO_WEB_RENDITION = os.getenv('VIDEO_WEB_RENDITION', 'auto')  # auto(ffmpeg가 있으면 생성) | off
+VIDEO_WEB_MAX_HEIGHT = int(os.getenv('VIDEO_WEB_MAX_HEIGHT', '720'))  # 웹 재생용 사본 최대 세로 해상도
+FFMPEG_BINARY = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+
+# [비슷한 사진 찾기] photo/dedup.py - 지각 해시(dHash) 비교
+DUPLICATE_HASH_DISTANCE = int(os.getenv('DUPLICATE_HASH_DISTANCE', '3'))  # 같은 사진으로 볼 최대 비트 차이 (0~3)
+DUPLICATE_REUSE_CONVERSION = os.getenv('DUPLICATE_REUSE_CONVERSION', 'True') == 'True'  # 해시가 똑같은 사진의 웹툰 변환본 복사 사용 (AI 호출 생략)
+
+# [외부 AI 호출] photo/http.py - Fal/Gemini/OpenAI 공용 연결 풀, 제한 시간, 재시도, 서킷 브레이커
+OUTBOUND_CONNECT_TIMEOUT = float(os.getenv('OUTBOUND_CONNECT_TIMEOUT', '5'))    # 연결 제한 시간(초)
+OUTBOUND_READ_TIMEOUT = float(os.getenv('OUTBOUND_READ_TIMEOUT', '60'))         # 응답 제한 시간(초)
+OUTBOUND_MAX_RETRIES = int(os.getenv('OUTBOUND_MAX_RETRIES', '2'))              # 연결 오류/429/5xx 재시도 횟수
+OUTBOUND_RETRY_BASE_DELAY = 0.5   # 재시도 대기 시간 시작값(초), 매번 2배 + 무작위 지터
+OUTBOUND_RETRY_MAX_DELAY = 8      # 재시도 대기 시간 상한(초)
+OUTBOUND_POOL_SIZE = int(os.getenv('OUTBOUND_POOL_SIZE', '10'))                 # 서비스별 keep-alive 연결 수
+OUTBOUND_CIRCUIT_THRESHOLD = int(os.getenv('OUTBOUND_CIRCUIT_THRESHOLD', '5'))  # 연속 실패 몇 번이면 차단할지
+OUTBOUND_CIRCUIT_RESET = int(os.getenv('OUTBOUND_CIRCUIT_RESET', '60'))         # 차단 유지 시간(초), 이후 시험 호출 1건
+FAL_TIMEOUT = int(os.getenv('FAL_TIMEOUT', '120'))                               # Fal 변환 1건 전체 대기 상한(초)
+
+# [요청 성능 측정] photo/perf.py - 요청마다 JSON 로그(django.perf) + Server-Timing 헤더(DEBUG/스태프만)
+PERF_ENABLED = os.getenv('PERF_ENABLED', 'True') == 'True'
+PERF_SLOW_REQUEST_MS = int(os.getenv('PERF_SLOW_REQUEST_MS', '1000'))   # 이보다 느린 요청은 WARNING으로 기록
+PERF_PROFILE_DIR = os.getenv('PERF_PROFILE_DIR', '')                    # 지정하면 느린 요청의 호출 스택 샘플을 저장
+PERF_PROFILE_INTERVAL_MS = int(os.getenv('PERF_PROFILE_INTERVAL_MS', '5'))  # 샘플링 간격(ms)
+
+# [로그] Django 기본 설정은 DEBUG=False일 때 콘솔 출력을 끄므로(require_debug_true),
+# 운영에서도 앱 로그(django)와 요청 성능 로그(django.perf)가 stdout/stderr(gunicorn, systemd 저널)에 남도록 직접 지정
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+PERF_LOG_LEVEL = os.getenv('PERF_LOG_LEVEL', 'INFO')  # WARNING이면 느린 요청만 기록
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'require_debug_false': {'()': 'django.utils.log.RequireDebugFalse'},
+    },
+    'formatters': {
+        'app': {'format': '[{asctime}] {levelname} {message}', 'style': '{'},
+        'json_line': {'format': '{message}', 'style': '{'},  # 성능 로그는 한 줄 JSON 그대로 (로그 수집기에서 파싱)
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'app'},
+        'perf_console': {'class': 'logging.StreamHandler', 'formatter': 'json_line'},
+        'mail_admins': {
+            'level': 'ERROR',
+            'filters': ['require_debug_false'],
+            'class': 'django.utils.log.AdminEmailHandler',
+        },
+    },
+    'loggers': {
+        'django': {'handlers': ['console', 'mail_admins'], 'level': LOG_LEVEL},
+        'django.perf': {'handlers': ['perf_console'], 'level': PERF_LOG_LEVEL, 'propagate': False},
+    },
+}
+
+# [운영 지표] /metrics (Prometheus 형식, 스태프 로그인 또는 'Authorization: Bearer <METRICS_TOKEN>' 요청만)
+# gunicorn 워커/run_jobs 워커가 각자 이 폴더에 값을 저장하고 /metrics가 합산합니다. (끝난 프로세스의 파일은 자동 정리)
+METRICS_DIR = os.getenv('METRICS_DIR', str(BASE_DIR / '.metrics'))
+METRICS_FLUSH_INTERVAL = int(os.getenv('METRICS_FLUSH_INTERVAL', '5'))  # 프로세스별 저장 주기(초)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # Prometheus 수집용 토큰 (비워 두면 스태프만 조회 가능)
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -1,15 +1,119 @@
 import os
 import oci
+import time
+import uuid
+import base64
+import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from oci._vendor.requests.adapters import HTTPAdapter
 from django.conf import settings
 from django.core.files.storage import Storage
+from django.core.signals import request_started, request_finished
 from django.utils.deconstruct import deconstructible
 from django.core.files.base import ContentFile
+from django.utils import timezone
+from datetime import timedelta
+from photo.perf import track
+from config.oci_fake import get_fake_client, FakeObjectStorageClient
+from photo import metrics
+from contextlib import contextmanager
 import mimetypes
 
 # 시스템 로그(journalctl)에 출력하기 위한 로거 설정
 logger = logging.getLogger('django')
 
+# ----------------------------
+# 🔌 프로세스 공용 OCI 클라이언트
+# Storage 인스턴스가 만들어질 때마다 설정 파일을 읽고 새 클라이언트(새 TCP/TLS 연결)를
+# 만들지 않도록, 워커 프로세스당 하나만 만들어 재사용합니다.
+# ----------------------------
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client(config_path, profile="DEFAULT"):
+    """(config, ObjectStorageClient)를 프로세스 내에서 한 번만 생성해 반환"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            config = oci.config.from_file(config_path, profile)
+            client = oci.object_storage.ObjectStorageClient(config)
+
+            # 연결 풀 확장: 멀티파트 병렬 전송/작업 큐 스레드가 동시에 써도 연결을 새로 맺지 않도록
+            pool_size = getattr(settings, 'OCI_CONNECTION_POOL_SIZE', 16)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            client.base_client.session.mount('https://', adapter)
+
+            _shared_client = (config, client)
+            logger.info(f"🔧 [OCI Init] 공용 클라이언트 생성 (연결 풀 {pool_size}개)")
+        return _shared_client
+
+
+# ----------------------------
+# ⏱️ 스토리지 호출 측정
+# 요청 성능 로그(photo/perf.py)의 storage 항목 + 운영 지표(/metrics)의 작업별 소요 시간
+# ----------------------------
+STORAGE_SECONDS = metrics.histogram(
+    'storage_operation_seconds', "OCI Object Storage 작업 소요 시간(초)", ['operation', 'outcome']
+)
+
+
+@contextmanager
+def _measure(operation):
+    started = time.monotonic()
+    outcome = 'success'
+    try:
+        with track('storage'):
+            yield
+    except Exception:
+        outcome = 'error'
+        raise
+    finally:
+        STORAGE_SECONDS.observe(time.monotonic() - started, operation=operation, outcome=outcome)
+
+
+# ----------------------------
+# 🗂️ 요청 단위 exists() 결과 캐시
+# 한 요청 안에서 같은 이름을 여러 번 확인해도 HEAD는 한 번만 보냅니다.
+# (요청 시작 시 비우고, 저장/삭제 시 바로 갱신, 요청 밖(작업 큐 스레드 등)에서는 캐시하지 않음)
+# ----------------------------
+_exists_cache = threading.local()
+
+
+def _start_exists_cache(**kwargs):
+    _exists_cache.names = {}
+
+
+def _stop_exists_cache(**kwargs):
+    _exists_cache.names = None
+
+
+def _exists_names():
+    """현재 요청의 exists() 캐시 (요청 밖이면 None)"""
+    return getattr(_exists_cache, 'names', None)
+
+
+def _remember_exists(name, exists):
+    names = _exists_names()
+    if names is not None:
+        names[name] = exists
+
+
+request_started.connect(_start_exists_cache, dispatch_uid='oci_exists_cache_start')
+request_finished.connect(_stop_exists_cache, dispatch_uid='oci_exists_cache_finish')
+
+
+def _md5_base64(content, chunk_size=1024 * 1024):
+    """파일 객체의 MD5(Base64)를 청크 단위로 계산 (메모리에 전체를 올리지 않음)"""
+    digest = hashlib.md5()
+    content.seek(0)
+    for chunk in iter(lambda: content.read(chunk_size), b''):
+        digest.update(chunk)
+    content.seek(0)
+    return base64.b64encode(digest.digest()).decode('ascii')
+
 @deconstructible
 class OCIStorage(Storage):
     """
@@ -17,6 +121,24 @@ class OCIStorage(Storage):
     """
     def __init__(self, option=None):
         try:
+            # 0. [오프라인 개발/부하 테스트] 로컬 대역(config/oci_fake.py) 사용
+            emulator_root = getattr(settings, 'OCI_EMULATOR_ROOT', '')
+            if emulator_root:
+                self.object_storage = get_fake_client(
+                    emulator_root,
+                    latency_ms=getattr(settings, 'OCI_EMULATOR_LATENCY_MS', 0),
+                    jitter_ms=getattr(settings, 'OCI_EMULATOR_JITTER_MS', 0),
+                    error_rate=getattr(settings, 'OCI_EMULATOR_ERROR_RATE', 0.0),
+                    error_operations=getattr(settings, 'OCI_EMULATOR_ERROR_OPERATIONS', ()),
+                )
+                self.namespace = getattr(settings, 'OCI_NAMESPACE', None) or "emulator"
+                self.bucket_name = getattr(settings, 'AWS_STORAGE_BUCKET_NAME', None) or "emulator"
+                self.region = getattr(settings, 'OCI_REGION', None) or "ap-chuncheon-1"
+                # PAR URL은 이 앱의 대역 업로드 주소로 (config/oci_fake_views.py)
+                self.par_base_url = getattr(settings, 'OCI_EMULATOR_PAR_URL', '/oci-emulator')
+                logger.info(f"🧪 [OCI Emulator] 로컬 대역 사용: {emulator_root} (Bucket={self.bucket_name})")
+                return
+
             # 1. 설정 로드
             self.config_profile = "DEFAULT"
             
@@ -42,13 +164,13 @@ class OCIStorage(Storage):
 
             logger.info(f"🔧 [OCI Init] 설정 파일 경로: {self.config_path}")
 
-            self.config = oci.config.from_file(self.config_path, self.config_profile)
-            self.object_storage = oci.object_storage.ObjectStorageClient(self.config)
+            self.config, self.object_storage = get_shared_client(self.config_path, self.config_profile)
             
             # 2. 버킷 정보
             self.namespace = settings.OCI_NAMESPACE
             self.bucket_name = settings.AWS_STORAGE_BUCKET_NAME
             self.region = self.config['region']
+            self.par_base_url = f"https://objectstorage.{self.region}.oraclecloud.com"
             
             logger.info(f"🔧 [OCI Init] 연결 준비 완료: Bucket={self.bucket_name}, Namespace={self.namespace}")
 
@@ -63,23 +185,24 @@ class OCIStorage(Storage):
                 logger.error(f"❌ [OCI Init Error] 초기화 실패: {e}")
                 raise e
 
+    @_measure('get')
     def _open(self, name, mode='rb'):
         if not self.object_storage:
              return ContentFile(b"dummy content")
         response = self.object_storage.get_object(self.namespace, self.bucket_name, name)
         return ContentFile(response.data.content)
 
+    @_measure('put')
     def _save(self, name, content):
         if not self.object_storage:
             logger.warning(f"⚠️ [Dummy Save] OCI가 연결되지 않아 저장을 건너뜁니다: {name}")
             return name
 
         try:
-            # 1. 파일 데이터 읽기
+            # 1. 파일 크기 확인 (내용 전체를 메모리에 올리지 않고 파일 객체에서 바로 스트리밍)
             content.seek(0)
-            file_data = content.read()
-            file_size = len(file_data)
-            
+            file_size = content.size
+
             logger.info(f"🚀 [OCI Upload 시작] 파일명: {name}, 크기: {file_size} bytes")
             logger.info(f"🎯 [Target] Namespace: {self.namespace}, Bucket: {self.bucket_name}")
 
@@ -88,30 +211,115 @@ class OCIStorage(Storage):
             if not content_type:
                 content_type = 'application/octet-stream'
 
-            # 3. OCI 업로드 (PutObject)
-            self.object_storage.put_object(
-                self.namespace,
-                self.bucket_name,
-                name,
-                file_data,
-                content_type=content_type
-            )
-            logger.info(f"✅ [OCI Upload 요청 완료] PutObject 호출 성공")
-
-            # 4. [중요] 현장 검증: 진짜 올라갔는지 바로 확인
-            try:
-                self.object_storage.head_object(self.namespace, self.bucket_name, name)
-                logger.info(f"🔍 [검증 성공] 파일이 확실히 존재합니다: {name}")
-            except Exception as check_e:
-                logger.error(f"😱 [검증 실패] 업로드 직후 파일을 찾을 수 없습니다! 에러: {check_e}")
-                raise Exception(f"업로드 검증 실패: 파일이 OCI에 생성되지 않았습니다. ({check_e})")
+            # 3. OCI 업로드: 큰 파일은 멀티파트(병렬), 작은 파일은 PutObject 한 번
+            threshold = getattr(settings, 'OCI_MULTIPART_THRESHOLD', 64 * 1024 * 1024)
+            if file_size >= threshold:
+                self._multipart_upload(name, content, content_type)
+            else:
+                # 4. [중요] 현장 검증: 업로드 직후 HEAD를 다시 보내는 대신,
+                #    Content-MD5를 함께 보내 OCI가 받은 내용을 직접 검증하게 하고
+                #    응답의 opc-content-md5와도 비교합니다. (왕복 1회 절약)
+                content_md5 = _md5_base64(content)
+                response = self.object_storage.put_object(
+                    self.namespace,
+                    self.bucket_name,
+                    name,
+                    content,
+                    content_length=file_size,
+                    content_type=content_type,
+                    content_md5=content_md5
+                )
+                stored_md5 = response.headers.get('opc-content-md5')
+                if stored_md5 and stored_md5 != content_md5:
+                    logger.error(f"😱 [검증 실패] MD5 불일치: 보낸 값 {content_md5}, 저장된 값 {stored_md5}")
+                    raise Exception(f"업로드 검증 실패: 저장된 파일의 MD5가 다릅니다. ({name})")
+                logger.info(f"🔍 [검증 성공] MD5 일치 확인: {name}")
+            logger.info(f"✅ [OCI Upload 요청 완료] 업로드 성공")
 
+            _remember_exists(name, True)
             return name
 
         except Exception as e:
             logger.error(f"❌ [OCI Upload Error] 업로드 중 치명적 오류: {e}")
             raise e
 
+    def _multipart_upload(self, name, content, content_type):
+        """
+        대용량 파일 멀티파트 업로드
+        - 파일을 part_size 단위로 읽어 스레드 풀에서 병렬 전송 (파트별 재시도)
+        - 동시에 메모리에 올라가는 파트 수를 parallelism개로 제한하므로,
+          파일 크기와 상관없이 최대 메모리 사용량은 약 part_size x (parallelism + 1)
+        """
+        part_size = getattr(settings, 'OCI_MULTIPART_PART_SIZE', 16 * 1024 * 1024)
+        parallelism = getattr(settings, 'OCI_UPLOAD_PARALLELISM', 4)
+
+        details = oci.object_storage.models.CreateMultipartUploadDetails(object=name, content_type=content_type)
+        upload_id = self.object_storage.create_multipart_upload(
+            self.namespace, self.bucket_name, details
+        ).data.upload_id
+        logger.info(f"📦 [OCI Multipart] 시작: {name} (파트 {part_size // (1024 * 1024)}MB, 동시 {parallelism}개)")
+
+        slots = threading.BoundedSemaphore(parallelism)
+        failed = threading.Event()
+        futures = []
+
+        def on_part_done(future):
+            if future.exception():
+                failed.set()
+            slots.release()
+
+        try:
+            with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix='oci-part') as pool:
+                part_num = 1
+                while not failed.is_set():
+                    slots.acquire()  # 전송 중인 파트가 가득 차면 읽기를 멈추고 대기
+                    chunk = content.read(part_size)
+                    if not chunk:
+                        slots.release()
+                        break
+                    future = pool.submit(self._upload_part, name, upload_id, part_num, chunk)
+                    future.add_done_callback(on_part_done)
+                    futures.append(future)
+                    part_num += 1
+
+            parts = [
+                oci.object_storage.models.CommitMultipartUploadPartDetails(part_num=num, etag=etag)
+                for num, etag in (f.result() for f in futures)
+            ]
+            self.object_storage.commit_multipart_upload(
+                self.namespace, self.bucket_name, name, upload_id,
+                oci.object_storage.models.CommitMultipartUploadDetails(parts_to_commit=parts)
+            )
+            logger.info(f"📦 [OCI Multipart] 완료: {name} ({len(parts)}개 파트)")
+
+        except Exception:
+            # 실패 시 올라간 파트 정리 (버킷에 미완료 업로드가 쌓이지 않도록)
+            try:
+                self.object_storage.abort_multipart_upload(self.namespace, self.bucket_name, name, upload_id)
+            except Exception as abort_e:
+                logger.error(f"❌ [OCI Multipart] 업로드 취소 실패: {abort_e}")
+            raise
+
+    def _upload_part(self, name, upload_id, part_num, chunk):
+        """파트 하나 전송 (일시적 오류는 지수 백오프로 재시도) -> (part_num, etag)"""
+        max_attempts = getattr(settings, 'OCI_PART_MAX_ATTEMPTS', 3)
+        for attempt in range(1, max_attempts + 1):
+            try:
+                # 파트마다 Content-MD5를 보내 OCI가 파트 단위로 무결성을 검증
+                with _measure('upload_part'):
+                    response = self.object_storage.upload_part(
+                        self.namespace, self.bucket_name, name, upload_id, part_num, chunk,
+                        content_length=len(chunk),
+                        content_md5=base64.b64encode(hashlib.md5(chunk).digest()).decode('ascii')
+                    )
+                return part_num, response.headers['etag']
+            except Exception as e:
+                if attempt == max_attempts:
+                    raise
+                logger.warning(f"🔁 [OCI Multipart] 파트 {part_num} 재시도 ({attempt}/{max_attempts}): {e}")
+                time.sleep(0.5 * (2 ** (attempt - 1)))
+
+    @_measure('delete')
     def delete(self, name):
         if not self.object_storage:
             return
@@ -119,19 +327,105 @@ class OCIStorage(Storage):
             self.object_storage.delete_object(self.namespace, self.bucket_name, name)
         except Exception:
             pass
+        _remember_exists(name, False)
 
     def exists(self, name):
         if not self.object_storage:
             return False
+
+        names = _exists_names()
+        if names is not None and name in names:
+            return names[name]
+
+        with _measure('head'):
+            try:
+                self.object_storage.head_object(self.namespace, self.bucket_name, name)
+                exists = True
+            except oci.exceptions.ServiceError as e:
+                if e.status != 404:
+                    raise e
+                exists = False
+        _remember_exists(name, exists)
+        return exists
+
+    def head(self, name):
+        """객체 메타데이터(응답 헤더: content-length, content-type, etag 등), 없으면 None"""
+        if not self.object_storage:
+            return None
+        with _measure('head'):
+            try:
+                response = self.object_storage.head_object(self.namespace, self.bucket_name, name)
+            except oci.exceptions.ServiceError as e:
+                if e.status != 404:
+                    raise e
+                _remember_exists(name, False)
+                return None
+        _remember_exists(name, True)
+        return response.headers
+
+    def size(self, name):
+        headers = self.head(name)
+        if headers is None:
+            raise FileNotFoundError(name)
+        return int(headers['content-length'])
+
+    def read_range(self, name, start, end):
+        """객체의 start~end 바이트(양끝 포함)만 읽기 (파일 형식 확인 등에 전체를 받지 않도록)"""
+        if not self.object_storage:
+            return b''
+        with _measure('get'):
+            response = self.object_storage.get_object(
+                self.namespace, self.bucket_name, name, range=f"bytes={start}-{end}"
+            )
+            return response.data.content
+
+    @_measure('get')
+    def open_stream(self, name, byte_range=None):
+        """
+        본문을 읽지 않은 GetObject 응답 (미디어 중계용, config/media_views.py)
+        byte_range: 'bytes=a-b' 형식이면 그 구간만 (206)
+        응답의 data.raw.stream()으로 청크 단위로 읽고, 다 읽으면 data.close()로 연결 반납
+        """
+        kwargs = {'range': byte_range} if byte_range else {}
+        return self.object_storage.get_object(self.namespace, self.bucket_name, name, **kwargs)
+
+    def create_upload_url(self, name, expires_in):
+        """
+        name 객체 하나에만 쓸 수 있는 사전 인증 요청(PAR) URL 발급 (브라우저 직접 업로드용)
+
+        Returns:
+        --------
+        (url, par_id)
+            OCI가 연결되지 않은 더미 모드면 (None, None)
+        """
+        if not self.object_storage:
+            return None, None
+        details = oci.object_storage.models.CreatePreauthenticatedRequestDetails(
+            name=f"upload-{uuid.uuid4().hex[:12]}",
+            object_name=name,
+            access_type='ObjectWrite',
+            time_expires=timezone.now() + timedelta(seconds=expires_in),
+        )
+        with _measure('create_par'):
+            par = self.object_storage.create_preauthenticated_request(
+                self.namespace, self.bucket_name, details
+            ).data
+        return f"{self.par_base_url}{par.access_uri}", par.id
+
+    def delete_upload_url(self, par_id):
+        """발급한 PAR 회수 (이미 없거나 실패해도 무시 - 만료 시각이 지나면 어차피 쓸 수 없음)"""
+        if not self.object_storage or not par_id:
+            return
         try:
-            self.object_storage.head_object(self.namespace, self.bucket_name, name)
-            return True
-        except oci.exceptions.ServiceError as e:
-            if e.status == 404:
-                return False
-            raise e
+            with _measure('delete_par'):
+                self.object_storage.delete_preauthenticated_request(self.namespace, self.bucket_name, par_id)
+        except Exception as e:
+            logger.warning(f"⚠️ [OCI PAR] 회수 실패 (만료 시 자동 무효): {e}")
 
     def url(self, name):
+        # 로컬 대역은 실제 버킷이 없으므로 앱의 미디어 중계 주소(config/media_views.py)로
+        if isinstance(self.object_storage, FakeObjectStorageClient):
+            return f"{settings.MEDIA_URL}{name}"
         # 공개 버킷 URL 생성
         return f"https://objectstorage.{self.region}.oraclecloud.com/n/{self.namespace}/b/{self.bucket_name}/o/{name}"
         
\ No newline at end of file
@@ -2,8 +2,9 @@
 [파일 경로] config/urls.py
 [설명] allauth 경로를 추가하여 로그인 페이지 404 에러를 해결했습니다.
 """
+import re
 from django.contrib import admin
-from django.urls import path, include  # include 모듈 필수!
+from django.urls import path, re_path, include  # include 모듈 필수!
 from django.views.generic import RedirectView # 추가
 from django.conf import settings
 from django.conf.urls.static import static
@@ -23,16 +24,42 @@ urlpatterns = [
     path('gallery/create/', views.media_create, name='media_create'),
     path('text/create/', views.text_create, name='text_create'),
     path('code/create/', views.code_create, name='code_create'),
+
+    # [직접 업로드] PAR URL 발급 -> 브라우저가 버킷에 직접 PUT -> 완료 처리
+    path('upload/init/', views.upload_init, name='upload_init'),
+    path('upload/finalize/', views.upload_finalize, name='upload_finalize'),
     
     # [인터랙션 기능]
     path('like/<int:post_id>/', views.toggle_like, name='toggle_like'),
+    path('comment/list/<int:post_id>/', views.comment_list, name='comment_list'),
     path('comment/add/<int:post_id>/', views.add_comment, name='add_comment'),
     path('comment/delete/<int:comment_id>/', views.delete_comment, name='delete_comment'),
     
+    # [무한 스크롤] 탭별 다음 카드 묶음
+    path('feed/<str:tab>/', views.feed, name='feed'),
+
+    # [운영 지표] Prometheus 수집용 (스태프 로그인 또는 METRICS_TOKEN Bearer 토큰)
+    path('metrics', views.metrics_view, name='metrics'),
+
     path('', views.index, name='index'),
 ]
 
-# 미디어 파일(사진)과 정적 파일(CSS, JS)을 위한 설정
+# [OCI 로컬 대역] PAR URL로 들어오는 브라우저 업로드를 받는 주소 (config/oci_fake_views.py)
+if settings.OCI_EMULATOR_ROOT:
+    from config import oci_fake_views
+    urlpatterns += [
+        re_path(r'^oci-emulator/p/(?P<par_id>[^/]+)/n/(?P<namespace>[^/]+)/b/(?P<bucket>[^/]+)/o/(?P<name>.+)$',
+                oci_fake_views.par_upload),
+    ]
+
+# 미디어 파일(사진/영상): SERVE_MEDIA일 때만 (기본: 로컬 개발 media 폴더 / OCI 로컬 대역)
+# Range(영상 탐색), ETag/Last-Modified(304), 파생본 장기 캐시를 지원하는 뷰로 응답
+if settings.SERVE_MEDIA and settings.MEDIA_URL.startswith('/'):
+    from config import media_views
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), media_views.serve_media),
+    ]
+
+# 정적 파일(CSS, JS)을 위한 설정
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT) # [추가] 정적 파일 서빙
\ No newline at end of file
@@ -1,22 +1,25 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import MediaPost, TextPost, CodeLink, OfficialLink, Comment
+from .models import MediaPost, TextPost, CodeLink, OfficialLink, Comment, Job, ConversionCache
 
 admin.site.site_header = "학교 AI 홍보 플랫폼 관리"
 admin.site.index_title = "콘텐츠 통합 관리소"
 
 @admin.register(MediaPost)
 class MediaPostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'get_likes_count', 'is_public', 'created_at', 'has_original')
-    list_filter = ('is_public', 'created_at')
+    list_display = ('title', 'get_likes_count', 'is_public', 'conversion_status', 'created_at', 'has_original')
+    list_filter = ('is_public', 'conversion_status', 'created_at')
     search_fields = ('title', 'description')
+    actions = ['show_duplicate_clusters']
 
     def get_likes_count(self, obj):
-        return obj.likes.count()
+        return obj.like_count
     get_likes_count.short_description = '좋아요 수'
+    get_likes_count.admin_order_field = 'like_count'
 
     # 'file_url', 'original_file_url'을 읽기 전용으로 화면에 표시
-    readonly_fields = ('file_url', 'original_file_url', 'file_preview', 'original_preview')
+    readonly_fields = ('file_url', 'original_file_url', 'file_preview', 'original_preview',
+                       'duration', 'width', 'height', 'video_codec', 'phash')
 
     # 카툰 필터 적용된 파일의 URL
     def file_url(self, obj):
@@ -37,6 +40,11 @@ class MediaPostAdmin(admin.ModelAdmin):
 
     # 카툰 필터 적용된 이미지 미리보기
     def file_preview(self, obj):
+        if obj.is_video:
+            return format_html(
+                '<video src="{}" poster="{}" controls preload="none" style="max-width: 300px; max-height: 300px; border: 2px solid #4CAF50;"></video>',
+                obj.playback_url, obj.poster.url if obj.poster else ''
+            )
         if obj.file:
             return format_html(
                 '<img src="{}" style="max-width: 300px; max-height: 300px; border: 2px solid #4CAF50;" />',
@@ -62,6 +70,26 @@ class MediaPostAdmin(admin.ModelAdmin):
         return format_html('<span style="color: gray;">{}</span>', '❌')
     has_original.short_description = "원본 보유"
 
+    @admin.action(description="비슷한 사진 묶음 보기")
+    def show_duplicate_clusters(self, request, queryset):
+        """선택한 게시물 중 지각 해시가 비슷한 것끼리 묶어서 표시 (photo/dedup.py)"""
+        from django.shortcuts import render
+        from . import dedup
+        groups = dedup.clusters(queryset)
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': "비슷한 사진 묶음",
+            'groups': [
+                [(post, post.poster.url if post.poster else post.file.url if post.file else '') for post in group]
+                for group in groups
+            ],
+            'checked': queryset.exclude(phash=None).count(),
+            'unhashed': queryset.filter(phash=None).count(),
+            'max_distance': dedup.max_distance(),
+        }
+        return render(request, "admin/photo/duplicate_clusters.html", context)
+
 @admin.register(TextPost)
 class TextPostAdmin(admin.ModelAdmin):
     list_display = ('title', 'author_name', 'created_at')
@@ -83,6 +111,36 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ('post', 'author', 'content', 'created_at')
     search_fields = ('content', 'author__username')
 
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'max_attempts', 'run_after', 'updated_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('last_error', 'locked_at', 'locked_by', 'heartbeat_at', 'created_at', 'updated_at')
+    actions = ['retry_jobs']
+
+    @admin.action(description="선택한 작업 다시 실행")
+    def retry_jobs(self, request, queryset):
+        from django.utils import timezone
+        updated = queryset.exclude(status='RUNNING').update(
+            status='PENDING', attempts=0, run_after=timezone.now(), locked_at=None, locked_by='', heartbeat_at=None
+        )
+        self.message_user(request, f"🔁 {updated}건을 다시 대기열에 넣었습니다.")
+
+@admin.register(ConversionCache)
+class ConversionCacheAdmin(admin.ModelAdmin):
+    list_display = ('key', 'size', 'hit_count', 'created_at', 'last_used_at')
+    readonly_fields = ('key', 'file', 'size', 'hit_count', 'created_at', 'last_used_at')
+
+    def changelist_view(self, request, extra_context=None):
+        from . import conversion_cache
+        stats = conversion_cache.STATS
+        self.message_user(
+            request,
+            f"🗂️ 이 서버 프로세스 기준 적중 {stats['hits']}회 / 실패 {stats['misses']}회 "
+            f"(적중률 {conversion_cache.hit_ratio():.0%}), 정리 {stats['evictions']}건"
+        )
+        return super().changelist_view(request, extra_context)
+
 # ----------------------------------------------------
 # 5. [NEW] 사용자 일괄 등록 (CSV) 기능 추가
 # ----------------------------------------------------
@@ -92,8 +150,7 @@ from django.urls import path
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.utils.html import format_html
-import csv
-import io
+from .user_import import import_users
 
 class CustomUserAdmin(UserAdmin):
     change_list_template = 'admin/auth/user/change_list.html'
@@ -106,59 +163,41 @@ class CustomUserAdmin(UserAdmin):
         return custom_urls + urls
 
     def upload_csv(self, request):
+        context = {
+            # 필요한 경우 admin context 추가
+            **self.admin_site.each_context(request),
+        }
+
         if request.method == "POST":
             csv_file = request.FILES.get("csv_file")
-            
+            dry_run = bool(request.POST.get("dry_run"))
+
             if not csv_file:
                 messages.error(request, "파일이 없습니다.")
                 return redirect("..")
-            
+
             if not csv_file.name.endswith('.csv'):
                 messages.error(request, "CSV 파일만 업로드 가능합니다.")
                 return redirect("..")
 
             try:
-                decoded_file = csv_file.read().decode('utf-8-sig') # BOM 처리
-                csv_data = csv.DictReader(io.StringIO(decoded_file))
-                
-                success_count = 0
-                skip_count = 0
-                
-                for row in csv_data:
-                    email = row.get('email', '').strip()
-                    name = row.get('name', '').strip()
-                    
-                    if not email:
-                        continue
-                        
-                    if User.objects.filter(email=email).exists():
-                        skip_count += 1
-                        continue
-                    
-                    # 유저 생성 (비밀번호 없음, 즉시 활성화)
-                    user = User.objects.create_user(
-                        username=email, # username을 이메일로 설정
-                        email=email,
-                        first_name=name,
-                        password=None
-                    )
-                    user.is_active = True # 핵심: 즉시 승인
-                    user.set_unusable_password()
-                    user.save()
-                    success_count += 1
-                    
-                messages.success(request, f"✅ {success_count}명 등록 완료 (사전 등록된 계정 포함 건너뜀: {skip_count}명)")
-                return redirect("admin:auth_user_changelist")
-                
+                # 한 줄씩 읽으며 배치 단위로 일괄 등록 (photo/user_import.py)
+                report = import_users(csv_file, dry_run=dry_run)
             except Exception as e:
                 messages.error(request, f"업로드 중 오류 발생: {str(e)}")
                 return redirect("..")
 
+            if dry_run:
+                messages.info(request, f"🔍 미리보기: {report.created}명 등록 예정 (건너뜀 {report.skipped}명, 오류 {report.failed}건) - 아직 저장되지 않았습니다.")
+            else:
+                messages.success(request, f"✅ {report.created}명 등록 완료 (사전 등록된 계정 포함 건너뜀: {report.skipped}명, 오류 {report.failed}건)")
+                if not report.rows:
+                    return redirect("admin:auth_user_changelist")
+
+            # 줄별 오류/건너뜀 내역이 있으면 결과 화면으로
+            context['report'] = report
+
         # GET 요청 시 폼 렌더링
-        context = {
-            # 필요한 경우 admin context 추가
-            **self.admin_site.each_context(request),
-        }
         return render(request, "admin/upload_csv.html", context)
 
 # 기존 User Admin 해제 후 커스텀 등록
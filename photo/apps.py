@@ -10,5 +10,6 @@ class PhotoConfig(AppConfig):
         """
         try:
             import photo.signals
+            import photo.tasks  # 작업 큐 처리 함수 등록
         except ImportError:
             pass
\ No newline at end of file
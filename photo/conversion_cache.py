@@ -0,0 +1,138 @@
+"""
+[파일 경로] photo/conversion_cache.py
+[설명]
+AI 웹툰 변환 결과 캐시입니다.
+1. 캐시 키 = SHA-256(원본 크기 + 정규화된 축소 픽셀 + 프롬프트 + 모델 id)
+   - EXIF 회전 적용 후 RGB 픽셀 기준이라, 같은 사진을 다른 이름/메타데이터로 다시 올려도 같은 키가 됩니다.
+   - 전체 해상도로 풀지 않고 긴 변 KEY_MAX_SIDE 이하로 줄인 픽셀만 해시합니다. (JPEG는 축소 디코딩)
+2. 변환 결과는 설정된 스토리지(로컬 media 폴더 또는 OCI)의 webtoon_cache/ 아래에 저장합니다.
+3. 전체 용량이 WEBTOON_CACHE_MAX_BYTES를 넘으면 가장 오래 안 쓴 항목부터 지웁니다. (LRU)
+4. 적중/실패 횟수는 STATS에 누적되고 로그와 /metrics(photo_webtoon_cache_total)로 남습니다.
+"""
+import hashlib
+import logging
+import threading
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+from PIL import Image, ImageOps
+from .models import ConversionCache
+from . import metrics
+
+logger = logging.getLogger('django')
+
+# 키 계산용 축소 크기 (원본 크기도 키에 들어가므로 다른 해상도의 사진과 섞이지 않음)
+KEY_MAX_SIDE = 512
+
+CACHE_EVENTS = metrics.counter(
+    'photo_webtoon_cache_total', "웹툰 변환 캐시 (hits: 적중, misses: 실패, stores: 저장, evictions: 용량 정리)", ['result']
+)
+
+# 프로세스 단위 적중률 통계 (hits / misses / stores / evictions)
+STATS = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        STATS[name] += 1
+    CACHE_EVENTS.inc(result=name)
+
+
+def hit_ratio():
+    total = STATS['hits'] + STATS['misses']
+    return STATS['hits'] / total if total else 0.0
+
+
+def make_key(image_data, prompt, model_id):
+    """입력 이미지(원본 크기 + 축소 픽셀) + 프롬프트 + 모델 id로 캐시 키 생성"""
+    digest = hashlib.sha256()
+    try:
+        image = Image.open(BytesIO(image_data))
+        orientation = image.getexif().get(0x0112, 1)
+        digest.update(f"{image.width}x{image.height}:{orientation}".encode())
+        # JPEG는 1/2~1/8 크기로 바로 디코딩 (큰 사진도 전체 해상도로 풀지 않음)
+        image.draft('RGB', (KEY_MAX_SIDE, KEY_MAX_SIDE))
+        image = ImageOps.exif_transpose(image)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.thumbnail((KEY_MAX_SIDE, KEY_MAX_SIDE), Image.LANCZOS)
+        digest.update(image.tobytes())
+    except Exception:
+        # 이미지로 열리지 않으면 원본 바이트 그대로 사용
+        digest.update(image_data)
+    digest.update(b'\0' + prompt.encode('utf-8'))
+    digest.update(b'\0' + model_id.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def get(key):
+    """캐시된 변환 결과(bytes) 또는 None"""
+    entry = ConversionCache.objects.filter(key=key).first()
+    if entry is None:
+        _count('misses')
+        logger.info(f"🗂️ [Webtoon Cache] MISS {key[:12]} (적중률 {hit_ratio():.0%})")
+        return None
+
+    try:
+        entry.file.open('rb')
+        try:
+            data = entry.file.read()
+        finally:
+            entry.file.close()
+    except Exception as e:
+        # 스토리지에서 파일이 사라진 경우: 항목 정리 후 MISS 처리
+        logger.warning(f"⚠️ [Webtoon Cache] 캐시 파일을 읽을 수 없어 항목을 삭제합니다: {e}")
+        entry.delete()
+        _count('misses')
+        return None
+
+    ConversionCache.objects.filter(pk=entry.pk).update(
+        hit_count=F('hit_count') + 1, last_used_at=timezone.now()
+    )
+    _count('hits')
+    logger.info(f"🗂️ [Webtoon Cache] HIT {key[:12]} (적중률 {hit_ratio():.0%})")
+    return data
+
+
+def put(key, data):
+    """변환 결과 저장 후 용량 초과분 정리"""
+    if ConversionCache.objects.filter(key=key).exists():
+        return
+
+    entry = ConversionCache(key=key, size=len(data))
+    entry.file.save(f"{key}.jpg", ContentFile(data), save=False)
+    try:
+        entry.save()
+    except IntegrityError:
+        # 다른 워커가 같은 사진을 동시에 변환해 먼저 저장한 경우
+        entry.file.delete(save=False)
+        return
+    _count('stores')
+    evict()
+
+
+def evict(max_bytes=None):
+    """총 용량이 상한을 넘으면 마지막 사용 시각이 오래된 것부터 삭제 (LRU)"""
+    if max_bytes is None:
+        max_bytes = getattr(settings, 'WEBTOON_CACHE_MAX_BYTES', 2 * 1024 ** 3)
+
+    total = ConversionCache.objects.aggregate(total=Sum('size'))['total'] or 0
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    for entry in ConversionCache.objects.order_by('last_used_at').iterator():
+        if total <= max_bytes:
+            break
+        entry.file.delete(save=False)
+        entry.delete()
+        total -= entry.size
+        removed += 1
+        _count('evictions')
+
+    logger.info(f"🧹 [Webtoon Cache] 용량 초과로 {removed}건 정리 (현재 {total / 1024 ** 2:.1f}MB)")
+    return removed
@@ -0,0 +1,206 @@
+"""
+[파일 경로] photo/dedup.py
+[설명]
+비슷한 사진(같은 행사 사진을 여러 번 올린 경우) 찾기입니다.
+1. 지각 해시(dHash, 64비트): 9x8 흑백으로 줄인 뒤 옆 픽셀과의 밝기 비교 결과를 비트로 저장합니다.
+   크기 변경/재압축/메타데이터 차이에는 거의 그대로라, 비트가 몇 개만 다르면 같은 사진으로 봅니다.
+2. 인덱스 검색: 해시를 16비트씩 4조각(phash_0~3, 각각 DB 인덱스)으로도 저장합니다.
+   다른 비트가 3개 이하면 4조각 중 최소 하나는 똑같으므로(비둘기집 원리),
+   조각이 같은 후보만 인덱스로 가져와 정확한 거리를 계산합니다. (전체 게시물을 훑지 않음)
+3. 업로드 시: 비슷한 게시물을 instance._near_duplicates에 남겨 업로드 응답에서 알려 주고,
+   웹툰 변환 때 해시가 똑같고 원본 바이트까지 같은 사진이 이미 변환되어 있으면 AI를 다시 부르지 않고 그 결과를 복사해 씁니다. (photo/tasks.py)
+4. 관리자 화면의 '비슷한 사진 묶음 보기' 작업이 clusters()로 중복 묶음을 보여 줍니다.
+"""
+import hashlib
+import logging
+from io import BytesIO
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from PIL import Image, ImageOps
+from . import metrics
+
+logger = logging.getLogger('django')
+
+HASH_WIDTH, HASH_HEIGHT = 9, 8  # 가로 9칸을 옆끼리 비교 -> 8x8 = 64비트
+SEGMENTS = 4
+SEGMENT_BITS = 16
+SEGMENT_FIELDS = [f'phash_{i}' for i in range(SEGMENTS)]
+HASH_FIELDS = ['phash', *SEGMENT_FIELDS]
+
+NEAR_DUPLICATES = metrics.counter(
+    'photo_near_duplicates_total', "비슷한 사진 감지 (warned: 업로드 시 알림, reused: 변환 결과 재사용)", ['action']
+)
+
+
+def max_distance():
+    """같은 사진으로 볼 최대 비트 차이 (조각 인덱스로 빠짐없이 찾을 수 있는 최대값은 3)"""
+    return min(getattr(settings, 'DUPLICATE_HASH_DISTANCE', 3), SEGMENTS - 1)
+
+
+def dhash(source):
+    """
+    이미지(bytes, 파일 객체 또는 PIL Image) -> 64비트 dHash (0 ~ 2^64-1)
+    """
+    if isinstance(source, Image.Image):
+        image = source
+    else:
+        image = Image.open(BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+        # JPEG는 작은 크기로 바로 디코딩 (큰 사진도 전체 해상도로 풀지 않음)
+        image.draft('L', (HASH_WIDTH * 8, HASH_HEIGHT * 8))
+    image = ImageOps.exif_transpose(image)
+    small = image.convert('L').resize((HASH_WIDTH, HASH_HEIGHT), Image.LANCZOS)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hash_source(post):
+    """해시를 계산할 파일 (웹툰 변환 게시물은 원본 기준 - 같은 사진을 다시 올렸는지 비교하므로)"""
+    from .signals import upload_type
+
+    field = post.original_file or post.file
+    if field and upload_type(field.name) == 'image':
+        return field
+    return None
+
+
+def needs_hash(post):
+    """사진인데 아직 해시가 없는 경우 (영상은 포스터로 영상 처리 작업에서 계산)"""
+    return post.phash is None and hash_source(post) is not None
+
+
+def update_hash(post):
+    """저장된 파일로 해시를 계산해 바로 저장 (작업 큐 'phash' / compute_phashes 명령 공용)"""
+    field = hash_source(post)
+    field.open('rb')
+    try:
+        data = field.read()
+    finally:
+        field.close()
+    value = dhash(data)
+    set_hash(post, value)
+    post.save(update_fields=HASH_FIELDS)
+    return value
+
+
+def _to_signed(value):
+    """BigIntegerField(부호 있는 64비트)에 넣을 수 있게 변환"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def segments(value):
+    """64비트 해시 -> 16비트 조각 4개 (앞쪽 비트부터)"""
+    mask = (1 << SEGMENT_BITS) - 1
+    return [(value >> (SEGMENT_BITS * (SEGMENTS - 1 - i))) & mask for i in range(SEGMENTS)]
+
+
+def hash_fields(value):
+    """MediaPost에 저장할 필드 값 {'phash': ..., 'phash_0': ..., ...}"""
+    fields = {'phash': _to_signed(value)}
+    fields.update(zip(SEGMENT_FIELDS, segments(value)))
+    return fields
+
+
+def set_hash(post, value):
+    """post의 해시 필드 채우기 (저장은 호출 측에서, update_fields에는 HASH_FIELDS)"""
+    for name, field_value in hash_fields(value).items():
+        setattr(post, name, field_value)
+
+
+def distance(a, b):
+    return (_to_unsigned(a) ^ _to_unsigned(b)).bit_count()
+
+
+def find_similar(value, queryset=None, exclude_pk=None, limit=10, max_bits=None):
+    """
+    해시가 value와 비슷한 게시물 [(post, 비트 차이), ...] (가까운 순)
+    조각 인덱스 4개의 OR 조회 -> 후보만 정확한 거리 계산
+    value는 dhash() 값 또는 DB에 저장된 phash 값(부호 있음) 모두 가능
+    max_bits를 주지 않으면 max_distance() 기준
+    """
+    from .models import MediaPost
+
+    value = _to_unsigned(value)
+    queryset = MediaPost.objects.all() if queryset is None else queryset
+    condition = Q()
+    for name, segment in zip(SEGMENT_FIELDS, segments(value)):
+        condition |= Q(**{name: segment})
+    candidates = queryset.filter(condition)
+    if exclude_pk is not None:
+        candidates = candidates.exclude(pk=exclude_pk)
+
+    limit_bits = max_distance() if max_bits is None else min(max_bits, max_distance())
+    matches = []
+    for post in candidates:
+        bits = distance(value, post.phash)
+        if bits <= limit_bits:
+            matches.append((post, bits))
+    matches.sort(key=lambda item: (item[1], -item[0].pk))
+    return matches[:limit]
+
+
+def find_reusable_conversion(value, original_data, exclude_pk=None, candidates=5):
+    """
+    이미 웹툰 변환이 끝난 같은 사진 (없으면 None)
+    dHash는 64비트뿐이라 다른 사진도 해시가 같을 수 있으므로,
+    해시가 완전히 같은 후보 중 보존된 원본 바이트까지 똑같은(SHA-256 일치) 게시물만 인정
+    """
+    from .models import MediaPost
+
+    digest = hashlib.sha256(original_data).digest()
+    converted = MediaPost.objects.filter(conversion_status='DONE').exclude(file='').exclude(original_file='')
+    for post, _ in find_similar(value, queryset=converted, exclude_pk=exclude_pk, limit=candidates, max_bits=0):
+        try:
+            post.original_file.open('rb')
+            try:
+                same = hashlib.sha256(post.original_file.read()).digest() == digest
+            finally:
+                post.original_file.close()
+        except Exception as e:
+            logger.warning(f"⚠️ [Dedup] 후보 원본을 읽지 못해 건너뜀: {post.original_file.name} ({e})")
+            continue
+        if same:
+            return post
+    return None
+
+
+def clusters(queryset):
+    """
+    queryset 안에서 비슷한 사진끼리 묶기 (2장 이상인 묶음만, 큰 묶음 먼저)
+    조각별 버킷으로 후보 쌍만 비교 + union-find로 연결된 사진을 한 묶음으로
+
+    Returns:
+    --------
+    list[list[MediaPost]]
+    """
+    posts = {post.pk: post for post in queryset.exclude(phash=None)}
+    parent = {pk: pk for pk in posts}
+
+    def find(pk):
+        while parent[pk] != pk:
+            parent[pk] = parent[parent[pk]]
+            pk = parent[pk]
+        return pk
+
+    limit_bits = max_distance()
+    for name in SEGMENT_FIELDS:
+        buckets = {}
+        for post in posts.values():
+            buckets.setdefault(getattr(post, name), []).append(post)
+        for bucket in buckets.values():
+            for i, a in enumerate(bucket):
+                for b in bucket[i + 1:]:
+                    if find(a.pk) != find(b.pk) and distance(a.phash, b.phash) <= limit_bits:
+                        parent[find(a.pk)] = find(b.pk)
+
+    groups = {}
+    for pk, post in posts.items():
+        groups.setdefault(find(pk), []).append(post)
+    result = [sorted(group, key=lambda post: post.created_at) for group in groups.values() if len(group) > 1]
+    result.sort(key=len, reverse=True)
+    return result
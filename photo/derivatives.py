@@ -0,0 +1,132 @@
+"""
+[파일 경로] photo/derivatives.py
+[설명]
+갤러리용 이미지 파생본(썸네일)을 만듭니다.
+1. 원본(또는 웹툰 변환본)을 여러 너비(DERIVATIVE_WIDTHS)의 AVIF/WebP로 줄여서 저장합니다.
+   - 원본과 같은 스토리지(로컬 media 폴더 또는 OCI)의 derivatives/ 폴더에 저장
+   - 파일 이름에 원본 내용 해시가 들어가므로 내용이 바뀌면 이름도 바뀝니다. (브라우저 장기 캐시 가능)
+2. 16px 크기의 흐린 미리보기를 data URI로 만들어 DB에 바로 저장합니다. (이미지 로딩 전 배경)
+3. 결과는 MediaPost.derivatives / placeholder에 기록되고, 템플릿은 srcset으로 알맞은 크기를 고릅니다.
+"""
+import os
+import base64
+import hashlib
+import logging
+from io import BytesIO
+from django.core.files.base import ContentFile
+from PIL import Image, ImageFilter, ImageOps, features
+
+logger = logging.getLogger('django')
+
+# 카드 그리드(1~3열)와 고해상도 화면 기준 너비
+DERIVATIVE_WIDTHS = (320, 640, 1024)
+
+# 형식 -> (Pillow 저장 형식, 저장 옵션). 템플릿의 <source> 순서와 같게 압축률 좋은 순서
+DERIVATIVE_FORMATS = {
+    'avif': ('AVIF', {'quality': 50, 'speed': 8}),
+    'webp': ('WEBP', {'quality': 75, 'method': 4}),
+}
+
+PLACEHOLDER_WIDTH = 16
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp']
+
+
+def supported_formats():
+    """현재 Pillow 빌드에서 저장 가능한 파생본 형식만"""
+    return [fmt for fmt in DERIVATIVE_FORMATS if features.check(fmt)]
+
+
+def is_image(name):
+    return os.path.splitext(name or '')[1].lower() in IMAGE_EXTENSIONS
+
+
+def _resize(image, width):
+    height = max(round(image.height * width / image.width), 1)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def make_placeholder(image):
+    """아주 작게 줄이고 흐리게 만든 WebP data URI"""
+    small = _resize(image, PLACEHOLDER_WIDTH).filter(ImageFilter.GaussianBlur(1))
+    buffer = BytesIO()
+    small.save(buffer, 'WEBP', quality=30)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def build_derivatives(post, data=None):
+    """
+    post.file로부터 파생본을 생성해 저장하고 모델 필드를 갱신합니다.
+
+    data : bytes
+        post.file 대신 사용할 이미지 내용 (영상은 포스터 장면, photo/video.py)
+        파생본 이름/source는 그대로 post.file 기준
+
+    Returns:
+    --------
+    dict
+        {'source': 원본 이름, 'avif': {'320': 경로, ...}, 'webp': {...}}
+    """
+    field = post.file
+    storage = field.storage
+    if data is None:
+        field.open('rb')
+        try:
+            data = field.read()
+        finally:
+            field.close()
+
+    image = ImageOps.exif_transpose(Image.open(BytesIO(data)))
+    image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(field.name))[0]
+    folder = os.path.join(os.path.dirname(field.name), 'derivatives')
+
+    # 원본보다 큰 너비는 만들지 않음 (작은 원본이면 원본 너비 하나만)
+    widths = [w for w in DERIVATIVE_WIDTHS if w < image.width] or [image.width]
+
+    previous = post.derivatives or {}
+    result = {'source': field.name}
+    for fmt in supported_formats():
+        pil_format, options = DERIVATIVE_FORMATS[fmt]
+        result[fmt] = {}
+        for width in widths:
+            buffer = BytesIO()
+            _resize(image, width).save(buffer, pil_format, **options)
+            name = storage.save(
+                os.path.join(folder, f"{stem}_{digest}_w{width}.{fmt}"), ContentFile(buffer.getvalue())
+            )
+            result[fmt][str(width)] = name
+
+    post.derivatives = result
+    post.placeholder = make_placeholder(image)
+    post.save(update_fields=['derivatives', 'placeholder'])
+
+    # 이전 원본(예: 웹툰 변환 전)으로 만들었던 파생본 정리
+    delete_derivatives(previous, storage, keep=result)
+
+    logger.info(f"🖼️ [Derivatives] 썸네일 {len(widths)}개 크기 생성 완료: {post.title}")
+    return result
+
+
+def delete_derivatives(derivatives, storage, keep=None):
+    """파생본 파일 삭제 (keep에 있는 경로는 남김)"""
+    kept = {name for fmt in DERIVATIVE_FORMATS for name in (keep or {}).get(fmt, {}).values()}
+    for fmt in DERIVATIVE_FORMATS:
+        for name in (derivatives or {}).get(fmt, {}).values():
+            if name in kept:
+                continue
+            try:
+                storage.delete(name)
+            except Exception as e:
+                logger.warning(f"⚠️ [Derivatives] 이전 파생본 삭제 실패 ({name}): {e}")
+
+
+def needs_derivatives(post):
+    """파생본이 없거나 현재 file과 다른 원본으로 만들어진 경우"""
+    if not post.file or post.conversion_status == 'PROCESSING':
+        return False
+    if not is_image(post.file.name):
+        return False
+    return (post.derivatives or {}).get('source') != post.file.name
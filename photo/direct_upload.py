@@ -0,0 +1,214 @@
+"""
+[파일 경로] photo/direct_upload.py
+[설명]
+갤러리 파일을 브라우저가 OCI 버킷에 직접 올리는 흐름입니다. (앱 서버는 파일 내용을 중계하지 않음)
+1. start(): 업로드 시작 요청(/upload/init/)에서 제목/형식/크기를 먼저 검사하고,
+   새로 만든 객체 이름 하나에만 쓸 수 있는 사전 인증 요청(PAR) URL과 서명된 토큰을 돌려줍니다.
+2. 브라우저가 PAR URL로 파일을 PUT 합니다. (OCI_EMULATOR_ROOT 지정 시 config/oci_fake_views.py가 대신 받음)
+3. finish(): 완료 요청(/upload/finalize/)에서 토큰을 확인하고, 실제로 올라간 객체의
+   크기/형식(HEAD + 앞부분 바이트)을 다시 검사한 뒤 MediaPost를 만듭니다.
+   PAR은 크기/형식을 강제하지 못하므로 검사에 실패한 객체는 여기서 바로 지웁니다.
+   같은 토큰으로 완료 요청이 동시에 와도(재전송, 더블클릭) 게시물은 하나만 만들어집니다.
+4. 완료 요청이 오지 않은 객체는 작업 큐의 'direct_upload_cleanup' 작업이 만료 후 정리합니다.
+"""
+import os
+import uuid
+import logging
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db import transaction
+from django.core.files.storage import default_storage
+from .models import MediaPost
+from .jobs import enqueue
+from .signals import UPLOADS, UPLOAD_BYTES, WEBTOON_EXTENSIONS, upload_type
+from . import metrics
+
+logger = logging.getLogger('django')
+
+TOKEN_SALT = 'photo.direct_upload'
+
+# 큰 영상은 PUT 자체가 오래 걸릴 수 있으므로, URL 만료 후에도 이 시간까지는 완료 요청을 받음
+FINALIZE_GRACE_SECONDS = 60 * 60
+
+DIRECT_UPLOADS = metrics.counter(
+    'photo_direct_uploads_total', "브라우저 직접 업로드 (started/finalized/rejected/expired)", ['outcome']
+)
+
+
+class DirectUploadError(Exception):
+    """직접 업로드를 진행할 수 없음 (status: 응답 코드)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def is_available(storage=default_storage):
+    """OCI(또는 로컬 대역)에 연결된 OCIStorage일 때만 사용 (그 밖에는 기존 폼 업로드)"""
+    return (
+        getattr(settings, 'DIRECT_UPLOAD_ENABLED', True)
+        and hasattr(storage, 'create_upload_url')
+        and getattr(storage, 'object_storage', None) is not None
+    )
+
+
+def _object_name(filename, to_original):
+    """추측할 수 없는 새 객체 이름 (웹툰 변환 대상은 처음부터 원본 보관 경로에)"""
+    ext = os.path.splitext(filename)[1].lower()
+    if not ext[1:].isalnum() or len(ext) > 10:
+        ext = ''
+    field = MediaPost._meta.get_field('original_file' if to_original else 'file')
+    return f"{field.upload_to}{uuid.uuid4().hex}{ext}"
+
+
+def start(user, data, storage=default_storage):
+    """
+    업로드 시작: PAR URL 발급 + 완료 요청에 쓸 토큰 생성
+
+    Parameters:
+    -----------
+    data : dict
+        DirectUploadForm.cleaned_data (title, description, apply_webtoon_filter, filename, content_type, size)
+
+    Returns:
+    --------
+    dict
+        upload_url, method, headers(브라우저가 PUT에 붙일 헤더), token, expires_in
+    """
+    to_original = (
+        data['apply_webtoon_filter']
+        and os.path.splitext(data['filename'])[1].lower() in WEBTOON_EXTENSIONS
+    )
+    name = _object_name(data['filename'], to_original)
+    expires_in = settings.DIRECT_UPLOAD_EXPIRES
+
+    upload_url, par_id = storage.create_upload_url(name, expires_in)
+    if not upload_url:
+        raise DirectUploadError("직접 업로드를 사용할 수 없습니다.", status=503)
+
+    token = signing.dumps({
+        'user': user.pk,
+        'name': name,
+        'par': par_id,
+        'size': data['size'],
+        'content_type': data['content_type'],
+        'original': to_original,
+        'title': data['title'],
+        'description': data['description'],
+        'webtoon': data['apply_webtoon_filter'],
+    }, salt=TOKEN_SALT, compress=True)
+
+    # 완료 요청이 끝내 오지 않으면 올라간 객체와 PAR을 정리
+    enqueue('direct_upload_cleanup', {'name': name, 'par_id': par_id}, delay=expires_in + FINALIZE_GRACE_SECONDS)
+    DIRECT_UPLOADS.inc(outcome='started')
+    logger.info(f"🔑 [Direct Upload] PAR 발급: {name} ({data['size']} bytes, {data['content_type']})")
+    return {
+        'upload_url': upload_url,
+        'method': 'PUT',
+        'headers': {'Content-Type': data['content_type']},
+        'token': token,
+        'expires_in': expires_in,
+    }
+
+
+def _sniff(head):
+    """파일 앞부분 바이트로 실제 종류 판별 -> 'image' / 'video' / None"""
+    if head.startswith(b'\xff\xd8\xff') or head.startswith(b'\x89PNG\r\n\x1a\n') or head[:4] == b'GIF8':
+        return 'image'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image'
+    if head[:4] == b'RIFF' and head[8:12] == b'AVI ':
+        return 'video'
+    if head[:4] == b'\x1a\x45\xdf\xa3':  # WebM / Matroska
+        return 'video'
+    if head[4:8] == b'ftyp':  # ISO BMFF: HEIC/AVIF는 이미지, 나머지(mp4, mov, 3gp ...)는 영상
+        brand = head[8:12]
+        return 'image' if brand in (b'heic', b'heix', b'mif1', b'msf1', b'avif') else 'video'
+    return None
+
+
+def _reject(storage, name, par_id, message):
+    storage.delete(name)
+    storage.delete_upload_url(par_id)
+    DIRECT_UPLOADS.inc(outcome='rejected')
+    logger.warning(f"🚫 [Direct Upload] 거부 후 삭제: {name} ({message})")
+    raise DirectUploadError(message)
+
+
+def _finalized(info):
+    return MediaPost.objects.filter(**{'original_file' if info['original'] else 'file': info['name']}).exists()
+
+
+def finish(user, token, storage=default_storage):
+    """업로드 완료: 올라간 객체를 검사하고 MediaPost 생성"""
+    try:
+        info = signing.loads(
+            token, salt=TOKEN_SALT, max_age=settings.DIRECT_UPLOAD_EXPIRES + FINALIZE_GRACE_SECONDS
+        )
+    except signing.SignatureExpired:
+        raise DirectUploadError("업로드 시간이 만료되었습니다. 다시 올려 주세요.")
+    except signing.BadSignature:
+        raise DirectUploadError("잘못된 업로드 요청입니다.")
+    if info['user'] != user.pk:
+        raise DirectUploadError("잘못된 업로드 요청입니다.", status=403)
+
+    name = info['name']
+    if _finalized(info):
+        raise DirectUploadError("이미 완료된 업로드입니다.", status=409)
+
+    headers = storage.head(name)
+    if headers is None:
+        raise DirectUploadError("업로드된 파일을 찾을 수 없습니다. 다시 올려 주세요.")
+
+    size = int(headers.get('content-length', 0))
+    content_type = (headers.get('content-type') or '').split(';')[0].strip().lower()
+    if size > settings.DIRECT_UPLOAD_MAX_BYTES or size != info['size']:
+        _reject(storage, name, info['par'], "업로드된 파일 크기가 요청과 다릅니다.")
+    if content_type != info['content_type']:
+        _reject(storage, name, info['par'], "업로드된 파일 형식이 요청과 다릅니다.")
+    if _sniff(storage.read_range(name, 0, 31)) != content_type.split('/')[0]:
+        _reject(storage, name, info['par'], "파일 내용이 사진/영상 형식이 아닙니다.")
+
+    # 더 이상 쓸 일이 없으니 바로 회수 (같은 URL로 내용을 바꿔치기하지 못하도록)
+    storage.delete_upload_url(info['par'])
+
+    post = MediaPost(
+        title=info['title'],
+        description=info['description'],
+        apply_webtoon_filter=info['webtoon'],
+        is_public=True,
+    )
+    if info['original']:
+        # 원본 보관 경로에 바로 올라왔으므로 이동 없이 변환 작업만 등록 (signals.enqueue_webtoon_conversion)
+        post.original_file = name
+        post.conversion_status = 'PROCESSING'
+        post._enqueue_webtoon = True
+    else:
+        post.file = name
+
+    # 확인 + 생성을 한 트랜잭션에서, 토큰 주인(사용자) 행을 잠가 같은 업로드의 동시 완료 요청을 하나씩 처리
+    with transaction.atomic():
+        get_user_model().objects.select_for_update().get(pk=user.pk)
+        if _finalized(info):
+            raise DirectUploadError("이미 완료된 업로드입니다.", status=409)
+        post.save()
+
+    kind = upload_type(name)
+    UPLOADS.inc(type=kind)
+    UPLOAD_BYTES.observe(size, type=kind)
+    DIRECT_UPLOADS.inc(outcome='finalized')
+    logger.info(f"✅ [Direct Upload] 게시물 생성: {post.title} ({name})")
+    return post
+
+
+def cleanup(name, par_id, storage=default_storage):
+    """완료 요청 없이 만료된 업로드 정리 (완료된 업로드면 아무것도 하지 않음)"""
+    if MediaPost.objects.filter(file=name).exists() or MediaPost.objects.filter(original_file=name).exists():
+        return
+    storage.delete_upload_url(par_id)
+    if storage.exists(name):
+        storage.delete(name)
+        DIRECT_UPLOADS.inc(outcome='expired')
+        logger.info(f"🧹 [Direct Upload] 완료되지 않은 업로드 삭제: {name}")
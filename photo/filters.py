@@ -1,107 +1,402 @@
 """
 [파일 경로] photo/filters.py
 [설명]
-이미지를 AI 한국 웹툰 스타일로 변환하는 필터 함수
-- Gemini Webtoon Filter: Google Gemini를 사용한 고품질 웹툰 스타일 변환
+이미지를 한국 웹툰 스타일로 변환하는 필터 함수
+- 변환 엔진(FilterEngine)은 교체 가능합니다. settings.WEBTOON_ENGINE으로 선택
+  - remote  : Fal AI (Seedream v4 Edit) 고품질 AI 변환
+  - local   : OpenCV 만화 효과 (네트워크 없이 CPU에서 1초 이내)
+  - fallback: remote를 먼저 시도하고 실패하면 local (기본값)
 """
 
 import os
 import base64
-from PIL import Image
+from django.conf import settings
+from PIL import Image, ImageOps
 from io import BytesIO
 import logging
 import json
-import requests
+import time
+import threading
 import fal_client
+from . import conversion_cache, http, metrics
 
 logger = logging.getLogger('django')
 
+# Fal AI 모델 (Seedream v4 Edit - 원본 이미지 편집 전용 모델)
+WEBTOON_MODEL_ID = "fal-ai/bytedance/seedream/v4/edit"
 
-def apply_webtoon_filter(image_data):
+WEBTOON_PROMPT = (
+    "Modern webtoon art style, high-quality digital 2D illustration, "
+    "sharp and clean line art, professional cel shading, "
+    "flat colors with vibrant and saturated tones. "
+    "Minimalist background, crisp edges, cinematic lighting. "
+    "No sketch lines, no screentones, no halftone patterns."
+)
+
+
+ENGINE_SECONDS = metrics.histogram(
+    'photo_webtoon_engine_seconds', "변환 엔진별 소요 시간(초)", ['engine', 'outcome']
+)
+
+
+class WebtoonConversionError(Exception):
+    """AI 웹툰 변환 실패 (작업 큐가 재시도 여부를 판단할 수 있도록 예외로 알림)"""
+
+
+class FilterEngine:
+    """
+    웹툰 변환 엔진 인터페이스
+    - name: 설정에서 고르는 이름
+    - model_id: 변환 결과 캐시 키에 들어가는 식별자 (결과물이 달라지면 바꿔야 함)
+    """
+    name = ''
+    model_id = ''
+
+    def convert(self, image_data, deadline=None):
+        """
+        bytes -> BytesIO(JPEG). 실패 시 WebtoonConversionError
+        deadline: time.monotonic() 기준 마감 시각 (외부 호출 제한 시간을 남은 시간 안으로 줄임)
+        """
+        raise NotImplementedError
+
+
+class FalEngine(FilterEngine):
+    name = 'remote'
+    model_id = WEBTOON_MODEL_ID
+
+    def convert(self, image_data, deadline=None):
+        return _convert_with_fal(image_data, deadline=deadline)
+
+
+class LocalCartoonEngine(FilterEngine):
+    """
+    OpenCV/NumPy 만화 효과 (AI 없이 로컬 CPU에서 처리)
+    1. 축소한 이미지에 양방향 필터(bilateral)를 반복 적용해 면을 평평하게
+    2. 적응형 임계값으로 굵은 윤곽선 추출
+    3. k-means로 뽑은 대표색으로 색상 단순화 (픽셀 배정은 NumPy 벡터 연산)
+    4. 윤곽선을 색 면 위에 합성
+    """
+    name = 'local'
+    model_id = 'local-opencv-cartoon-v1'
+
+    MAX_SIDE = 1600
+    COLORS = 12
+    SAMPLE_PIXELS = 20000
+
+    def convert(self, image_data, deadline=None):
+        import cv2
+        import numpy as np
+
+        try:
+            jpeg_data = prepare_input_image(image_data, max_side=self.MAX_SIDE, quality=95)
+        except Exception as e:
+            raise WebtoonConversionError(f"입력 이미지를 읽을 수 없습니다: {e}") from e
+        img = cv2.imdecode(np.frombuffer(jpeg_data, np.uint8), cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+        height, width = img.shape[:2]
+
+        # 1. 면 평탄화: 1/4 크기에서 bilateral 반복 후 1/2 크기로 (전체 크기보다 수십 배 빠름)
+        small = cv2.resize(img, (max(width // 4, 1), max(height // 4, 1)), interpolation=cv2.INTER_AREA)
+        for _ in range(5):
+            small = cv2.bilateralFilter(small, d=9, sigmaColor=9, sigmaSpace=7)
+        smooth = cv2.resize(small, (max(width // 2, 1), max(height // 2, 1)), interpolation=cv2.INTER_LINEAR)
+
+        # 2. 윤곽선 (흰 바탕 255 / 선 0)
+        gray = cv2.medianBlur(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), 7)
+        edges = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 9, 2)
+
+        # 3. 색상 단순화: 표본 픽셀로 대표색을 구하고 전체 픽셀을 가장 가까운 색으로
+        pixels = smooth.reshape(-1, 3).astype(np.float32)
+        rng = np.random.default_rng(0)
+        sample = pixels[rng.choice(len(pixels), min(self.SAMPLE_PIXELS, len(pixels)), replace=False)]
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0)
+        _, _, centers = cv2.kmeans(sample, self.COLORS, None, criteria, 1, cv2.KMEANS_PP_CENTERS)
+        distances = (
+            (pixels ** 2).sum(axis=1, keepdims=True)
+            - 2 * pixels @ centers.T
+            + (centers ** 2).sum(axis=1)
+        )
+        quantized = centers.astype(np.uint8)[distances.argmin(axis=1)].reshape(smooth.shape)
+        # 색 면은 절반 크기에서 계산해도 경계가 윤곽선에 덮이므로 그대로 확대
+        quantized = cv2.resize(quantized, (width, height), interpolation=cv2.INTER_NEAREST)
+
+        # 4. 합성
+        cartoon = cv2.bitwise_and(quantized, quantized, mask=edges)
+        ok, encoded = cv2.imencode('.jpg', cartoon, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        if not ok:
+            raise WebtoonConversionError("[Local] 결과 이미지 인코딩 실패")
+
+        logger.info(f"✅ [Local Webtoon] 로컬 만화 필터 적용 완료 ({width}x{height})")
+        return BytesIO(encoded.tobytes())
+
+
+ENGINES = {engine.name: engine for engine in (FalEngine(), LocalCartoonEngine())}
+
+
+def get_engines():
+    """설정(WEBTOON_ENGINE)에 따라 시도할 엔진 목록 (앞에서부터 차례로)"""
+    mode = getattr(settings, 'WEBTOON_ENGINE', 'fallback')
+    if mode == 'fallback':
+        return [ENGINES['remote'], ENGINES['local']]
+    if mode not in ENGINES:
+        raise WebtoonConversionError(f"알 수 없는 WEBTOON_ENGINE 설정입니다: {mode}")
+    return [ENGINES[mode]]
+
+
+def _time_left(deadline, limit):
+    """limit초와 마감까지 남은 시간 중 짧은 쪽 (마감이 지났으면 WebtoonConversionError)"""
+    if deadline is None:
+        return limit
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise WebtoonConversionError("작업 제한 시간 안에 변환을 마치지 못했습니다.")
+    return min(limit, left)
+
+
+def convert_to_webtoon(image_data, timeout=None):
     """
-    Google Gemini를 사용하여 이미지를 깔끔한 한국 웹툰/만화 스타일로 변환
+    이미지를 웹툰 스타일로 변환 (같은 입력이면 캐시된 결과를 즉시 반환)
+    설정된 엔진을 차례로 시도하며, 엔진별로 결과를 따로 캐시합니다.
 
     Parameters:
     -----------
     image_data : bytes
         원본 이미지 데이터
+    timeout : float
+        전체 제한 시간(초, 작업 큐의 남은 시간). AI 호출/결과 다운로드 대기 시간이 이 안으로 줄어듦
 
     Returns:
     --------
     BytesIO
         웹툰 스타일로 변환된 이미지
+
+    Raises:
+    -------
+    WebtoonConversionError
+        변환 실패 (실패 결과는 캐시하지 않음)
     """
+    engines = get_engines()
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    if not isinstance(image_data, bytes):
+        return engines[0].convert(image_data, deadline=deadline)
+
+    last_error = None
+    for engine in engines:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        key = conversion_cache.make_key(image_data, WEBTOON_PROMPT, engine.model_id)
+        cached = conversion_cache.get(key)
+        if cached is not None:
+            ENGINE_SECONDS.observe(0, engine=engine.name, outcome='cache_hit')
+            return BytesIO(cached)
+
+        started = time.monotonic()
+        try:
+            output = engine.convert(image_data, deadline=deadline)
+        except Exception as e:
+            ENGINE_SECONDS.observe(time.monotonic() - started, engine=engine.name, outcome='error')
+            last_error = e
+            logger.warning(f"⚠️ [Webtoon Engine] {engine.name} 엔진 변환 실패: {e}")
+            continue
+
+        ENGINE_SECONDS.observe(time.monotonic() - started, engine=engine.name, outcome='success')
+        data = output.getvalue()
+        try:
+            conversion_cache.put(key, data)
+        except Exception as e:
+            logger.warning(f"⚠️ [Webtoon Cache] 캐시 저장 실패 (변환 결과는 정상 사용): {e}")
+        return BytesIO(data)
+
+    if last_error is None:
+        raise WebtoonConversionError("작업 제한 시간 안에 변환을 마치지 못했습니다.")
+    if isinstance(last_error, WebtoonConversionError):
+        raise last_error
+    raise WebtoonConversionError(f"모든 변환 엔진이 실패했습니다: {last_error}") from last_error
+
+
+def prepare_input_image(image_data, max_side=None, quality=None):
+    """
+    AI 모델에 보낼 입력 이미지 전처리
+    1. EXIF 회전 정보 적용 (휴대폰 사진이 눕지 않도록)
+    2. 긴 변을 max_side 이하로 축소
+    3. EXIF/GPS 등 메타데이터 제거 (새로 인코딩하면서 버림)
+    4. 품질을 조정한 프로그레시브 JPEG로 인코딩
+
+    Parameters:
+    -----------
+    image_data : bytes | PIL.Image
+        원본 이미지
+
+    Returns:
+    --------
+    bytes
+        전송용 JPEG 데이터
+    """
+    # 모델이 실제로 활용하는 해상도 이상은 전송 용량과 시간만 늘림
+    max_side = max_side or getattr(settings, 'WEBTOON_INPUT_MAX_SIDE', 2048)
+    quality = quality or getattr(settings, 'WEBTOON_INPUT_QUALITY', 85)
+
+    pil_image = Image.open(BytesIO(image_data)) if isinstance(image_data, bytes) else image_data
+    if pil_image.format == 'JPEG' and max(pil_image.size) > max_side:
+        # JPEG는 디코딩 단계에서 1/2, 1/4 ... 크기로 바로 읽어 전체 해상도 디코딩을 피함
+        ratio = max_side / max(pil_image.size)
+        pil_image.draft('RGB', (int(pil_image.width * ratio), int(pil_image.height * ratio)))
+    pil_image = ImageOps.exif_transpose(pil_image)
+
+    # 투명 배경(PNG 등)은 흰 배경으로 합성 (검게 변하는 것 방지)
+    if pil_image.mode in ('RGBA', 'LA', 'P'):
+        pil_image = pil_image.convert('RGBA')
+        background = Image.new('RGB', pil_image.size, (255, 255, 255))
+        background.paste(pil_image, mask=pil_image.getchannel('A'))
+        pil_image = background
+    elif pil_image.mode != 'RGB':
+        pil_image = pil_image.convert('RGB')
+
+    if max(pil_image.size) > max_side:
+        pil_image = pil_image.copy()
+        pil_image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    buffered = BytesIO()
+    pil_image.save(buffered, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return buffered.getvalue()
+
+
+_fal_client = None
+_fal_client_key = None
+_fal_client_lock = threading.Lock()
+
+
+def _get_fal_client(api_key):
+    """API 키별 공용 Fal 클라이언트 (내부 HTTP 연결을 요청마다 새로 만들지 않도록 재사용)"""
+    global _fal_client, _fal_client_key
+    with _fal_client_lock:
+        if _fal_client is None or _fal_client_key != api_key:
+            _fal_client = fal_client.SyncClient(key=api_key, default_timeout=getattr(settings, 'FAL_TIMEOUT', 120))
+            _fal_client_key = api_key
+        return _fal_client
+
+
+def _fal_image_url(client, jpeg_data):
+    """
+    전처리된 이미지를 Fal에 넘길 URL로 변환
+    - upload (기본): Fal 스토리지에 한 번 올리고 짧은 URL만 요청 본문에 포함
+    - data_url: base64 data URL로 요청 본문에 직접 포함 (업로드 실패 시에도 사용)
+    """
+    transport = getattr(settings, 'WEBTOON_INPUT_TRANSPORT', 'upload')
+    if transport == 'upload':
+        try:
+            return http.call('fal', client.upload, jpeg_data, 'image/jpeg')
+        except http.CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ [Fal Webtoon] 입력 이미지 업로드 실패, data URL로 전송합니다: {e}")
+
+    img_b64_str = base64.b64encode(jpeg_data).decode("utf-8")
+    return f"data:image/jpeg;base64,{img_b64_str}"
+
+
+def _convert_with_fal(image_data, deadline=None):
+    """
+    Fal AI(Seedream v4 Edit)로 이미지를 깔끔한 한국 웹툰/만화 스타일로 변환
+
+    Parameters:
+    -----------
+    image_data : bytes
+        원본 이미지 데이터
+    deadline : float
+        time.monotonic() 기준 마감 시각 (AI 호출/다운로드 제한 시간을 남은 시간으로 줄임)
+
+    Returns:
+    --------
+    BytesIO
+        웹툰 스타일로 변환된 이미지
+
+    Raises:
+    -------
+    WebtoonConversionError
+        API 키 없음, 요청 실패, 결과 이미지 없음 등
+    """
+    logger.info("🎨 [Fal Webtoon] AI 웹툰 변환 시작")
+
+    # 1. API 키 확인 및 설정
+    api_key = os.getenv('FAL_API_KEY')
+    if not api_key:
+        raise WebtoonConversionError("FAL_API_KEY가 없습니다.")
+
+    client = _get_fal_client(api_key)
+
+    # 2. 원본 이미지 전처리 (회전 보정 + 축소 + 메타데이터 제거) 후 전송용 URL 준비
+    try:
+        jpeg_data = prepare_input_image(image_data)
+    except Exception as e:
+        raise WebtoonConversionError(f"입력 이미지를 읽을 수 없습니다: {e}") from e
+
+    original_size = len(image_data) if isinstance(image_data, bytes) else 0
+    logger.info(f"📐 [Fal Webtoon] 입력 전처리: {original_size / 1024:.0f}KB -> {len(jpeg_data) / 1024:.0f}KB")
+
+    # 3. Fal AI API 호출 (Seedream v4 Edit - 원본 이미지 편집 전용 모델)
+    # - 전체 대기 시간은 FAL_TIMEOUT초(작업 마감이 더 가까우면 남은 시간)로 제한,
+    #   연속 실패 시 서킷 브레이커가 바로 실패시켜 local 엔진으로 넘어감
     try:
-        logger.info("🎨 [Fal Webtoon] AI 웹툰 변환 시작")
-
-        # 1. API 키 확인 및 설정
-        api_key = os.getenv('FAL_API_KEY')
-        if not api_key:
-            logger.error("❌ FAL_API_KEY가 없습니다.")
-            return get_original_image_bytes(image_data)
-        
-        # fal_client 내부적으로 FAL_KEY 환경변수를 사용
-        os.environ['FAL_KEY'] = api_key
-
-        # 2. 원본 이미지 로드 및 Base64 인코딩 준비
-        if isinstance(image_data, bytes):
-            pil_image = Image.open(BytesIO(image_data))
-        else:
-            pil_image = image_data
-
-        if pil_image.mode != 'RGB':
-            pil_image = pil_image.convert('RGB')
-
-        buffered = BytesIO()
-        pil_image.save(buffered, format="JPEG")
-        img_b64_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
-        
-        # 3. 프롬프트 설정
-        prompt = (
-            "Modern webtoon art style, high-quality digital 2D illustration, "
-            "sharp and clean line art, professional cel shading, "
-            "flat colors with vibrant and saturated tones. "
-            "Minimalist background, crisp edges, cinematic lighting. "
-            "No sketch lines, no screentones, no halftone patterns."
+        image_url = _fal_image_url(client, jpeg_data)
+        timeout = _time_left(deadline, getattr(settings, 'FAL_TIMEOUT', 120))
+        result = http.call(
+            'fal', client.subscribe,
+            WEBTOON_MODEL_ID,
+            arguments={
+                "prompt": WEBTOON_PROMPT,
+                "image_urls": [image_url]
+            },
+            client_timeout=timeout,
         )
+    except http.CircuitOpenError as circuit_error:
+        raise WebtoonConversionError(f"[Fal] {circuit_error}") from circuit_error
+    except WebtoonConversionError:
+        raise
+    except Exception as fal_error:
+        raise WebtoonConversionError(f"[Fal] 요청 오류 발생: {fal_error}") from fal_error
+
+    if not result.get('images'):
+        raise WebtoonConversionError(f"[Fal] 올바른 이미지가 반환되지 않았습니다: {json.dumps(result)[:200]}")
+
+    img_url = result['images'][0].get('url')
+    if not img_url:
+        raise WebtoonConversionError("[Fal] 응답 이미지 URL을 찾을 수 없습니다.")
+
+    # 결과 이미지 다운로드 (공용 연결 풀 + 제한 시간 + 재시도)
+    provider = http.get_provider('fal')
+    try:
+        img_response = http.get('fal', img_url, timeout=(
+            _time_left(deadline, provider.connect_timeout), _time_left(deadline, provider.read_timeout)
+        ))
+    except WebtoonConversionError:
+        raise
+    except Exception as download_error:
+        raise WebtoonConversionError(f"[Fal] 이미지 다운로드 오류: {download_error}") from download_error
+    if img_response.status_code != 200:
+        raise WebtoonConversionError(f"[Fal] 이미지 다운로드 실패: {img_response.status_code}")
+
+    logger.info("✅ [Fal Webtoon] 웹툰 변환 완료 (Seedream v4.5)")
+    return BytesIO(img_response.content)
 
-        # 4. Fal AI API 호출 (Seedream v4 Edit - 원본 이미지 편집 전용 모델)
-        try:
-            handler = fal_client.submit(
-                "fal-ai/bytedance/seedream/v4/edit",
-                arguments={
-                    "prompt": prompt,
-                    "image_urls": [f"data:image/jpeg;base64,{img_b64_str}"]
-                }
-            )
-            
-            result = handler.get()
-            
-            if 'images' in result and len(result['images']) > 0:
-                img_url = result['images'][0].get('url')
-                if img_url:
-                    # 결과 이미지 다운로드
-                    img_response = requests.get(img_url)
-                    if img_response.status_code == 200:
-                        output = BytesIO(img_response.content)
-                        logger.info("✅ [Fal Webtoon] 웹툰 변환 완료 (Seedream v4.5)")
-                        return output
-                    else:
-                        logger.error(f"❌ [Fal] 이미지 다운로드 실패: {img_response.status_code}")
-                        return get_original_image_bytes(image_data)
-                else:
-                    logger.warning("⚠️ [Fal] 응답 이미지 URL을 찾을 수 없습니다.")
-                    return get_original_image_bytes(image_data)
-            else:
-                logger.warning(f"⚠️ [Fal] 올바른 이미지가 반환되지 않았습니다: {json.dumps(result)[:200]}")
-                return get_original_image_bytes(image_data)
-
-        except Exception as fal_error:
-            logger.error(f"❌ [Fal] 요청 오류 발생: {str(fal_error)}")
-            return get_original_image_bytes(image_data)
 
+def apply_webtoon_filter(image_data):
+    """
+    웹툰 변환을 시도하고, 실패하면 원본 이미지를 그대로 돌려줍니다. (예전 동작 호환용)
+
+    Parameters:
+    -----------
+    image_data : bytes
+        원본 이미지 데이터
+
+    Returns:
+    --------
+    BytesIO
+        웹툰 스타일로 변환된 이미지 (실패 시 원본)
+    """
+    try:
+        return convert_to_webtoon(image_data)
     except Exception as e:
-        logger.error(f"❌ [Fal Webtoon] 전체 오류 발생: {str(e)}")
+        logger.error(f"❌ [Fal Webtoon] 변환 실패, 원본을 사용합니다: {e}")
         return get_original_image_bytes(image_data)
 
 def get_original_image_bytes(image_data):
@@ -1,4 +1,5 @@
 from django import forms
+from django.conf import settings
 from .models import MediaPost, TextPost, CodeLink
 
 class MediaPostForm(forms.ModelForm):
@@ -12,6 +13,37 @@ class MediaPostForm(forms.ModelForm):
             'apply_webtoon_filter': forms.CheckboxInput(attrs={'class': 'form-check-input'})
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 모델에서는 변환 중 빈 값을 허용하지만, 업로드 폼에서는 파일이 필수
+        self.fields['file'].required = True
+
+class DirectUploadForm(forms.ModelForm):
+    """
+    브라우저 직접 업로드 시작 요청 (photo/direct_upload.py)
+    파일 내용 대신 이름/형식/크기만 받아 먼저 검사합니다. (큰 파일을 다 올린 뒤에 거절되지 않도록)
+    """
+    filename = forms.CharField(max_length=255)
+    content_type = forms.CharField(max_length=100)
+    size = forms.IntegerField(min_value=1)
+
+    class Meta:
+        model = MediaPost
+        fields = ['title', 'description', 'apply_webtoon_filter']
+
+    def clean_content_type(self):
+        content_type = self.cleaned_data['content_type'].split(';')[0].strip().lower()
+        if content_type not in settings.DIRECT_UPLOAD_CONTENT_TYPES:
+            raise forms.ValidationError("사진 또는 영상 파일만 올릴 수 있습니다.")
+        return content_type
+
+    def clean_size(self):
+        size = self.cleaned_data['size']
+        max_bytes = settings.DIRECT_UPLOAD_MAX_BYTES
+        if size > max_bytes:
+            raise forms.ValidationError(f"파일이 너무 큽니다. (최대 {max_bytes // (1024 * 1024)}MB)")
+        return size
+
 class TextPostForm(forms.ModelForm):
     class Meta:
         model = TextPost
@@ -0,0 +1,116 @@
+"""
+[파일 경로] photo/fragment_cache.py
+[설명]
+메인 페이지 HTML 조각 캐시입니다. (백엔드는 settings.CACHES - 기본 프로세스 메모리, 파일/Redis 선택)
+1. 버전 번호 방식: 캐시 키에 '구역 버전'을 넣고, 내용이 바뀌면 signals.py에서 버전만 올립니다.
+   (예전 키를 찾아 지울 필요 없이 다음 요청부터 새 키를 쓰고, 예전 항목은 만료/LRU로 정리)
+   - 'links' / 'text' / 'code' : 공식 링크, 게시판, 자료실 목록 조각 (페이지 단위)
+   - 'post:<id>'               : 갤러리 카드 한 장 (게시물 수정/댓글 변경 시)
+2. 사용자마다 다른 부분(좋아요 눌렀는지 여부)은 캐시에 넣지 않고, 카드의 빈 자리(LIKE_BUTTON_SLOT)를
+   요청마다 채웁니다.
+"""
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+# 갤러리 카드 안에서 요청마다 좋아요 버튼으로 바뀌는 자리
+LIKE_BUTTON_SLOT = '<!-- like-button -->'
+
+
+def _cache():
+    return caches[getattr(settings, 'FRAGMENT_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 3600)
+
+
+def _version_key(scope):
+    return f"photo:ver:{scope}"
+
+
+def _new_version():
+    # 버전 키가 (재시작/LRU로) 사라졌다가 다시 생겨도 예전 조각과 겹치지 않도록 시각 기반 값으로 시작
+    return int(time.time() * 1000)
+
+
+def get_versions(scopes):
+    """여러 구역의 현재 버전을 한 번에 조회 {scope: version}"""
+    cache = _cache()
+    keys = {scope: _version_key(scope) for scope in scopes}
+    found = cache.get_many(list(keys.values()))
+
+    versions = {}
+    missing = {}
+    for scope, key in keys.items():
+        if key in found:
+            versions[scope] = found[key]
+        else:
+            missing[key] = versions[scope] = _new_version()
+    if missing:
+        cache.set_many(missing, None)
+    return versions
+
+
+def get_version(scope):
+    return get_versions([scope])[scope]
+
+
+def bump(*scopes):
+    """구역 버전 올리기 (해당 구역 조각 무효화)"""
+    cache = _cache()
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), None)
+
+
+def get_or_render(scope, key, render):
+    """
+    구역 버전이 들어간 키로 조회, 없으면 render()를 호출해 저장
+    render()의 반환값은 pickle 가능한 값 (HTML 문자열, (html, 다음 커서) 등)
+    """
+    cache = _cache()
+    full_key = f"photo:frag:{scope}:{get_version(scope)}:{key}"
+    value = cache.get(full_key)
+    if value is None:
+        value = render()
+        cache.set(full_key, value, _timeout())
+    return value
+
+
+def get_or_render_many(items, key_func, render_many):
+    """
+    카드처럼 항목마다 따로 캐시하는 조각을 한 번에 처리 (캐시 왕복 3회 이내)
+
+    Parameters:
+    -----------
+    items : list
+        (scope, 항목) 목록. 구역 버전이 키에 들어갑니다.
+    key_func : callable
+        항목 -> 키 (버전 외에 구분이 필요한 값)
+    render_many : callable
+        캐시에 없는 항목 목록 -> {항목 pk: html}
+
+    Returns:
+    --------
+    dict
+        {항목 pk: html}
+    """
+    cache = _cache()
+    versions = get_versions([scope for scope, _ in items])
+    keys = {
+        obj.pk: f"photo:frag:{scope}:{versions[scope]}:{key_func(obj)}"
+        for scope, obj in items
+    }
+    found = cache.get_many(list(keys.values()))
+
+    result = {pk: found[key] for pk, key in keys.items() if key in found}
+    missing = [obj for _, obj in items if obj.pk not in result]
+    if missing:
+        rendered = render_many(missing)
+        cache.set_many({keys[pk]: html for pk, html in rendered.items()}, _timeout())
+        result.update(rendered)
+    return result
@@ -0,0 +1,252 @@
+"""
+[파일 경로] photo/http.py
+[설명]
+외부 AI 서비스(Fal, Gemini, OpenAI) 호출 공용 클라이언트입니다.
+1. 서비스별로 연결을 재사용하는 세션(keep-alive 연결 풀)을 하나씩 둡니다.
+2. 모든 요청에 연결/응답 제한 시간이 있어 상대 서버가 멈춰도 워커가 묶이지 않습니다.
+3. 연결 오류, 429, 5xx 응답은 지터가 들어간 지수 백오프로 몇 번 재시도합니다.
+   POST처럼 멱등이 아닌 요청은 기본으로 재시도하지 않습니다. (응답만 늦었을 뿐 상대 서버는 처리했을 수 있어
+   유료 이미지 생성이 두 번 실행/과금될 수 있음 - 안전한 호출만 retry=True로 지정)
+4. 서킷 브레이커: 연속 실패가 쌓이면 일정 시간 동안 바로 CircuitOpenError를 내서
+   호출 측이 기다리지 않고 대체 경로(로컬 변환 등)로 넘어가게 합니다.
+5. 서비스별 소요 시간은 photo/metrics.py 히스토그램(outbound_request_seconds)에 기록됩니다.
+   (웹 요청 안에서 호출되면 photo/perf.py 요청 측정값의 'ai' 항목에도 더해짐)
+Django 없이 실행하는 테스트 스크립트(test_openai.py 등)에서도 기본값으로 동작합니다.
+"""
+import time
+import random
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from . import metrics, perf
+
+logger = logging.getLogger('django')
+
+# 재시도할 응답 코드 (요청 한도 초과 / 서버 일시 오류)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# 같은 요청을 여러 번 보내도 결과가 같은 메서드 (기본 재시도 대상)
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+REQUEST_SECONDS = metrics.histogram(
+    'outbound_request_seconds', "외부 AI 서비스 호출 소요 시간(초)", ['provider', 'outcome']
+)
+REQUEST_ERRORS = metrics.counter(
+    'outbound_request_errors_total', "외부 AI 서비스 호출 실패 수", ['provider', 'reason']
+)
+
+
+def _observe(provider_name, outcome, started):
+    seconds = time.monotonic() - started
+    REQUEST_SECONDS.observe(seconds, provider=provider_name, outcome=outcome)
+    perf.record('ai', seconds)
+
+
+def _setting(name, default):
+    """Django 설정값 (설정 없이 실행되는 스크립트에서는 기본값)"""
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 호출하지 않고 바로 실패"""
+
+
+class CircuitBreaker:
+    """
+    연속 실패 failure_threshold회 -> OPEN (reset_timeout초 동안 호출 차단)
+    -> 시간이 지나면 HALF_OPEN (시험 호출 1건 허용) -> 성공하면 CLOSED, 실패하면 다시 OPEN
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return 'CLOSED'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'HALF_OPEN'
+        return 'OPEN'
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == 'OPEN' or (state == 'HALF_OPEN' and self._trial_running):
+                REQUEST_ERRORS.inc(provider=self.name, reason='circuit_open')
+                raise CircuitOpenError(f"[{self.name}] 최근 연속 실패로 호출을 잠시 중단했습니다.")
+            if state == 'HALF_OPEN':
+                self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"🔌 [Circuit] {self.name} 정상화, 호출을 재개합니다.")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                logger.warning(f"🔌 [Circuit] {self.name} 연속 {self._failures}회 실패, {self.reset_timeout}초간 호출 차단")
+
+    def release_trial(self):
+        """성공/실패를 기록하지 못하고 끝난 호출(예상 밖의 예외)도 시험 호출 자리를 돌려줌 (HALF_OPEN에 갇히지 않도록)"""
+        with self._lock:
+            self._trial_running = False
+
+
+class Provider:
+    """외부 서비스 하나의 호출 정책 (제한 시간, 재시도, 서킷 브레이커, 연결 풀)"""
+
+    def __init__(self, name, connect_timeout=None, read_timeout=None, max_retries=None):
+        self.name = name
+        self.connect_timeout = connect_timeout or _setting('OUTBOUND_CONNECT_TIMEOUT', 5)
+        self.read_timeout = read_timeout or _setting('OUTBOUND_READ_TIMEOUT', 60)
+        self.max_retries = _setting('OUTBOUND_MAX_RETRIES', 2) if max_retries is None else max_retries
+        self.breaker = CircuitBreaker(
+            name,
+            failure_threshold=_setting('OUTBOUND_CIRCUIT_THRESHOLD', 5),
+            reset_timeout=_setting('OUTBOUND_CIRCUIT_RESET', 60),
+        )
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """keep-alive 연결 풀을 가진 공용 세션 (처음 사용할 때 생성)"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    pool_size = _setting('OUTBOUND_POOL_SIZE', 10)
+                    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+
+def backoff_delay(attempt, base=None, cap=None):
+    """재시도 대기 시간: 0 ~ min(cap, base * 2^attempt) 사이 무작위 (full jitter)"""
+    base = base or _setting('OUTBOUND_RETRY_BASE_DELAY', 0.5)
+    cap = cap or _setting('OUTBOUND_RETRY_MAX_DELAY', 8)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+PROVIDERS = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name):
+    with _providers_lock:
+        provider = PROVIDERS.get(name)
+        if provider is None:
+            provider = PROVIDERS[name] = Provider(name)
+        return provider
+
+
+def request(provider_name, method, url, retry=None, **kwargs):
+    """
+    외부 서비스 HTTP 요청 (제한 시간 + 재시도 + 서킷 브레이커 + 소요 시간 기록)
+
+    retry : bool
+        실패 시 재시도 여부 (기본: GET 등 멱등 메서드만, POST는 중복 실행돼도 안전할 때만 True)
+
+    Returns:
+    --------
+    requests.Response
+        마지막 응답 (재시도 후에도 4xx/5xx면 그대로 반환, 상태 코드 확인은 호출 측에서)
+
+    Raises:
+    -------
+    CircuitOpenError
+        서킷 브레이커가 열려 있음
+    requests.RequestException
+        재시도 후에도 연결/시간 초과 오류
+    """
+    provider = get_provider(provider_name)
+    kwargs.setdefault('timeout', (provider.connect_timeout, provider.read_timeout))
+    if retry is None:
+        retry = method.upper() in IDEMPOTENT_METHODS
+    max_retries = provider.max_retries if retry else 0
+    provider.breaker.before_call()
+    try:
+        return _send(provider, method, url, max_retries, kwargs)
+    finally:
+        provider.breaker.release_trial()
+
+
+def _send(provider, method, url, max_retries, kwargs):
+    provider_name = provider.name
+    attempt = 0
+    while True:
+        started = time.monotonic()
+        try:
+            response = provider.session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            _observe(provider_name, 'error', started)
+            REQUEST_ERRORS.inc(provider=provider_name, reason=type(e).__name__)
+            if attempt >= max_retries:
+                provider.breaker.record_failure()
+                raise
+        else:
+            outcome = 'success' if response.status_code < 400 else str(response.status_code)
+            _observe(provider_name, outcome, started)
+            if response.status_code not in RETRY_STATUS_CODES:
+                provider.breaker.record_success()
+                return response
+            REQUEST_ERRORS.inc(provider=provider_name, reason=f"http_{response.status_code}")
+            if attempt >= max_retries:
+                provider.breaker.record_failure()
+                return response
+
+        delay = backoff_delay(attempt)
+        attempt += 1
+        logger.warning(f"🔁 [HTTP] {provider_name} {method} 재시도 {attempt}/{max_retries} ({delay:.1f}초 후)")
+        time.sleep(delay)
+
+
+def get(provider_name, url, **kwargs):
+    return request(provider_name, 'GET', url, **kwargs)
+
+
+def post(provider_name, url, retry=False, **kwargs):
+    """POST는 기본으로 재시도하지 않음 (멱등 키를 쓰는 등 중복 실행이 안전할 때만 retry=True)"""
+    return request(provider_name, 'POST', url, retry=retry, **kwargs)
+
+
+def call(provider_name, func, *args, **kwargs):
+    """
+    SDK 호출(fal_client 등)을 서킷 브레이커 + 소요 시간 기록으로 감싸서 실행
+    (재시도는 하지 않음 - SDK 자체 재시도/작업 큐 재시도에 맡김)
+    """
+    provider = get_provider(provider_name)
+    provider.breaker.before_call()
+    started = time.monotonic()
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        _observe(provider_name, 'error', started)
+        REQUEST_ERRORS.inc(provider=provider_name, reason=type(e).__name__)
+        provider.breaker.record_failure()
+        raise
+    finally:
+        provider.breaker.release_trial()
+    _observe(provider_name, 'success', started)
+    provider.breaker.record_success()
+    return result
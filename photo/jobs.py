@@ -0,0 +1,245 @@
+"""
+[파일 경로] photo/jobs.py
+[설명]
+DB 기반 백그라운드 작업 큐입니다. (별도 브로커 없이 Job 테이블만 사용)
+1. enqueue(): 요청 처리 중에는 작업을 등록만 하고 바로 응답합니다.
+2. run_worker(): `python manage.py run_jobs` 워커가 작업을 가져가 스레드 풀에서 동시에 처리합니다.
+3. 실패한 작업은 지수 백오프(+지터)로 재시도하고, 최대 횟수를 넘기면 FAILED로 남깁니다.
+4. 작업마다 제한 시간(deadline)이 있어, 처리 함수가 ctx.check()로 초과 여부를 확인합니다.
+5. 워커는 처리 중인 작업의 생존 신호(heartbeat_at)를 주기적으로 갱신합니다.
+   신호가 JOB_HEARTBEAT_TIMEOUT 이상 끊긴 작업(워커 프로세스가 죽음)만 다른 워커가 다시 가져가므로,
+   오래 걸리는 작업이 살아 있는 워커와 다른 워커에서 동시에 실행되지 않습니다.
+   결과 기록과 ctx.check()는 작업을 가져간 워커(locked_by)가 그대로일 때만 통과합니다.
+"""
+import os
+import time
+import uuid
+import socket
+import random
+import logging
+import traceback
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Job
+
+logger = logging.getLogger('django')
+
+# 작업 종류 -> {'handler': 처리 함수, 'on_failure': 최종 실패 시 호출할 함수}
+HANDLERS = {}
+
+
+class JobTimeout(Exception):
+    """작업 제한 시간 초과"""
+
+
+class JobContext:
+    """처리 함수에 전달되는 실행 정보 (제한 시간 확인용)"""
+
+    def __init__(self, job, timeout):
+        self.job = job
+        self.deadline = time.monotonic() + timeout
+
+    @property
+    def remaining(self):
+        return max(self.deadline - time.monotonic(), 0)
+
+    def check(self):
+        """결과를 반영하기 직전에 호출: 제한 시간이 지났거나 다른 워커가 작업을 가져갔으면 JobTimeout"""
+        if time.monotonic() > self.deadline:
+            raise JobTimeout(f"작업 제한 시간 초과: {self.job}")
+        if not _owned(self.job).exists():
+            raise JobTimeout(f"다른 워커가 작업을 가져갔습니다: {self.job}")
+
+
+def new_worker_id():
+    """워커 식별자 (호스트:pid:무작위, 같은 pid가 다시 쓰여도 겹치지 않음)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _owned(job):
+    """이 워커가 가져간 상태 그대로인 작업만 (다른 워커가 다시 가져갔으면 빈 결과)"""
+    return Job.objects.filter(pk=job.pk, status='RUNNING', locked_by=job.locked_by)
+
+
+def job_handler(kind, on_failure=None):
+    """
+    작업 처리 함수 등록 데코레이터
+
+    @job_handler('webtoon', on_failure=mark_failed)
+    def convert(payload, ctx): ...
+    """
+    def decorator(func):
+        HANDLERS[kind] = {'handler': func, 'on_failure': on_failure}
+        return func
+    return decorator
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(kind, payload=None, delay=0, max_attempts=None):
+    """작업 등록 (호출한 쪽의 트랜잭션과 함께 커밋됩니다)"""
+    job = Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or _setting('JOB_MAX_ATTEMPTS', 5),
+    )
+    logger.info(f"📥 [Job Queue] 작업 등록: {job}")
+    return job
+
+
+def backoff_delay(attempts):
+    """재시도 대기 시간: base * 2^(n-1) (상한 있음) + 최대 25% 지터"""
+    base = _setting('JOB_RETRY_BASE_DELAY', 10)
+    cap = _setting('JOB_RETRY_MAX_DELAY', 600)
+    delay = min(base * (2 ** max(attempts - 1, 0)), cap)
+    return delay + random.uniform(0, delay * 0.25)
+
+
+def claim_jobs(limit, worker_id=None):
+    """
+    실행할 차례인 작업을 최대 limit개 가져옵니다.
+    여러 워커가 동시에 돌아도 같은 작업을 두 번 가져가지 않도록
+    '상태가 그대로일 때만 UPDATE' (compare-and-set) 방식으로 선점합니다.
+    처리 중(RUNNING)인 작업은 생존 신호가 끊긴 경우(워커가 죽음)에만 다시 가져갑니다.
+    """
+    worker_id = worker_id or new_worker_id()
+    now = timezone.now()
+    dead_before = now - timedelta(seconds=_setting('JOB_HEARTBEAT_TIMEOUT', 60))
+
+    candidates = (
+        Job.objects
+        .filter(
+            Q(status='PENDING', run_after__lte=now)
+            | Q(status='RUNNING', heartbeat_at__lt=dead_before)
+            # 생존 신호 도입 전에 가져간 작업
+            | Q(status='RUNNING', heartbeat_at=None, locked_at__lt=dead_before)
+        )
+        .order_by('run_after', 'id')
+        .values_list('id', 'status', 'locked_by', 'heartbeat_at')[:limit * 2]
+    )
+
+    claimed = []
+    for job_id, status, locked_by, heartbeat_at in candidates:
+        if len(claimed) >= limit:
+            break
+        if status == 'RUNNING':
+            logger.warning(f"🧟 [Job Queue] 생존 신호가 끊긴 작업을 다시 가져옵니다: #{job_id} (이전 워커 {locked_by or '?'})")
+        updated = Job.objects.filter(pk=job_id, status=status, locked_by=locked_by, heartbeat_at=heartbeat_at).update(
+            status='RUNNING', locked_at=now, locked_by=worker_id, heartbeat_at=now, attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(Job.objects.get(pk=job_id))
+    return claimed
+
+
+def heartbeat(jobs, worker_id):
+    """처리 중인 작업의 생존 신호 갱신 (이 워커가 가진 작업만)"""
+    if not jobs:
+        return 0
+    return Job.objects.filter(pk__in=[job.pk for job in jobs], status='RUNNING', locked_by=worker_id).update(
+        heartbeat_at=timezone.now()
+    )
+
+
+def run_job(job):
+    """작업 하나 실행 + 결과(완료/재시도/실패) 기록. 워커 스레드에서 호출됩니다."""
+    entry = HANDLERS.get(job.kind)
+    try:
+        if entry is None:
+            raise LookupError(f"등록되지 않은 작업 종류입니다: {job.kind}")
+
+        ctx = JobContext(job, _setting('JOB_TIMEOUT', 300))
+        started = time.monotonic()
+        entry['handler'](job.payload, ctx)
+
+        if _owned(job).update(status='DONE', last_error='', locked_by='', updated_at=timezone.now()):
+            logger.info(f"✅ [Job Done] {job} ({time.monotonic() - started:.1f}s)")
+        else:
+            logger.warning(f"⚠️ [Job Done] {job} 완료했지만 이미 다른 워커가 가져간 작업이라 결과를 기록하지 않음")
+
+    except Exception as e:
+        error = f"{e}\n{traceback.format_exc(limit=5)}"
+        if not _owned(job).exists():
+            # 다른 워커가 이어받은 작업: 그쪽 결과를 덮어쓰거나 실패 처리를 두 번 하지 않음
+            logger.warning(f"⚠️ [Job Lost] {job} 다른 워커가 가져간 작업이라 실패를 기록하지 않음: {e}")
+        elif job.attempts < job.max_attempts and entry is not None:
+            delay = backoff_delay(job.attempts)
+            _owned(job).update(
+                status='PENDING', locked_at=None, locked_by='', heartbeat_at=None, last_error=error,
+                run_after=timezone.now() + timedelta(seconds=delay), updated_at=timezone.now(),
+            )
+            logger.warning(f"🔁 [Job Retry] {job} {job.attempts}/{job.max_attempts}회 실패, {delay:.0f}초 후 재시도: {e}")
+        else:
+            _owned(job).update(status='FAILED', last_error=error, locked_by='', updated_at=timezone.now())
+            logger.error(f"❌ [Job Failed] {job} 최종 실패: {e}")
+            if entry and entry['on_failure']:
+                try:
+                    entry['on_failure'](job.payload)
+                except Exception as hook_error:
+                    logger.error(f"❌ [Job Failed] 실패 처리 중 오류: {hook_error}")
+    finally:
+        # 워커 스레드마다 DB 연결이 열리므로 작업이 끝나면 정리
+        connection.close()
+
+
+def run_worker(concurrency=4, poll_interval=2.0, once=False, stop=lambda: False):
+    """
+    작업 큐 워커 루프
+
+    Parameters:
+    -----------
+    concurrency : int
+        동시에 처리할 작업 수 (스레드 수)
+    poll_interval : float
+        할 일이 없을 때 다시 확인하기까지 대기(초)
+    once : bool
+        True면 지금 실행 가능한 작업을 모두 처리한 뒤 종료
+    """
+    worker_id = new_worker_id()
+    logger.info(f"👷 [Job Worker] 시작 (동시 처리 {concurrency}개, {worker_id})")
+    processed = 0
+    inflight = {}  # future -> job
+    heartbeat_interval = _setting('JOB_HEARTBEAT_INTERVAL', 10)
+    last_heartbeat = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='job') as pool:
+        while not stop():
+            close_old_connections()
+
+            if inflight and time.monotonic() - last_heartbeat >= heartbeat_interval:
+                heartbeat(inflight.values(), worker_id)
+                last_heartbeat = time.monotonic()
+
+            free = concurrency - len(inflight)
+            if free > 0:
+                for job in claim_jobs(free, worker_id):
+                    inflight[pool.submit(run_job, job)] = job
+
+            if not inflight:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            done, _ = wait(inflight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            processed += len(done)
+            for future in done:
+                inflight.pop(future)
+
+        # 종료 요청 후에도 남은 작업이 끝날 때까지 생존 신호 유지 (다른 워커가 중복 실행하지 않도록)
+        while inflight:
+            done, _ = wait(inflight, timeout=heartbeat_interval)
+            processed += len(done)
+            for future in done:
+                inflight.pop(future)
+            heartbeat(inflight.values(), worker_id)
+
+    logger.info(f"👷 [Job Worker] 종료 (처리 {processed}건)")
+    return processed
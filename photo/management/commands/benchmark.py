@@ -0,0 +1,345 @@
+"""
+[파일 경로] photo/management/commands/benchmark.py
+[설명] 주요 요청 경로 성능 측정 (오프라인, 운영 DB/스토리지를 건드리지 않음)
+- 임시 SQLite DB와 임시 로컬 스토리지를 만들어 게시물 1k/10k/100k 규모 데이터를 생성
+  (좋아요, 댓글, 검색 색인 포함)
+- --storage emulator: 로컬 파일 대신 OCIStorage + OCI 로컬 대역(config/oci_fake.py)으로 측정
+  (지연/오류율 주입 가능)
+- 측정 항목: 메인 페이지(캐시 적중/미적중/검색), 좋아요, 댓글 작성, 사진 업로드,
+  웹툰 변환(Fal 대신 가짜 응답), CSV 사용자 등록
+- 항목별 p50/p95 응답 시간, 쿼리 수, 최대 메모리(tracemalloc)를 JSON으로 저장해 실행 간 비교
+사용법:
+    python manage.py benchmark                                  # 1k 규모, 항목별 30회
+    python manage.py benchmark --scales 1000 10000 100000 --iterations 50
+    python manage.py benchmark --compare bench_results/이전결과.json
+    python manage.py benchmark --storage emulator --storage-latency-ms 30 --storage-error-rate 0.01
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import platform
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from io import BytesIO
+from datetime import datetime
+from django import get_version
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from PIL import Image
+from photo import filters, metrics, search
+from photo.models import MediaPost, Comment
+from photo.tasks import convert_post
+
+# 검색 측정용 단어 (제목/설명에 섞어 넣음)
+WORDS = ['운동회', '졸업식', '체험학습', '수학여행', '축제', '동아리', '봄', '여름', '가을', '겨울',
+         'science', 'project', 'music', 'sports', 'art', 'festival', 'class', 'friends']
+SEARCH_QUERY = '운동회'
+
+SEED_BATCH_SIZE = 2000
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _jpeg(seed, size=(640, 480)):
+    """매번 다른 내용의 JPEG (변환 캐시에 걸리지 않도록)"""
+    image = Image.new('RGB', size, ((seed * 37) % 256, (seed * 91) % 256, (seed * 53) % 256))
+    image.putpixel((seed % size[0], 0), (255, 255, 255))
+    buffered = BytesIO()
+    image.save(buffered, format='JPEG', quality=85)
+    return buffered.getvalue()
+
+
+class Command(BaseCommand):
+    help = "주요 요청 경로의 응답 시간/쿼리 수/메모리를 임시 DB에서 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=int, nargs='+', default=[1000], help="게시물 수 (여러 개면 작은 것부터 차례로)")
+        parser.add_argument('--iterations', type=int, default=30, help="항목별 반복 횟수")
+        parser.add_argument('--users', type=int, default=200, help="좋아요/댓글 작성자 수")
+        parser.add_argument('--csv-rows', type=int, default=1000, help="CSV 등록 1회당 줄 수")
+        parser.add_argument('--fal-latency-ms', type=int, default=0, help="가짜 Fal 응답 지연(ms)")
+        parser.add_argument('--storage', choices=['filesystem', 'emulator'], default='filesystem',
+                            help="filesystem(로컬 폴더) | emulator(OCIStorage + OCI 로컬 대역)")
+        parser.add_argument('--storage-latency-ms', type=int, default=0, help="emulator 호출당 지연(ms)")
+        parser.add_argument('--storage-error-rate', type=float, default=0.0, help="emulator 503 오류 확률 (0~1)")
+        parser.add_argument('--seed', type=int, default=42, help="난수 시드 (같은 값이면 같은 데이터)")
+        parser.add_argument('--output', help="결과 JSON 경로 (기본: bench_results/benchmark-<시각>.json)")
+        parser.add_argument('--compare', help="비교할 이전 결과 JSON")
+
+    # ----------------------------
+    # 🌱 데이터 생성
+    # ----------------------------
+    def _seed_users(self, count):
+        password = make_password(None)
+        User.objects.bulk_create([
+            User(username=f"bench{i}@example.com", email=f"bench{i}@example.com", password=password)
+            for i in range(count)
+        ])
+        return list(User.objects.values_list('id', flat=True))
+
+    def _seed_posts(self, rng, user_ids, start, stop):
+        """게시물 start~stop-1번 생성 (좋아요 0~5개, 댓글 0~3개, 검색 색인 포함)"""
+        Like = MediaPost.likes.through
+        for batch_start in range(start, stop, SEED_BATCH_SIZE):
+            batch_stop = min(stop, batch_start + SEED_BATCH_SIZE)
+            posts = []
+            for i in range(batch_start, batch_stop):
+                words = rng.sample(WORDS, 3)
+                posts.append(MediaPost(
+                    title=f"{words[0]} {i}", description=' '.join(words),
+                    file=f"media_posts/bench_{i}.jpg", is_public=True,
+                ))
+            posts = MediaPost.objects.bulk_create(posts)
+
+            likes, comments, documents = [], [], []
+            for post in posts:
+                likers = rng.sample(user_ids, rng.randint(0, min(5, len(user_ids))))
+                likes.extend(Like(mediapost_id=post.pk, user_id=user_id) for user_id in likers)
+                post.like_count = len(likers)
+                texts = [f"{rng.choice(WORDS)} 댓글" for _ in range(rng.randint(0, 3))]
+                comments.extend(Comment(post=post, author_id=rng.choice(user_ids), content=text) for text in texts)
+                documents.append((post.pk, post.title, f"{post.description} {' '.join(texts)}"))
+
+            Like.objects.bulk_create(likes)
+            MediaPost.objects.bulk_update(posts, ['like_count'])
+            Comment.objects.bulk_create(comments)
+            search.index_rows('media', documents)
+
+    # ----------------------------
+    # ⏱️ 측정
+    # ----------------------------
+    def _measure(self, name, iterations, action):
+        """action(i)를 반복 실행해 응답 시간/쿼리 수 측정 후, 한 번 더 실행해 최대 메모리 측정"""
+        latencies = []
+        queries = []
+        errors = 0
+        for i in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                try:
+                    action(i)
+                except Exception:
+                    errors += 1  # 오류 주입(--storage-error-rate) 등으로 실패한 요청도 시간은 기록
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+
+        tracemalloc.start()
+        try:
+            action(iterations)
+        except Exception:
+            errors += 1
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        result = {
+            'p50_ms': round(_percentile(latencies, 0.5), 2),
+            'p95_ms': round(_percentile(latencies, 0.95), 2),
+            'mean_ms': round(statistics.fmean(latencies), 2),
+            'queries': round(statistics.fmean(queries), 1),
+            'peak_kb': round(peak / 1024, 1),
+            'errors': errors,
+        }
+        self.stdout.write(
+            f"  {name:<16} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+            f"쿼리 {result['queries']:>5}  메모리 {result['peak_kb']:>9.1f}KB"
+            + (f"  오류 {errors}" if errors else '')
+        )
+        return result
+
+    def _run_scale(self, options, user_ids, staff):
+        iterations = options['iterations']
+        client = Client()
+        client.force_login(User.objects.get(pk=user_ids[0]))
+        staff_client = Client()
+        staff_client.force_login(staff)
+        cache = caches['default']
+        post_ids = list(MediaPost.objects.order_by('-id').values_list('id', flat=True)[:iterations + 1])
+
+        def check(response):
+            if response.status_code >= 400:
+                raise CommandError(f"요청 실패: {response.status_code} {response.content[:200]!r}")
+            return response
+
+        results = {}
+        cache.clear()
+        client.get('/')  # 조각 캐시 채우기
+        results['index'] = self._measure('index', iterations, lambda i: check(client.get('/')))
+        results['index_cold'] = self._measure(
+            'index_cold', iterations, lambda i: (cache.clear(), check(client.get('/')))
+        )
+        results['index_search'] = self._measure(
+            'index_search', iterations, lambda i: check(client.get('/', {'q': SEARCH_QUERY, 'tab': 'media'}))
+        )
+        results['toggle_like'] = self._measure(
+            'toggle_like', iterations, lambda i: check(client.post(f'/like/{post_ids[i % len(post_ids)]}/'))
+        )
+        results['add_comment'] = self._measure(
+            'add_comment', iterations,
+            lambda i: check(client.post(f'/comment/add/{post_ids[i % len(post_ids)]}/', {'content': f'벤치마크 댓글 {i}'},
+                                        HTTP_X_REQUESTED_WITH='XMLHttpRequest')),
+        )
+
+        created = []
+
+        def upload(i):
+            check(client.post('/gallery/create/', {
+                'title': f'업로드 {i}', 'apply_webtoon_filter': 'on',
+                'file': SimpleUploadedFile(f'bench_upload_{i}.jpg', _jpeg(i), 'image/jpeg'),
+            }, HTTP_X_REQUESTED_WITH='XMLHttpRequest'))
+            created.append(MediaPost.objects.latest('id').pk)
+
+        results['media_create'] = self._measure('media_create', iterations, upload)
+
+        def convert(i):
+            post = MediaPost.objects.get(pk=created[i % len(created)])
+            if post.conversion_status == 'DONE':
+                post.file = None
+                post.conversion_status = 'PROCESSING'
+            convert_post(post)
+
+        results['webtoon_convert'] = self._measure('webtoon_convert', min(iterations, len(created) - 1), convert)
+
+        rows = options['csv_rows']
+        batch = {'n': 0}
+
+        def import_csv(i):
+            batch['n'] += 1
+            lines = ['email,name'] + [f"csv{batch['n']}_{r}@example.com,학생{r}" for r in range(rows)]
+            upload_file = SimpleUploadedFile('users.csv', '\n'.join(lines).encode('utf-8'), 'text/csv')
+            check(staff_client.post('/admin/auth/user/upload-csv/', {'csv_file': upload_file}))
+
+        results['csv_import'] = self._measure(f'csv_import({rows})', max(3, iterations // 10), import_csv)
+        return results
+
+    def _fake_fal(self, latency_ms):
+        def convert(image_data):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            return BytesIO(filters.prepare_input_image(image_data, max_side=512))
+        return convert
+
+    def _compare(self, previous_path, results):
+        with open(previous_path, encoding='utf-8') as f:
+            previous = json.load(f)['results']
+        self.stdout.write(f"\n📊 이전 결과와 비교 (p95, {previous_path})")
+        for scale, scenarios in results.items():
+            for name, current in scenarios.items():
+                before = previous.get(scale, {}).get(name)
+                if not before:
+                    continue
+                change = (current['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+                mark = '🔺' if change > 10 else ('🔻' if change < -10 else '  ')
+                self.stdout.write(
+                    f"  {mark} [{scale}] {name:<16} {before['p95_ms']:>8.2f}ms -> {current['p95_ms']:>8.2f}ms ({change:+.0f}%)"
+                )
+
+    def handle(self, *args, **options):
+        scales = sorted(set(options['scales']))
+        rng = random.Random(options['seed'])
+        workdir = tempfile.mkdtemp(prefix='school-bench-')
+        original_convert = filters._convert_with_fal
+
+        # 요청마다 쌓이는 로그가 측정을 흐리지 않도록 경고 이상만 출력
+        loggers = [logging.getLogger(name) for name in ('django', 'django.perf', 'django.request')]
+        levels = [logger.level for logger in loggers]
+        for logger in loggers:
+            logger.setLevel(logging.ERROR)
+
+        storage_backend = {
+            'filesystem': 'django.core.files.storage.FileSystemStorage',
+            'emulator': 'config.storage.OCIStorage',
+        }[options['storage']]
+        test_settings = override_settings(
+            STORAGES={
+                'default': {'BACKEND': storage_backend},
+                'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+            },
+            MEDIA_ROOT=os.path.join(workdir, 'media'),
+            OCI_EMULATOR_ROOT=os.path.join(workdir, 'oci'),
+            OCI_EMULATOR_LATENCY_MS=options['storage_latency_ms'],
+            OCI_EMULATOR_JITTER_MS=options['storage_latency_ms'] // 4,
+            OCI_EMULATOR_ERROR_RATE=options['storage_error_rate'],
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'}},
+            WEBTOON_ENGINE='remote',
+            METRICS_DIR='',
+            ALLOWED_HOSTS=['*'],
+        )
+
+        # 임시 DB 파일 (운영 db.sqlite3와 분리)
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(workdir, 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        results = {}
+        try:
+            with test_settings:
+                filters._convert_with_fal = self._fake_fal(options['fal_latency_ms'])
+                user_ids = self._seed_users(options['users'])
+                staff = User.objects.create_user('bench_admin', 'bench_admin@example.com', 'x', is_staff=True, is_superuser=True)
+
+                seeded = 0
+                for scale in scales:
+                    started = time.monotonic()
+                    self._seed_posts(rng, user_ids, seeded, scale)
+                    seeded = scale
+                    self.stdout.write(f"\n🌱 게시물 {scale}건 준비 ({time.monotonic() - started:.1f}초)")
+                    results[str(scale)] = self._run_scale(options, user_ids, staff)
+        finally:
+            filters._convert_with_fal = original_convert
+            for logger, level in zip(loggers, levels):
+                logger.setLevel(level)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            metrics.reset()  # 측정 중 쌓인 값이 운영 지표(/metrics)에 섞이지 않도록
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, timeout=5,
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            commit = ''
+
+        report = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'commit': commit,
+                'python': sys.version.split()[0],
+                'django': get_version(),
+                'platform': platform.platform(),
+                'iterations': options['iterations'],
+                'users': options['users'],
+                'fal_latency_ms': options['fal_latency_ms'],
+                'storage': options['storage'],
+                'storage_latency_ms': options['storage_latency_ms'],
+                'storage_error_rate': options['storage_error_rate'],
+            },
+            'results': results,
+        }
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'bench_results', f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        if options['compare']:
+            self._compare(options['compare'], results)
+        self.stdout.write(self.style.SUCCESS(f"\n✅ 벤치마크 결과 저장: {output}"))
@@ -0,0 +1,42 @@
+"""
+[파일 경로] photo/management/commands/build_derivatives.py
+[설명] 썸네일 파생본이 없는(또는 오래된) 기존 사진 게시물의 파생본을 만듭니다.
+영상 게시물은 포스터/영상 정보/웹 재생용 사본 처리(photo/video.py)를 함께 실행합니다.
+사용법: python manage.py build_derivatives          # 작업 큐에 등록 (run_jobs 워커가 처리)
+        python manage.py build_derivatives --now    # 이 프로세스에서 바로 생성
+"""
+from django.core.management.base import BaseCommand
+from photo.derivatives import build_derivatives, needs_derivatives
+from photo.jobs import enqueue
+from photo.models import MediaPost
+from photo.video import process_video, needs_video_processing
+
+
+class Command(BaseCommand):
+    help = "기존 게시물의 썸네일 파생본(AVIF/WebP)과 영상 포스터를 생성합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--now', action='store_true', help="작업 큐를 거치지 않고 바로 생성")
+
+    def handle(self, *args, **options):
+        queued = failed = 0
+        for post in MediaPost.objects.order_by('id').iterator(chunk_size=200):
+            if needs_video_processing(post):
+                kind, build = 'video', process_video
+            elif needs_derivatives(post):
+                kind, build = 'derivatives', build_derivatives
+            else:
+                continue
+            if not options['now']:
+                enqueue(kind, {'post_id': post.pk})
+                queued += 1
+                continue
+            try:
+                build(post)
+                queued += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"❌ #{post.pk} {post.title}: {e}")
+
+        action = "생성" if options['now'] else "작업 등록"
+        self.stdout.write(self.style.SUCCESS(f"✅ 썸네일 파생본 {action} {queued}건 (실패 {failed}건)"))
@@ -0,0 +1,37 @@
+"""
+[파일 경로] photo/management/commands/compute_phashes.py
+[설명] 지각 해시가 없는 기존 사진 게시물의 해시를 계산합니다. (비슷한 사진 찾기, photo/dedup.py)
+영상 게시물의 해시는 포스터로 계산하므로 build_derivatives 명령(영상 처리)을 사용하세요.
+사용법: python manage.py compute_phashes          # 작업 큐에 등록 (run_jobs 워커가 처리)
+        python manage.py compute_phashes --now    # 이 프로세스에서 바로 계산
+"""
+from django.core.management.base import BaseCommand
+from photo.dedup import needs_hash, update_hash
+from photo.jobs import enqueue
+from photo.models import MediaPost
+
+
+class Command(BaseCommand):
+    help = "기존 사진 게시물의 지각 해시(비슷한 사진 찾기용)를 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--now', action='store_true', help="작업 큐를 거치지 않고 바로 계산")
+
+    def handle(self, *args, **options):
+        queued = failed = 0
+        for post in MediaPost.objects.filter(phash=None).order_by('id').iterator(chunk_size=200):
+            if not needs_hash(post):
+                continue
+            if not options['now']:
+                enqueue('phash', {'post_id': post.pk})
+                queued += 1
+                continue
+            try:
+                update_hash(post)
+                queued += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"❌ #{post.pk} {post.title}: {e}")
+
+        action = "계산" if options['now'] else "작업 등록"
+        self.stdout.write(self.style.SUCCESS(f"✅ 지각 해시 {action} {queued}건 (실패 {failed}건)"))
@@ -0,0 +1,189 @@
+"""
+[파일 경로] photo/management/commands/convert_webtoons.py
+[설명] 기존 사진 게시물을 한꺼번에 웹툰체로 변환합니다.
+- 동시에 보내는 변환 요청 수를 --concurrency로 제한 (Fal 요청 한도 보호)
+- 끝난 게시물은 체크포인트 파일에 기록되어, 중간에 멈춰도(Ctrl+C 등) 다시 실행하면 이어서 진행
+- 진행률, 처리 속도(건/분), 남은 시간(ETA)을 출력
+- 업로드할 때 '웹툰 변환'을 선택한 게시물만 대상 (선택하지 않은 사진까지 바꾸려면 --include-opted-out)
+사용법:
+    python manage.py convert_webtoons --dry-run                  # 대상만 확인
+    python manage.py convert_webtoons --concurrency 4            # 변환 실행
+    python manage.py convert_webtoons --since 2025-03-01 --status NONE FAILED
+    python manage.py convert_webtoons --reset                    # 체크포인트 무시하고 처음부터
+    python manage.py convert_webtoons --ids 12 --include-opted-out  # 변환을 선택하지 않은 게시물도 변환
+"""
+import os
+import json
+import time
+import signal
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from photo.models import MediaPost
+from photo.signals import WEBTOON_EXTENSIONS
+from photo.tasks import convert_post, mark_conversion_failed
+
+
+def _is_image(post):
+    name = (post.original_file or post.file).name or ''
+    return os.path.splitext(name)[1].lower() in WEBTOON_EXTENSIONS
+
+
+class Checkpoint:
+    """완료/실패한 게시물 id를 JSON 파일에 기록 (기록할 때마다 임시 파일 -> 교체로 안전하게 저장)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done = set()
+        self.failed = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.done = set(data.get('done', []))
+            self.failed = {int(k): v for k, v in data.get('failed', {}).items()}
+
+    def record(self, post_id, error=None):
+        with self.lock:
+            if error is None:
+                self.done.add(post_id)
+                self.failed.pop(post_id, None)
+            else:
+                self.failed[post_id] = error
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'done': sorted(self.done), 'failed': self.failed}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+class Command(BaseCommand):
+    help = "기존 사진 게시물을 일괄로 웹툰 변환합니다. (동시 처리 수 제한, 중단 후 이어서 실행 가능)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=int, nargs='+', help="특정 게시물 id만")
+        parser.add_argument('--since', help="이 날짜(YYYY-MM-DD) 이후 게시물")
+        parser.add_argument('--until', help="이 날짜(YYYY-MM-DD) 이전 게시물")
+        parser.add_argument('--status', nargs='+', default=['NONE', 'FAILED'],
+                            choices=['NONE', 'FAILED', 'DONE'], help="대상 변환 상태 (기본: NONE FAILED)")
+        parser.add_argument('--limit', type=int, help="최대 처리 건수")
+        parser.add_argument('--concurrency', type=int, default=4, help="동시에 진행할 변환 요청 수")
+        parser.add_argument('--checkpoint', default=str(settings.BASE_DIR / '.convert_webtoons.json'),
+                            help="체크포인트 파일 경로")
+        parser.add_argument('--reset', action='store_true', help="체크포인트를 지우고 처음부터")
+        parser.add_argument('--retry-failed', action='store_true', help="체크포인트에 실패로 남은 게시물도 다시 시도")
+        parser.add_argument('--include-opted-out', action='store_true',
+                            help="업로드 시 웹툰 변환을 선택하지 않은 게시물도 변환 (공개 이미지가 변환본으로 바뀜)")
+        parser.add_argument('--dry-run', action='store_true', help="변환하지 않고 대상만 출력")
+
+    def _parse_date(self, value):
+        try:
+            return timezone.make_aware(datetime.strptime(value, '%Y-%m-%d'))
+        except ValueError:
+            raise CommandError(f"날짜 형식이 올바르지 않습니다 (YYYY-MM-DD): {value}")
+
+    def _select(self, options, checkpoint):
+        queryset = MediaPost.objects.filter(conversion_status__in=options['status']).order_by('id')
+        if not options['include_opted_out']:
+            # NONE은 '변환 안 함'도 포함하므로, 올린 사람이 변환을 선택한 게시물만
+            queryset = queryset.filter(apply_webtoon_filter=True)
+        if options['ids']:
+            queryset = queryset.filter(id__in=options['ids'])
+        if options['since']:
+            queryset = queryset.filter(created_at__gte=self._parse_date(options['since']))
+        if options['until']:
+            queryset = queryset.filter(created_at__lt=self._parse_date(options['until']))
+
+        targets = []
+        for post in queryset.only('id', 'title', 'file', 'original_file', 'conversion_status').iterator():
+            if post.id in checkpoint.done:
+                continue
+            if post.id in checkpoint.failed and not options['retry_failed']:
+                continue
+            if not (post.file or post.original_file) or not _is_image(post):
+                continue
+            targets.append(post.id)
+            if options['limit'] and len(targets) >= options['limit']:
+                break
+        return targets
+
+    def _convert(self, post_id):
+        """스레드 하나에서 게시물 하나 변환. (소요 시간, 오류 메시지 또는 None) 반환"""
+        started = time.monotonic()
+        try:
+            post = MediaPost.objects.filter(pk=post_id).first()
+            if post is None:
+                return time.monotonic() - started, None
+            convert_post(post)
+            return time.monotonic() - started, None
+        except Exception as e:
+            # 작업 큐의 최종 실패와 같은 처리: 원본을 게시하고 FAILED로 표시
+            mark_conversion_failed({'post_id': post_id})
+            return time.monotonic() - started, str(e)
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        path = options['checkpoint']
+        if options['reset'] and os.path.exists(path):
+            os.remove(path)
+        checkpoint = Checkpoint(path)
+
+        targets = self._select(options, checkpoint)
+        total = len(targets)
+        resumed = len(checkpoint.done)
+        self.stdout.write(f"🎯 변환 대상 {total}건 (체크포인트 완료 {resumed}건 건너뜀, 동시 {options['concurrency']}개)")
+        if options['dry_run'] or not total:
+            return
+
+        stopping = {'flag': False}
+
+        def request_stop(signum, frame):
+            self.stdout.write("🛑 중단 요청: 진행 중인 변환만 마무리합니다. (다시 실행하면 이어서 진행)")
+            stopping['flag'] = True
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        started = time.monotonic()
+        finished = failed = 0
+        pending = iter(targets)
+        inflight = {}
+
+        with ThreadPoolExecutor(max_workers=options['concurrency'], thread_name_prefix='convert') as pool:
+            while True:
+                # 동시 요청 수 이하로만 제출 (중단 요청 시 새 제출 중지)
+                while not stopping['flag'] and len(inflight) < options['concurrency']:
+                    post_id = next(pending, None)
+                    if post_id is None:
+                        break
+                    inflight[pool.submit(self._convert, post_id)] = post_id
+                if not inflight:
+                    break
+
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    post_id = inflight.pop(future)
+                    seconds, error = future.result()
+                    checkpoint.record(post_id, error)
+                    finished += 1
+                    failed += bool(error)
+
+                    elapsed = time.monotonic() - started
+                    rate = finished / elapsed if elapsed else 0
+                    eta = (total - finished) / rate if rate else 0
+                    mark = f"❌ {error}" if error else "✅"
+                    self.stdout.write(
+                        f"[{finished}/{total}] #{post_id} {mark} ({seconds:.1f}s) | "
+                        f"{rate * 60:.1f}건/분, 남은 시간 약 {eta / 60:.1f}분"
+                    )
+
+        elapsed = time.monotonic() - started
+        summary = f"변환 {finished - failed}건 성공, {failed}건 실패 ({elapsed:.0f}초)"
+        if finished < total:
+            self.stdout.write(self.style.WARNING(f"⏸️ 중단됨: {summary}, 남은 {total - finished}건은 다시 실행하면 이어서 진행"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ 일괄 변환 완료: {summary}"))
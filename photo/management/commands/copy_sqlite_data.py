@@ -0,0 +1,138 @@
+"""
+[파일 경로] photo/management/commands/copy_sqlite_data.py
+[설명] 기존 SQLite DB(db.sqlite3)의 데이터를 현재 DATABASES['default'](예: PostgreSQL)로 옮깁니다.
+1. 대상 DB에 migrate를 실행해 테이블을 만듭니다.
+2. 대상 테이블을 모두 비우고(flush와 같은 SQL), 모델 의존 순서(참조되는 쪽 먼저)대로
+   청크 단위 bulk_create로 복사합니다.
+   (pk와 작성일을 그대로 유지하므로 외래 키/좋아요/댓글 관계가 그대로 이어짐, 시그널은 실행되지 않음)
+3. PostgreSQL이면 자동 증가 시퀀스를 복사된 최대 id 다음으로 맞춥니다.
+4. 대상이 SQLite면 전문 검색 색인을 다시 만듭니다. (PostgreSQL은 LIKE 검색으로 동작)
+사용법:
+    DB_ENGINE=postgres python manage.py copy_sqlite_data                 # 확인 후 복사
+    DB_ENGINE=postgres python manage.py copy_sqlite_data --source /backup/db.sqlite3 --noinput
+"""
+import os
+import time
+from contextlib import contextmanager
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers import sort_dependencies
+from django.db import connections, transaction
+
+SOURCE_ALIAS = 'sqlite_source'
+
+
+@contextmanager
+def _keep_timestamps(model):
+    """auto_now/auto_now_add 필드가 복사 시각으로 덮어써지지 않도록 잠시 끔"""
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    for field, _, _ in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = "SQLite DB의 데이터를 현재 기본 DB(PostgreSQL 등)로 복사합니다. (대상 테이블은 비워짐)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=str(settings.BASE_DIR / 'db.sqlite3'), help="원본 SQLite 파일 경로")
+        parser.add_argument('--database', default='default', help="대상 DB 별칭")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="한 번에 복사할 행 수")
+        parser.add_argument('--noinput', action='store_true', help="확인 질문 없이 진행")
+
+    def _models(self):
+        """복사 대상 모델 (참조되는 모델 먼저, 자동 생성된 M2M 중간 테이블 포함)"""
+        app_list = [(config, None) for config in apps.get_app_configs()]
+        ordered = sort_dependencies(app_list, allow_cycles=True)
+        seen = set(ordered)
+        for model in apps.get_models(include_auto_created=True):
+            if model not in seen:
+                ordered.append(model)  # M2M 중간 테이블은 양쪽 모델 뒤에
+                seen.add(model)
+        return [
+            model for model in ordered
+            if model._meta.managed and not model._meta.proxy and not model._meta.swapped
+        ]
+
+    def handle(self, *args, **options):
+        source_path = options['source']
+        target = options['database']
+        if not os.path.isfile(source_path):
+            raise CommandError(f"원본 SQLite 파일이 없습니다: {source_path}")
+
+        target_settings = connections[target].settings_dict
+        if target_settings['ENGINE'].endswith('sqlite3') and os.path.abspath(str(target_settings['NAME'])) == os.path.abspath(source_path):
+            raise CommandError("원본과 대상이 같은 DB입니다. DB_ENGINE=postgres 등으로 대상을 바꾼 뒤 실행하세요.")
+
+        # 원본 SQLite를 임시 별칭으로 등록 (나머지 항목은 Django 기본값으로 채움)
+        connections.databases[SOURCE_ALIAS] = connections.configure_settings({
+            'default': dict(target_settings),
+            SOURCE_ALIAS: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': source_path, 'OPTIONS': {'timeout': 20}},
+        })[SOURCE_ALIAS]
+
+        self.stdout.write(f"📦 원본: {source_path}")
+        self.stdout.write(f"🎯 대상: {target_settings['ENGINE']} / {target_settings['NAME']} ({target})")
+        if not options['noinput']:
+            answer = input("대상 DB의 기존 데이터가 모두 지워집니다. 계속할까요? [y/N] ")
+            if answer.strip().lower() != 'y':
+                raise CommandError("취소했습니다.")
+
+        call_command('migrate', database=target, interactive=False, verbosity=0)
+        models = self._models()
+        chunk_size = options['chunk_size']
+        started = time.monotonic()
+
+        connection = connections[target]
+        try:
+            with transaction.atomic(using=target):
+                # 대상 테이블 비우기 (migrate가 만든 content type, 권한, 사이트 등도 원본 값으로 교체)
+                flush_sql = connection.ops.sql_flush(
+                    no_style(), [model._meta.db_table for model in models], reset_sequences=True,
+                )
+                connection.ops.execute_sql_flush(flush_sql)
+
+                for model in models:
+                    manager = model._base_manager
+                    copied = 0
+                    batch = []
+                    with _keep_timestamps(model):
+                        for obj in manager.using(SOURCE_ALIAS).order_by('pk').iterator(chunk_size=chunk_size):
+                            batch.append(obj)
+                            if len(batch) >= chunk_size:
+                                manager.using(target).bulk_create(batch)
+                                copied += len(batch)
+                                batch = []
+                        if batch:
+                            manager.using(target).bulk_create(batch)
+                            copied += len(batch)
+                    if copied:
+                        self.stdout.write(f"  ✅ {model._meta.label}: {copied}건")
+
+                # PostgreSQL 등: 자동 증가 시퀀스를 복사된 id 다음으로
+                sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+                if sequence_sql:
+                    with connection.cursor() as cursor:
+                        for sql in sequence_sql:
+                            cursor.execute(sql)
+        finally:
+            connections[SOURCE_ALIAS].close()
+            del connections[SOURCE_ALIAS]
+            del connections.databases[SOURCE_ALIAS]
+
+        if connections[target].vendor == 'sqlite' and target == 'default':
+            call_command('rebuild_search_index', verbosity=0)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ 데이터 복사 완료 ({len(models)}개 테이블, {time.monotonic() - started:.1f}초)"
+        ))
@@ -0,0 +1,25 @@
+"""
+[파일 경로] photo/management/commands/rebuild_search_index.py
+[설명] 전문 검색 색인(FTS5)을 처음부터 다시 만듭니다.
+사용법: python manage.py rebuild_search_index
+"""
+from django.core.management.base import BaseCommand, CommandError
+from photo import search
+from photo.models import MediaPost, TextPost, CodeLink
+
+
+class Command(BaseCommand):
+    help = "전문 검색 색인(FTS5)을 전체 재구축합니다."
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("현재 DB는 SQLite FTS5 색인을 지원하지 않습니다 (LIKE 검색으로 동작 중).")
+
+        counts = search.rebuild_index({
+            'media': MediaPost.objects.all(),
+            'text': TextPost.objects.all(),
+            'code': CodeLink.objects.all(),
+        })
+
+        summary = ', '.join(f"{doc_type} {count}건" for doc_type, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"✅ 검색 색인 재구축 완료: {summary}"))
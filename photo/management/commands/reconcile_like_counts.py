@@ -0,0 +1,33 @@
+"""
+[파일 경로] photo/management/commands/reconcile_like_counts.py
+[설명] 저장된 좋아요 수(MediaPost.like_count)를 실제 좋아요 행 수와 맞춥니다.
+관리자 화면에서 좋아요를 직접 수정하거나 사용자를 삭제하면 값이 어긋날 수 있습니다.
+사용법: python manage.py reconcile_like_counts [--dry-run]
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F
+from photo.models import MediaPost
+
+
+class Command(BaseCommand):
+    help = "MediaPost.like_count를 실제 좋아요 수로 다시 맞춥니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="수정하지 않고 어긋난 게시물만 출력")
+
+    def handle(self, *args, **options):
+        drifted = list(
+            MediaPost.objects.annotate(actual=Count('likes'))
+            .exclude(like_count=F('actual'))
+            .only('id', 'title', 'like_count')
+        )
+
+        for post in drifted:
+            self.stdout.write(f"  #{post.pk} {post.title}: {post.like_count} -> {post.actual}")
+            post.like_count = post.actual
+
+        if drifted and not options['dry_run']:
+            MediaPost.objects.bulk_update(drifted, ['like_count'], batch_size=500)
+
+        action = "발견" if options['dry_run'] else "수정"
+        self.stdout.write(self.style.SUCCESS(f"✅ 좋아요 수 불일치 {len(drifted)}건 {action}"))
@@ -0,0 +1,44 @@
+"""
+[파일 경로] photo/management/commands/run_jobs.py
+[설명] 백그라운드 작업 큐 워커 (웹툰 변환 등)
+사용법:
+    python manage.py run_jobs                  # 계속 대기하며 처리 (systemd 서비스로 실행)
+    python manage.py run_jobs --concurrency 8  # 동시에 8개까지 처리
+    python manage.py run_jobs --once           # 지금 쌓인 작업만 처리하고 종료
+"""
+import signal
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from photo.jobs import run_worker
+import photo.tasks  # noqa: F401 (작업 처리 함수 등록)
+
+
+class Command(BaseCommand):
+    help = "DB 작업 큐의 작업(웹툰 변환 등)을 처리하는 워커를 실행합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=getattr(settings, 'JOB_WORKER_CONCURRENCY', 4),
+                            help="동시에 처리할 작업 수")
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help="작업이 없을 때 다시 확인하는 간격(초)")
+        parser.add_argument('--once', action='store_true',
+                            help="실행 가능한 작업을 모두 처리한 뒤 종료")
+
+    def handle(self, *args, **options):
+        stopping = {'flag': False}
+
+        def request_stop(signum, frame):
+            # 진행 중인 작업은 마저 끝내고 종료 (systemctl stop / Ctrl+C)
+            self.stdout.write("🛑 종료 요청을 받았습니다. 진행 중인 작업을 마무리합니다...")
+            stopping['flag'] = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        processed = run_worker(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            once=options['once'],
+            stop=lambda: stopping['flag'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ 워커 종료: {processed}건 처리"))
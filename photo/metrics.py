@@ -0,0 +1,335 @@
+"""
+[파일 경로] photo/metrics.py
+[설명]
+프로세스 내부 지표(카운터/히스토그램) 모음입니다. (외부 라이브러리 없이 동작)
+- counter(): 누적 횟수 (예: 외부 API 오류 수)
+- histogram(): 소요 시간 분포 (버킷별 누적 개수 + 합계)
+이름이 같으면 같은 지표 객체를 돌려주므로 여러 모듈에서 안전하게 선언할 수 있습니다.
+
+[여러 프로세스 합산]
+gunicorn 워커, run_jobs 워커 등 프로세스마다 값이 따로 쌓이므로, settings.METRICS_DIR이 있으면
+각 프로세스가 몇 초마다 자기 값을 '<pid>_<시작시각>.json' 파일로 저장하고,
+/metrics(render_text)는 폴더의 모든 파일을 더해서 보여줍니다.
+끝난 프로세스(pid가 더 이상 없음)의 파일은 합산할 때 지웁니다. 그만큼 카운터 합계가 줄어들 수 있지만,
+Prometheus는 이를 카운터 초기화로 처리하므로 rate()/increase() 값에는 영향이 없습니다.
+"""
+import os
+import json
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+
+# 기본 버킷 (초): 수 ms ~ 2분
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REGISTRY = {}
+_registry_lock = threading.Lock()
+
+# 마지막 저장 이후 값이 바뀌었는지 (바뀐 프로세스만 파일을 씀)
+_state = {'dirty': False, 'flusher': None, 'file_id': None}
+_state_lock = threading.Lock()
+
+
+def _setting(name, default):
+    """Django 설정값 (설정 없이 실행되는 스크립트에서는 기본값)"""
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, '')) for label in self.labelnames)
+
+    def _changed(self):
+        _state['dirty'] = True
+        if _state['flusher'] is None:
+            _start_flusher()
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self._changed()
+
+    def snapshot(self):
+        """{라벨 값 튜플: 누적 값}"""
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['buckets'][i] += 1
+            entry['sum'] += value
+            entry['count'] += 1
+        self._changed()
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록 소요 시간 기록"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def snapshot(self):
+        """{라벨 값 튜플: {'buckets': [버킷별 누적 개수], 'sum': 합계, 'count': 개수}}"""
+        with self._lock:
+            return {
+                key: {'buckets': list(entry['buckets']), 'sum': entry['sum'], 'count': entry['count']}
+                for key, entry in self._values.items()
+            }
+
+    def quantile(self, q, **labels):
+        """버킷 경계 기준 근사 분위수 (예: q=0.95 -> p95)"""
+        entry = self.snapshot().get(self._key(labels))
+        if not entry or not entry['count']:
+            return None
+        target = q * entry['count']
+        for bound, cumulative in zip(self.buckets, entry['buckets']):
+            if cumulative >= target:
+                return bound
+        return float('inf')
+
+
+def _get_or_create(cls, name, help_text, labelnames, **kwargs):
+    with _registry_lock:
+        metric = REGISTRY.get(name)
+        if metric is None:
+            metric = REGISTRY[name] = cls(name, help_text, labelnames, **kwargs)
+        return metric
+
+
+def counter(name, help_text, labelnames=()):
+    return _get_or_create(Counter, name, help_text, labelnames)
+
+
+def histogram(name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+
+# ----------------------------
+# 💾 프로세스별 파일 저장 / 합산
+# ----------------------------
+def _multiproc_dir():
+    return str(_setting('METRICS_DIR', '') or '')
+
+
+def _file_id():
+    if _state['file_id'] is None:
+        _state['file_id'] = f"{os.getpid()}_{int(time.time() * 1000)}"
+    return _state['file_id']
+
+
+def _dump():
+    """이 프로세스의 전체 지표 -> JSON으로 저장 가능한 dict"""
+    with _registry_lock:
+        metrics = list(REGISTRY.values())
+    data = {}
+    for metric in metrics:
+        values = metric.snapshot()
+        if not values:
+            continue
+        data[metric.name] = {
+            'kind': metric.kind,
+            'help': metric.help,
+            'labelnames': list(metric.labelnames),
+            'buckets': list(getattr(metric, 'buckets', [])),
+            'values': [[list(key), value] for key, value in values.items()],
+        }
+    return data
+
+
+def flush():
+    """값이 바뀌었으면 이 프로세스의 파일을 갱신 (임시 파일 -> 교체)"""
+    directory = _multiproc_dir()
+    if not directory or not _state['dirty']:
+        return
+    _state['dirty'] = False
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{_file_id()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_dump(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        _state['dirty'] = True
+
+
+def _flush_loop(interval):
+    while True:
+        time.sleep(interval)
+        flush()
+
+
+def _start_flusher():
+    with _state_lock:
+        if _state['flusher'] is not None or not _multiproc_dir():
+            return
+        interval = _setting('METRICS_FLUSH_INTERVAL', 5)
+        thread = threading.Thread(target=_flush_loop, args=(interval,), name='metrics-flush', daemon=True)
+        thread.start()
+        _state['flusher'] = thread
+
+
+def reset():
+    """이 프로세스의 모든 지표를 비우고 저장 대기 상태도 취소 (benchmark 명령 등 측정용 실행 후)"""
+    with _registry_lock:
+        metrics = list(REGISTRY.values())
+    for metric in metrics:
+        metric.reset()
+    _state['dirty'] = False
+
+
+def _after_fork():
+    """fork된 자식(gunicorn --preload 워커 등)은 부모 값을 물려받지 않고 새 파일로 시작"""
+    with _registry_lock:
+        metrics = list(REGISTRY.values())
+    for metric in metrics:
+        metric._lock = threading.Lock()
+    reset()
+    _state.update(flusher=None, file_id=None)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+atexit.register(flush)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True  # 다른 사용자 프로세스 등 확인할 수 없으면 살아 있는 것으로
+    return True
+
+
+def _prune(directory, filename):
+    """끝난 프로세스가 남긴 파일이면 지우고 True (파일 이름 앞부분이 pid)"""
+    try:
+        pid = int(filename.split('_', 1)[0])
+    except ValueError:
+        return False
+    if pid == os.getpid() or _pid_alive(pid):
+        return False
+    try:
+        os.remove(os.path.join(directory, filename))
+    except OSError:
+        pass
+    return True
+
+
+def collect():
+    """
+    모든 프로세스의 지표 합산
+    Returns: {name: {'kind', 'help', 'labelnames', 'buckets', 'values': {라벨 튜플: 값}}}
+    """
+    directory = _multiproc_dir()
+    if directory:
+        flush()
+        dumps = []
+        for filename in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+            if _prune(directory, filename) or not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(directory, filename), encoding='utf-8') as f:
+                    dumps.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # 다른 프로세스가 쓰는 중이거나 손상된 파일
+    else:
+        dumps = [_dump()]
+
+    merged = {}
+    for dump in dumps:
+        for name, meta in dump.items():
+            target = merged.setdefault(name, {**meta, 'values': {}})
+            for key, value in meta['values']:
+                key = tuple(key)
+                if meta['kind'] == 'counter':
+                    target['values'][key] = target['values'].get(key, 0) + value
+                    continue
+                entry = target['values'].setdefault(
+                    key, {'buckets': [0] * len(meta['buckets']), 'sum': 0.0, 'count': 0}
+                )
+                entry['buckets'] = [a + b for a, b in zip(entry['buckets'], value['buckets'])]
+                entry['sum'] += value['sum']
+                entry['count'] += value['count']
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labelnames, key, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, key)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+INF_LABEL = 'le="+Inf"'
+
+
+def render_text():
+    """Prometheus 텍스트 형식(0.0.4)으로 출력"""
+    lines = []
+    for name, meta in sorted(collect().items()):
+        lines.append(f"# HELP {name} {meta['help']}")
+        lines.append(f"# TYPE {name} {meta['kind']}")
+        labelnames = meta['labelnames']
+        for key, value in sorted(meta['values'].items()):
+            if meta['kind'] == 'counter':
+                lines.append(f"{name}{_labels(labelnames, key)} {_number(value)}")
+                continue
+            for bound, cumulative in zip(meta['buckets'], value['buckets']):
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f"{name}_bucket{_labels(labelnames, key, le)} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labelnames, key, INF_LABEL)} {value['count']}")
+            lines.append(f"{name}_sum{_labels(labelnames, key)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(labelnames, key)} {value['count']}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo', '0005_remove_mediapost_like_count_mediapost_likes_comment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='codelink',
+            index=models.Index(fields=['-created_at', '-id'], name='codelink_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediapost',
+            index=models.Index(fields=['-created_at', '-id'], name='mediapost_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='textpost',
+            index=models.Index(fields=['-created_at', '-id'], name='textpost_created_idx'),
+        ),
+    ]
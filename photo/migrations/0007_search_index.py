@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:20
+
+from django.db import migrations
+
+# 마이그레이션은 그 시점의 스키마로 고정 (photo.search가 바뀌어도 영향 없도록 직접 작성)
+# 기존 게시물 색인은 0016_search_index_rowid에서 채움
+CREATE_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS photo_search_index USING fts5("
+    "doc_type UNINDEXED, doc_id UNINDEXED, title, body, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+DROP_TABLE_SQL = "DROP TABLE IF EXISTS photo_search_index"
+
+
+def create_search_index(apps, schema_editor):
+    """FTS5 가상 테이블 생성 (SQLite 전용)"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_TABLE_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(DROP_TABLE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo', '0006_codelink_codelink_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
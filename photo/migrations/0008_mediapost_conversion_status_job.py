@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def mark_converted_posts(apps, schema_editor):
+    """이미 원본이 보관된(= 예전 방식으로 변환이 끝난) 게시물은 '변환 완료'로 표시"""
+    MediaPost = apps.get_model('photo', 'MediaPost')
+    MediaPost.objects.exclude(original_file='').exclude(original_file__isnull=True).update(conversion_status='DONE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo', '0007_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediapost',
+            name='file',
+            field=models.FileField(blank=True, upload_to='media_posts/', verbose_name='이미지/영상 파일 (애니메이션 스타일)'),
+        ),
+        migrations.AddField(
+            model_name='mediapost',
+            name='conversion_status',
+            field=models.CharField(choices=[('NONE', '변환 안 함'), ('PROCESSING', '변환 중'), ('DONE', '변환 완료'), ('FAILED', '변환 실패 (원본 유지)')], default='NONE', max_length=20, verbose_name='웹툰 변환 상태'),
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='작업 종류')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='작업 데이터')),
+                ('status', models.CharField(choices=[('PENDING', '대기'), ('RUNNING', '처리 중'), ('DONE', '완료'), ('FAILED', '실패')], default='PENDING', max_length=20, verbose_name='상태')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='시도 횟수')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5, verbose_name='최대 시도 횟수')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='실행 예정 시각')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='작업 시작 시각')),
+                ('last_error', models.TextField(blank=True, verbose_name='마지막 오류')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='등록일')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx')],
+            },
+        ),
+        migrations.RunPython(mark_converted_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo', '0008_mediapost_conversion_status_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversionCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='캐시 키 (SHA-256)')),
+                ('file', models.FileField(upload_to='webtoon_cache/', verbose_name='변환 결과 파일')),
+                ('size', models.PositiveIntegerField(default=0, verbose_name='파일 크기(bytes)')),
+                ('hit_count', models.PositiveIntegerField(default=0, verbose_name='재사용 횟수')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='마지막 사용')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo', '0009_conversioncache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediapost',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict, verbose_name='썸네일 파생본 (형식별 너비 -> 파일 경로)'),
+        ),
+        migrations.AddField(
+            model_name='mediapost',
+            name='placeholder',
+            field=models.TextField(blank=True, verbose_name='흐림 미리보기 (data URI)'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:18
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_like_counts(apps, schema_editor):
+    """기존 좋아요 행 수로 like_count 채우기 (UPDATE 한 번)"""
+    MediaPost = apps.get_model('photo', 'MediaPost')
+    Like = MediaPost.likes.through
+    counts = (
+        Like.objects.filter(mediapost_id=OuterRef('pk'))
+        .order_by().values('mediapost_id').annotate(n=Count('pk')).values('n')
+    )
+    MediaPost.objects.update(like_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo', '0010_mediapost_derivatives_mediapost_placeholder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediapost',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='좋아요 수'),
+        ),
+        migrations.RunPython(fill_like_counts, migrations.RunPython.noop),
+    ]
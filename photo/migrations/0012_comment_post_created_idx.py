@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo', '0011_mediapost_like_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo', '0012_comment_post_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediapost',
+            name='duration',
+            field=models.FloatField(blank=True, null=True, verbose_name='영상 길이(초)'),
+        ),
+        migrations.AddField(
+            model_name='mediapost',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='세로(px)'),
+        ),
+        migrations.AddField(
+            model_name='mediapost',
+            name='poster',
+            field=models.FileField(blank=True, null=True, upload_to='media_posts/posters/', verbose_name='영상 포스터 장면'),
+        ),
+        migrations.AddField(
+            model_name='mediapost',
+            name='video_codec',
+            field=models.CharField(blank=True, max_length=20, verbose_name='영상 코덱'),
+        ),
+        migrations.AddField(
+            model_name='mediapost',
+            name='web_file',
+            field=models.FileField(blank=True, null=True, upload_to='media_posts/web/', verbose_name='웹 재생용 영상 (faststart MP4)'),
+        ),
+        migrations.AddField(
+            model_name='mediapost',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='가로(px)'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo', '0013_mediapost_video_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediapost',
+            name='phash',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='지각 해시 (dHash)'),
+        ),
+        migrations.AddField(
+            model_name='mediapost',
+            name='phash_0',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediapost',
+            name='phash_1',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediapost',
+            name='phash_2',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediapost',
+            name='phash_3',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='mediapost',
+            index=models.Index(fields=['phash_0'], name='mediapost_phash0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediapost',
+            index=models.Index(fields=['phash_1'], name='mediapost_phash1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediapost',
+            index=models.Index(fields=['phash_2'], name='mediapost_phash2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediapost',
+            index=models.Index(fields=['phash_3'], name='mediapost_phash3_idx'),
+        ),
+    ]
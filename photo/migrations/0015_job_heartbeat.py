@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo', '0014_mediapost_phash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='마지막 생존 신호'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='locked_by',
+            field=models.CharField(blank=True, max_length=100, verbose_name='처리 중인 워커'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:20
+
+import re
+
+from django.db import migrations
+
+# 색인 행의 rowid = 문서 id * 4 + 종류 번호 (photo/search.py의 doc_rowid와 같은 규칙)
+# 마이그레이션 시점의 토크나이저/문서 구성을 그대로 옮겨 둠 (photo.search를 import하지 않음)
+DOC_TYPE_CODES = {'media': 1, 'text': 2, 'code': 3}
+DOC_TYPE_SLOTS = 4
+
+HANGUL_RE = re.compile(r'[가-힣ㄱ-ㆎ]+')
+WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    tokens = []
+    for word in WORD_RE.findall((text or '').lower()):
+        pos = 0
+        for match in HANGUL_RE.finditer(word):
+            if match.start() > pos:
+                tokens.append(word[pos:match.start()])
+            run = match.group()
+            tokens.extend([run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)])
+            pos = match.end()
+        if pos < len(word):
+            tokens.append(word[pos:])
+    return ' '.join(tokens)
+
+
+def documents(apps):
+    Comment = apps.get_model('photo', 'Comment')
+    for post in apps.get_model('photo', 'MediaPost').objects.iterator(chunk_size=500):
+        comments = ' '.join(Comment.objects.filter(post_id=post.pk).values_list('content', flat=True))
+        yield 'media', post.pk, post.title, f"{post.description} {comments}"
+    for post in apps.get_model('photo', 'TextPost').objects.iterator(chunk_size=500):
+        yield 'text', post.pk, post.title, f"{post.author_name} {post.content}"
+    for link in apps.get_model('photo', 'CodeLink').objects.iterator(chunk_size=500):
+        yield 'code', link.pk, link.title, link.description
+
+
+def rebuild_with_rowids(apps, schema_editor):
+    """기존 색인(자동 rowid)을 비우고 고정 rowid로 다시 채움 (SQLite 전용)"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DELETE FROM photo_search_index")
+        for doc_type, doc_id, title, body in documents(apps):
+            cursor.execute(
+                "INSERT INTO photo_search_index (rowid, doc_type, doc_id, title, body) VALUES (%s, %s, %s, %s, %s)",
+                [doc_id * DOC_TYPE_SLOTS + DOC_TYPE_CODES[doc_type], doc_type, doc_id, tokenize(title), tokenize(body)],
+            )
+        cursor.execute("INSERT INTO photo_search_index(photo_search_index) VALUES ('optimize')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('photo', '0015_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_with_rowids, migrations.RunPython.noop),
+    ]
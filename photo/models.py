@@ -1,20 +1,80 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # 1. 이미지 및 영상 게시판 모델
 class MediaPost(models.Model):
     title = models.CharField(max_length=100, verbose_name="제목")
-    file = models.FileField(upload_to='media_posts/', verbose_name="이미지/영상 파일 (애니메이션 스타일)")
+    file = models.FileField(upload_to='media_posts/', verbose_name="이미지/영상 파일 (애니메이션 스타일)", blank=True)  # 웹툰 변환 중에는 비어 있음
     original_file = models.FileField(upload_to='media_posts/originals/', verbose_name="원본 파일 (관리자 전용)", blank=True, null=True)
     description = models.TextField(verbose_name="설명", blank=True)
     likes = models.ManyToManyField(User, related_name='liked_posts', blank=True, verbose_name="좋아요 누른 사용자들")
+    like_count = models.PositiveIntegerField(default=0, verbose_name="좋아요 수")  # likes와 같은 트랜잭션에서 F()로 갱신
     is_public = models.BooleanField(default=True, verbose_name="공개 여부")
     apply_webtoon_filter = models.BooleanField(default=False, verbose_name="웹툰체로 변환")
+    conversion_status = models.CharField(max_length=20, choices=[
+        ('NONE', '변환 안 함'),
+        ('PROCESSING', '변환 중'),
+        ('DONE', '변환 완료'),
+        ('FAILED', '변환 실패 (원본 유지)'),
+    ], default='NONE', verbose_name="웹툰 변환 상태")
+    derivatives = models.JSONField(default=dict, blank=True, verbose_name="썸네일 파생본 (형식별 너비 -> 파일 경로)")
+    placeholder = models.TextField(blank=True, verbose_name="흐림 미리보기 (data URI)")
+    # 영상 전용 (photo/video.py 작업이 채움)
+    poster = models.FileField(upload_to='media_posts/posters/', blank=True, null=True, verbose_name="영상 포스터 장면")
+    web_file = models.FileField(upload_to='media_posts/web/', blank=True, null=True, verbose_name="웹 재생용 영상 (faststart MP4)")
+    duration = models.FloatField(null=True, blank=True, verbose_name="영상 길이(초)")
+    width = models.PositiveIntegerField(null=True, blank=True, verbose_name="가로(px)")
+    height = models.PositiveIntegerField(null=True, blank=True, verbose_name="세로(px)")
+    video_codec = models.CharField(max_length=20, blank=True, verbose_name="영상 코덱")
+    # 비슷한 사진 찾기용 지각 해시(dHash 64비트)와 16비트 조각 4개 (photo/dedup.py)
+    phash = models.BigIntegerField(null=True, blank=True, verbose_name="지각 해시 (dHash)")
+    phash_0 = models.PositiveIntegerField(null=True, blank=True)
+    phash_1 = models.PositiveIntegerField(null=True, blank=True)
+    phash_2 = models.PositiveIntegerField(null=True, blank=True)
+    phash_3 = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="작성일")
 
+    class Meta:
+        # 최신순 커서 페이지네이션 (created_at, id) 전용 인덱스
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='mediapost_created_idx'),
+            # 비슷한 사진 후보 조회: 조각 하나라도 같은 게시물 (photo/dedup.py find_similar)
+            models.Index(fields=['phash_0'], name='mediapost_phash0_idx'),
+            models.Index(fields=['phash_1'], name='mediapost_phash1_idx'),
+            models.Index(fields=['phash_2'], name='mediapost_phash2_idx'),
+            models.Index(fields=['phash_3'], name='mediapost_phash3_idx'),
+        ]
+
     def __str__(self):
         return f"[미디어] {self.title}"
 
+    def _srcset(self, fmt):
+        """'url 320w, url 640w, ...' 형식 (파생본이 아직 없으면 빈 문자열)"""
+        widths = self.derivatives.get(fmt, {})
+        return ', '.join(
+            f"{self.file.storage.url(name)} {width}w"
+            for width, name in sorted(widths.items(), key=lambda item: int(item[0]))
+        )
+
+    @property
+    def is_video(self):
+        from .video import is_video
+        return bool(self.file) and is_video(self.file.name)
+
+    @property
+    def playback_url(self):
+        """재생할 영상 주소 (웹 재생용 사본이 있으면 사본)"""
+        return self.web_file.url if self.web_file else self.file.url
+
+    @property
+    def avif_srcset(self):
+        return self._srcset('avif')
+
+    @property
+    def webp_srcset(self):
+        return self._srcset('webp')
+
 # 2. 글 게시판 모델
 class TextPost(models.Model):
     title = models.CharField(max_length=100, verbose_name="제목")
@@ -22,6 +82,9 @@ class TextPost(models.Model):
     author_name = models.CharField(max_length=50, verbose_name="작성자(학생명)")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="작성일")
 
+    class Meta:
+        indexes = [models.Index(fields=['-created_at', '-id'], name='textpost_created_idx')]
+
     def __str__(self):
         return f"[글] {self.title}"
 
@@ -39,6 +102,9 @@ class CodeLink(models.Model):
     description = models.TextField(verbose_name="설명", blank=True)
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="작성일")
 
+    class Meta:
+        indexes = [models.Index(fields=['-created_at', '-id'], name='codelink_created_idx')]
+
     def __str__(self):
         return f"[코드] {self.title}"
 
@@ -64,5 +130,49 @@ class Comment(models.Model):
     content = models.TextField(verbose_name="내용")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="작성일")
 
+    class Meta:
+        # 게시물별 댓글 목록 (post, created_at, id) 커서 페이지네이션 전용 인덱스
+        indexes = [models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_idx')]
+
+    def __str__(self):
+        return f"{self.author.username}: {self.content[:20]}"
+
+# 6. 백그라운드 작업 큐 (웹툰 변환 등 오래 걸리는 작업)
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ('PENDING', '대기'),
+        ('RUNNING', '처리 중'),
+        ('DONE', '완료'),
+        ('FAILED', '실패'),
+    ]
+    kind = models.CharField(max_length=50, verbose_name="작업 종류")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="작업 데이터")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING', verbose_name="상태")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="시도 횟수")
+    max_attempts = models.PositiveSmallIntegerField(default=5, verbose_name="최대 시도 횟수")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="실행 예정 시각")
+    locked_at = models.DateTimeField(blank=True, null=True, verbose_name="작업 시작 시각")
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name="처리 중인 워커")
+    heartbeat_at = models.DateTimeField(blank=True, null=True, verbose_name="마지막 생존 신호")
+    last_error = models.TextField(blank=True, verbose_name="마지막 오류")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="등록일")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
+
+    class Meta:
+        # 워커가 '실행할 차례인 대기 작업'을 찾는 조회 전용 인덱스
+        indexes = [models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx')]
+
+    def __str__(self):
+        return f"[작업] {self.kind} #{self.pk} ({self.status})"
+
+# 7. AI 웹툰 변환 결과 캐시 (같은 사진을 다시 변환할 때 API 비용/대기 시간 절약)
+class ConversionCache(models.Model):
+    key = models.CharField(max_length=64, unique=True, verbose_name="캐시 키 (SHA-256)")
+    file = models.FileField(upload_to='webtoon_cache/', verbose_name="변환 결과 파일")
+    size = models.PositiveIntegerField(default=0, verbose_name="파일 크기(bytes)")
+    hit_count = models.PositiveIntegerField(default=0, verbose_name="재사용 횟수")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="마지막 사용")
+
     def __str__(self):
-        return f"{self.author.username}: {self.content[:20]}"
\ No newline at end of file
+        return f"[변환 캐시] {self.key[:12]}... ({self.hit_count}회 재사용)"
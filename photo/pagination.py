@@ -0,0 +1,100 @@
+"""
+[파일 경로] photo/pagination.py
+[설명]
+(created_at, id) 키셋 커서 페이지네이션 헬퍼입니다.
+OFFSET 방식과 달리 몇 번째 페이지든 인덱스만 타고 바로 다음 N건을 가져오므로,
+게시물이 수만 건으로 늘어나도 페이지 렌더 시간과 메모리가 일정하게 유지됩니다.
+"""
+import base64
+from datetime import datetime
+from django.db.models import Q
+
+# 한 번에 내려보내는 카드 수 (첫 화면 + 무한 스크롤 1회분)
+PAGE_SIZE = 24
+
+
+def _encode(created_at, pk):
+    raw = f"{created_at.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def encode_cursor(obj):
+    """마지막 항목의 (created_at, id)를 URL에 실을 수 있는 문자열로 변환"""
+    return _encode(obj.created_at, obj.pk)
+
+
+def decode_cursor(cursor):
+    """커서 문자열을 (created_at, id)로 복원. 잘못된 값이면 None (첫 페이지로 취급)"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        created_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def normalize_cursor(cursor):
+    """
+    같은 위치를 가리키는 커서를 하나의 문자열로 (잘못된 값이면 None = 첫 페이지)
+    요청 파라미터 그대로가 아니라 이 값을 캐시 키로 써야 엉터리 커서마다 캐시 항목이 생기지 않음
+    """
+    position = decode_cursor(cursor)
+    return _encode(*position) if position else None
+
+
+def paginate(queryset, cursor=None, page_size=PAGE_SIZE, ascending=False):
+    """
+    최신순(created_at DESC, id DESC)으로 커서 다음 page_size건을 가져옵니다.
+    ascending=True면 오래된 순 (댓글 목록 등)
+
+    Returns:
+    --------
+    (list, str | None)
+        이번 페이지 항목들과 다음 페이지 커서 (마지막 페이지면 None)
+    """
+    if ascending:
+        queryset = queryset.order_by('created_at', 'id')
+    else:
+        queryset = queryset.order_by('-created_at', '-id')
+
+    position = decode_cursor(cursor)
+    if position:
+        created_at, pk = position
+        if ascending:
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            )
+        else:
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+    # 한 건 더 가져와서 다음 페이지 존재 여부를 COUNT 쿼리 없이 판단
+    items = list(queryset[:page_size + 1])
+    has_next = len(items) > page_size
+    items = items[:page_size]
+
+    next_cursor = encode_cursor(items[-1]) if has_next else None
+    return items, next_cursor
+
+
+def paginate_ranked(queryset, ranked_ids, cursor=None, page_size=PAGE_SIZE):
+    """
+    검색 결과처럼 '관련도 순서'가 정해진 id 목록을 페이지 단위로 잘라 가져옵니다.
+    순위 목록은 이미 상한(SEARCH_LIMIT)이 있으므로 커서는 목록 내 위치(offset)입니다.
+    """
+    try:
+        start = max(int(cursor or 0), 0)
+    except ValueError:
+        start = 0
+
+    page_ids = ranked_ids[start:start + page_size]
+    objects = queryset.in_bulk(page_ids)
+    items = [objects[pk] for pk in page_ids if pk in objects]
+
+    end = start + page_size
+    next_cursor = str(end) if end < len(ranked_ids) else None
+    return items, next_cursor
@@ -0,0 +1,235 @@
+"""
+[파일 경로] photo/perf.py
+[설명]
+요청 단위 성능 측정 미들웨어입니다. (settings.MIDDLEWARE 맨 앞에 등록)
+1. 요청마다 아래 항목의 횟수/시간을 모읍니다.
+   - total   : 요청 전체 시간
+   - db      : DB 쿼리 (connection.execute_wrapper)
+   - template: 템플릿 렌더링 (중첩 렌더링은 바깥쪽만 계산)
+   - storage : OCIStorage 호출 (config/storage.py에서 track('storage'))
+   - ai      : 외부 AI 호출 (photo/http.py에서 record('ai', ...))
+2. 결과는 JSON 한 줄 로그(django.perf 로거)와 Server-Timing 응답 헤더로 내보냅니다.
+   (헤더는 DEBUG이거나 스태프 사용자일 때만 - 내부 구조 노출 방지)
+3. PERF_PROFILE_DIR을 지정하면, PERF_SLOW_REQUEST_MS를 넘긴 요청은 그 시점부터 호출 스택을
+   주기적으로 샘플링해 flamegraph용 .folded 파일로 저장합니다. (빠른 요청에는 비용 없음)
+"""
+import os
+import re
+import sys
+import json
+import time
+import logging
+import threading
+import contextvars
+from collections import Counter
+from contextlib import contextmanager, ExitStack
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('django.perf')
+
+# 현재 요청의 측정값 (요청 밖 - 작업 큐 워커, 관리 명령 등 - 에서는 None이라 기록하지 않음)
+_current = contextvars.ContextVar('perf_timings', default=None)
+
+# Server-Timing 헤더에 넣을 항목 순서
+SERVER_TIMING_METRICS = ('db', 'template', 'storage', 'ai')
+
+
+class RequestTimings:
+    """요청 하나의 항목별 {이름: [횟수, 누적 초]}"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.spans = {name: [0, 0.0] for name in SERVER_TIMING_METRICS}
+        self.template_depth = 0
+
+    def add(self, name, seconds):
+        span = self.spans.setdefault(name, [0, 0.0])
+        span[0] += 1
+        span[1] += seconds
+
+
+def record(name, seconds):
+    """현재 요청에 측정값 추가 (요청 밖이면 무시)"""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def track(name):
+    """with 블록 소요 시간을 현재 요청의 name 항목에 기록"""
+    if _current.get() is None:
+        yield
+        return
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        record(name, time.monotonic() - started)
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    started = time.monotonic()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record('db', time.monotonic() - started)
+
+
+_template_patched = False
+
+
+def _patch_template_render():
+    """Django 템플릿 백엔드의 render를 감싸 렌더링 시간 기록 (프로세스당 한 번)"""
+    global _template_patched
+    if _template_patched:
+        return
+    from django.template.backends.django import Template
+
+    original_render = Template.render
+
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return original_render(self, context, request)
+        # 렌더링 중 다시 렌더링하는 경우(render_to_string 중첩) 바깥쪽 시간만 계산
+        timings.template_depth += 1
+        started = time.monotonic()
+        try:
+            return original_render(self, context, request)
+        finally:
+            timings.template_depth -= 1
+            if timings.template_depth == 0:
+                timings.add('template', time.monotonic() - started)
+
+    Template.render = render
+    _template_patched = True
+
+
+class StackSampler(threading.Thread):
+    """
+    다른 스레드(요청 처리 스레드)의 호출 스택을 interval초마다 샘플링
+    결과는 'a;b;c 횟수' 형식(folded stacks) - flamegraph.pl, speedscope 등에서 바로 열 수 있음
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='perf-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class SlowRequestProfiler:
+    """요청이 예산(budget)을 넘기면 그때부터 샘플링 시작, 끝나면 파일로 저장"""
+
+    def __init__(self, budget_seconds, interval):
+        self.sampler = StackSampler(threading.get_ident(), interval)
+        self.timer = threading.Timer(budget_seconds, self.sampler.start)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def finish(self, request, total_ms, directory):
+        """샘플링 중이었으면 .folded 파일 경로 반환, 아니면 None"""
+        self.timer.cancel()
+        if not self.sampler.is_alive():
+            return None
+        self.sampler.stop()
+        if not self.sampler.samples:
+            return None
+
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'root'
+        path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}_{request.method}_{slug[:60]}_{total_ms:.0f}ms.folded")
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.sampler.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def _server_timing(timings, total_ms):
+    parts = [f"total;dur={total_ms:.1f}"]
+    for name in SERVER_TIMING_METRICS:
+        count, seconds = timings.spans[name]
+        if count:
+            parts.append(f'{name};dur={seconds * 1000:.1f};desc="{count}"')
+    return ', '.join(parts)
+
+
+def _show_server_timing(request):
+    if settings.DEBUG:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_authenticated and user.is_staff)
+
+
+class PerfMiddleware:
+    """요청별 성능 측정 -> JSON 로그 + Server-Timing 헤더 (+ 느린 요청 프로파일)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'PERF_ENABLED', True)
+        self.slow_seconds = getattr(settings, 'PERF_SLOW_REQUEST_MS', 1000) / 1000
+        self.profile_dir = getattr(settings, 'PERF_PROFILE_DIR', '')
+        self.profile_interval = getattr(settings, 'PERF_PROFILE_INTERVAL_MS', 5) / 1000
+        if self.enabled:
+            _patch_template_render()
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        profiler = SlowRequestProfiler(self.slow_seconds, self.profile_interval) if self.profile_dir else None
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_db_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total_ms = (time.monotonic() - timings.started) * 1000
+        slow = total_ms >= self.slow_seconds * 1000
+        profile_path = None
+        if profiler is not None:
+            try:
+                profile_path = profiler.finish(request, total_ms, self.profile_dir)
+            except OSError as e:
+                logger.warning(f"⚠️ [Perf] 프로파일 저장 실패: {e}")
+
+        if _show_server_timing(request):
+            response['Server-Timing'] = _server_timing(timings, total_ms)
+
+        entry = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+        }
+        for name, (count, seconds) in timings.spans.items():
+            entry[f'{name}_count'] = count
+            entry[f'{name}_ms'] = round(seconds * 1000, 1)
+        if slow:
+            entry['slow'] = True
+        if profile_path:
+            entry['profile'] = profile_path
+        (logger.warning if slow else logger.info)(json.dumps(entry, ensure_ascii=False))
+        return response
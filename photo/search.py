@@ -0,0 +1,222 @@
+"""
+[파일 경로] photo/search.py
+[설명]
+SQLite FTS5 기반 전문 검색(Full-Text Search) 모듈입니다.
+1. 제목/설명/글 본문/댓글을 하나의 역색인(photo_search_index)에 모아 둡니다.
+2. 한국어는 띄어쓰기와 조사 때문에 단어 단위 검색이 잘 맞지 않으므로,
+   한글 구간은 2글자 단위(bi-gram)로 잘라서 색인합니다. ("운동회에서" -> 운동 동회 회에 에서)
+3. 검색 결과는 bm25 점수(제목 가중치 5배)로 관련도순 정렬됩니다.
+4. 색인 행의 rowid를 (문서 id, 종류)로 정해 두어 갱신/삭제가 색인 전체를 훑지 않고 행 하나만 건드립니다.
+   (doc_type/doc_id는 UNINDEXED 열이라 WHERE 조건으로 쓰면 전체 테이블을 읽음)
+5. SQLite가 아닌 DB에서는 is_available()이 False가 되어 뷰가 기존 LIKE 검색으로 동작합니다.
+"""
+import re
+import logging
+from django.db import connection
+
+logger = logging.getLogger('django')
+
+TABLE_NAME = 'photo_search_index'
+
+# 탭(문서 종류)별 최대 검색 결과 수
+SEARCH_LIMIT = 500
+
+HANGUL_RE = re.compile(r'[가-힣ㄱ-ㆎ]+')
+WORD_RE = re.compile(r'\w+')
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE_NAME} USING fts5("
+    "doc_type UNINDEXED, doc_id UNINDEXED, title, body, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+DROP_TABLE_SQL = f"DROP TABLE IF EXISTS {TABLE_NAME}"
+
+# rowid = 문서 id * DOC_TYPE_SLOTS + 종류 번호 (종류별로 겹치지 않는 고정 rowid)
+DOC_TYPE_CODES = {'media': 1, 'text': 2, 'code': 3}
+DOC_TYPE_SLOTS = 4
+
+
+def is_available():
+    """FTS5 색인을 사용할 수 있는 DB인지 확인"""
+    return connection.vendor == 'sqlite'
+
+
+def _hangul_bigrams(run):
+    if len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def tokenize(text):
+    """
+    색인/검색 공용 토크나이저
+    - 한글 구간: 2글자 단위 n-gram
+    - 그 외(영문/숫자): 소문자 단어 그대로
+    """
+    tokens = []
+    for word in WORD_RE.findall((text or '').lower()):
+        pos = 0
+        for match in HANGUL_RE.finditer(word):
+            if match.start() > pos:
+                tokens.append(word[pos:match.start()])
+            tokens.extend(_hangul_bigrams(match.group()))
+            pos = match.end()
+        if pos < len(word):
+            tokens.append(word[pos:])
+    return tokens
+
+
+def build_match_query(query):
+    """사용자 검색어를 FTS5 MATCH 구문으로 변환 (모든 토큰 AND, 영문/한 글자는 접두어 검색)"""
+    terms = []
+    for token in tokenize(query):
+        escaped = token.replace('"', '""')
+        if HANGUL_RE.search(token) and len(token) > 1:
+            terms.append(f'"{escaped}"')
+        else:
+            terms.append(f'"{escaped}"*')
+    return ' '.join(terms)
+
+
+# ----------------------------
+# 📚 문서 구성 (모델 -> 색인 텍스트)
+# ----------------------------
+
+def media_document(post):
+    comments = ' '.join(post.comments.values_list('content', flat=True))
+    return post.title, f"{post.description} {comments}"
+
+
+def text_document(post):
+    return post.title, f"{post.author_name} {post.content}"
+
+
+def code_document(link):
+    return link.title, link.description
+
+
+DOCUMENT_BUILDERS = {
+    'media': media_document,
+    'text': text_document,
+    'code': code_document,
+}
+
+# 색인 텍스트를 만드는 모델 필드 (save(update_fields=...)에 이 필드가 없으면 다시 색인하지 않음)
+INDEXED_FIELDS = {
+    'media': {'title', 'description'},
+    'text': {'title', 'author_name', 'content'},
+    'code': {'title', 'description'},
+}
+
+
+def needs_reindex(doc_type, update_fields):
+    return update_fields is None or bool(INDEXED_FIELDS[doc_type] & set(update_fields))
+
+
+# ----------------------------
+# ✍️ 색인 갱신
+# ----------------------------
+
+def doc_rowid(doc_type, doc_id):
+    return int(doc_id) * DOC_TYPE_SLOTS + DOC_TYPE_CODES[doc_type]
+
+
+def _row(doc_type, doc_id, title, body):
+    return [doc_rowid(doc_type, doc_id), doc_type, doc_id, ' '.join(tokenize(title)), ' '.join(tokenize(body))]
+
+
+INSERT_SQL = f"INSERT INTO {TABLE_NAME} (rowid, doc_type, doc_id, title, body) VALUES (%s, %s, %s, %s, %s)"
+
+
+def _write(cursor, doc_type, doc_id, title, body):
+    cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE rowid = %s", [doc_rowid(doc_type, doc_id)])
+    cursor.execute(INSERT_SQL, _row(doc_type, doc_id, title, body))
+
+
+def index_document(doc_type, obj):
+    """문서 하나를 (재)색인"""
+    if not is_available():
+        return
+    title, body = DOCUMENT_BUILDERS[doc_type](obj)
+    with connection.cursor() as cursor:
+        _write(cursor, doc_type, obj.pk, title, body)
+
+
+def remove_document(doc_type, doc_id):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE rowid = %s", [doc_rowid(doc_type, doc_id)])
+
+
+def index_rows(doc_type, rows):
+    """
+    새 문서 (doc_id, title, body) 목록을 한 번에 색인 (대량 데이터 생성용)
+    기존 행을 지우지 않으므로 아직 색인되지 않은 문서에만 사용합니다.
+    """
+    if not is_available():
+        return 0
+    params = [_row(doc_type, doc_id, title, body) for doc_id, title, body in rows]
+    with connection.cursor() as cursor:
+        cursor.executemany(INSERT_SQL, params)
+    return len(params)
+
+
+def rebuild_index(querysets):
+    """
+    색인을 비우고 전체 문서를 다시 넣습니다.
+
+    Parameters:
+    -----------
+    querysets : dict
+        {'media': QuerySet, 'text': QuerySet, 'code': QuerySet}
+
+    Returns:
+    --------
+    dict
+        문서 종류별 색인 건수
+    """
+    counts = {}
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute(f"DELETE FROM {TABLE_NAME}")
+        for doc_type, queryset in querysets.items():
+            builder = DOCUMENT_BUILDERS[doc_type]
+            counts[doc_type] = 0
+            for obj in queryset.iterator(chunk_size=500):
+                # 색인을 비운 뒤라 지울 행이 없으므로 바로 추가
+                cursor.execute(INSERT_SQL, _row(doc_type, obj.pk, *builder(obj)))
+                counts[doc_type] += 1
+        cursor.execute(f"INSERT INTO {TABLE_NAME}({TABLE_NAME}) VALUES ('optimize')")
+    return counts
+
+
+# ----------------------------
+# 🔍 검색
+# ----------------------------
+
+def search(query, doc_type, limit=SEARCH_LIMIT):
+    """
+    관련도순으로 정렬된 문서 id 목록을 반환합니다.
+    (FTS5를 쓸 수 없으면 None -> 호출 측에서 LIKE 검색으로 대체)
+    """
+    if not is_available():
+        return None
+
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    try:
+        with connection.cursor() as cursor:
+            # bm25 가중치: doc_type, doc_id(색인 안 함) 0 / title 5 / body 1
+            cursor.execute(
+                f"SELECT doc_id FROM {TABLE_NAME} "
+                f"WHERE {TABLE_NAME} MATCH %s AND doc_type = %s "
+                f"ORDER BY bm25({TABLE_NAME}, 0.0, 0.0, 5.0, 1.0) LIMIT %s",
+                [match, doc_type, limit],
+            )
+            return [int(row[0]) for row in cursor.fetchall()]
+    except Exception as e:
+        logger.error(f"❌ [Search Error] 전문 검색 실패, LIKE 검색으로 대체합니다: {e}")
+        return None
@@ -2,39 +2,106 @@
 [파일 경로] photo/signals.py
 [설명]
 1. MediaPost가 저장되면 실행됩니다.
-2. 업로드된 파일이 '이미지'인 경우:
-   - 원본을 original_file에 저장
-   - 카툰 필터를 적용하여 file에 저장
-   - Gemini AI로 캡션 생성
-3. .env 파일의 'GEMINI_API_KEY'를 사용하여 인증합니다.
+2. 업로드된 파일이 '이미지'이고 웹툰 변환을 선택한 경우:
+   - 원본을 original_file에 저장 (공개 갤러리에는 노출되지 않음)
+   - 상태를 '변환 중'으로 바꾸고 작업 큐에 변환 작업을 등록
+   - 실제 AI 변환은 `python manage.py run_jobs` 워커가 처리 (요청은 바로 응답)
+3. 게시되는 이미지(원본 또는 변환본)가 바뀌면 썸네일 파생본 생성 작업을 등록합니다.
+   영상이면 영상 처리 작업(포스터/길이/웹 재생용 사본, photo/video.py)을 등록합니다.
+4. 게시물/글/자료/댓글이 바뀌면 전문 검색 색인을 갱신합니다.
+5. 같은 변경에 대해 메인 페이지 HTML 조각 캐시의 버전을 올립니다. (photo/fragment_cache.py)
+6. 좋아요 버튼(toggle_like) 외의 경로로 좋아요가 바뀌면 저장된 좋아요 수(like_count)를 맞춥니다.
+7. 업로드(종류/크기), 웹툰 변환 등록, 댓글 작성/삭제 횟수를 운영 지표(/metrics)에 기록합니다.
+8. 새로 올라온 사진의 지각 해시를 계산하고 비슷한 기존 게시물을 찾아 둡니다. (photo/dedup.py)
+   업로드 요청 밖에서 들어온 사진(직접 업로드, 기존 게시물)은 해시 계산 작업을 등록합니다.
 """
 
 import os
 import logging
-from django.db.models.signals import post_save, pre_save
+import mimetypes
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_save, pre_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
-from django.core.files.base import ContentFile
-from .models import MediaPost
-from .filters import apply_webtoon_filter
-from PIL import Image
-from io import BytesIO
+from .models import MediaPost, TextPost, CodeLink, OfficialLink, Comment
+from .jobs import enqueue
+from .derivatives import needs_derivatives
+from .video import needs_video_processing
+from . import search
+from . import fragment_cache
+from . import metrics
+from . import dedup
 
 # 로깅 설정
 logger = logging.getLogger('django')
 
+WEBTOON_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.webp', '.heic']
+
+UPLOADS = metrics.counter('photo_uploads_total', "갤러리 업로드 수", ['type'])
+UPLOAD_BYTES = metrics.histogram(
+    'photo_upload_bytes', "갤러리 업로드 파일 크기(바이트)", ['type'],
+    buckets=(100 * 1024, 500 * 1024, 1024 ** 2, 5 * 1024 ** 2, 10 * 1024 ** 2, 50 * 1024 ** 2, 200 * 1024 ** 2, 1024 ** 3),
+)
+WEBTOON_CONVERSIONS = metrics.counter(
+    'photo_webtoon_conversions_total', "웹툰 변환 결과 (queued/success/error/fallback_original)", ['outcome']
+)
+COMMENTS = metrics.counter('photo_comments_total', "댓글 작성/삭제 수", ['action'])
+
+
+def upload_type(name):
+    """파일 이름 -> image / video / other"""
+    content_type, _ = mimetypes.guess_type(name or '')
+    if content_type and content_type.split('/')[0] in ('image', 'video'):
+        return content_type.split('/')[0]
+    if os.path.splitext(name or '')[1].lower() in WEBTOON_EXTENSIONS:
+        return 'image'
+    return 'other'
+
+
+@receiver(pre_save, sender=MediaPost)
+def count_upload(sender, instance, **kwargs):
+    """새로 올라온 파일(아직 스토리지에 저장 전)의 종류/크기 기록 (원본 이동 전에 실행되도록 먼저 등록)"""
+    if not instance.file or instance.file._committed:
+        return
+    kind = upload_type(instance.file.name)
+    UPLOADS.inc(type=kind)
+    UPLOAD_BYTES.observe(instance.file.size, type=kind)
+
+
+@receiver(pre_save, sender=MediaPost)
+def compute_perceptual_hash(sender, instance, **kwargs):
+    """새로 올라온 사진의 지각 해시 + 비슷한 기존 게시물 확인 (원본 이동 전에 실행되도록 먼저 등록)"""
+    if not instance.file or instance.file._committed or upload_type(instance.file.name) != 'image':
+        return
+    try:
+        value = dedup.dhash(instance.file)
+    except Exception as e:
+        logger.warning(f"⚠️ [Dedup] 지각 해시 계산 실패 (나중에 작업 큐에서 재시도): {e}")
+        return
+    finally:
+        instance.file.seek(0)
+    dedup.set_hash(instance, value)
+
+    # 업로드한 사람에게 알려 주므로 공개 게시물만 비교 (관리자가 숨긴 게시물 제목은 노출하지 않음)
+    matches = dedup.find_similar(value, queryset=MediaPost.objects.filter(is_public=True), exclude_pk=instance.pk)
+    instance._near_duplicates = [post for post, _ in matches]
+    if matches:
+        dedup.NEAR_DUPLICATES.inc(action='warned')
+        logger.info(f"👯 [Dedup] 비슷한 사진 {len(matches)}건 발견: {instance.title} ~ {matches[0][0].title} (차이 {matches[0][1]}비트)")
+
 
 @receiver(pre_save, sender=MediaPost)
-def apply_cartoon_before_save(sender, instance, **kwargs):
+def prepare_webtoon_conversion(sender, instance, **kwargs):
     """
-    MediaPost 저장 전에 웹툰 스타일 적용 (선택적)
-    원본은 original_file에 저장, 변환본은 file에 저장
+    MediaPost 저장 전에 웹툰 변환 대상인지 판단 (선택적)
+    새로 올라온 원본은 original_file로 옮겨 두고, 변환본이 나올 때까지 file은 비워 둡니다.
     """
-    # 1. 새로 업로드된 파일이 있고, 아직 처리되지 않은 경우만 실행
+    # 1. 파일이 있고, 아직 변환 요청/처리가 되지 않은 경우만 실행
     if not instance.file:
         return
 
-    # 이미 처리된 경우 (original_file이 있으면) 패스
-    if instance.original_file:
+    if instance.conversion_status != 'NONE':
         return
 
     # 2. 체크박스가 해제되어 있으면 변환을 수행하지 않고 그냥 종료 (원본으로 저장됨)
@@ -43,48 +110,164 @@ def apply_cartoon_before_save(sender, instance, **kwargs):
         return
 
     # 3. 이미지 파일인지 확인 (확장자 검사)
-    valid_extensions = ['.jpg', '.jpeg', '.png', '.webp', '.heic']
     ext = os.path.splitext(instance.file.name)[1].lower()
-
-    if ext not in valid_extensions:
+    if ext not in WEBTOON_EXTENSIONS:
         logger.info(f"⏭️ [Webtoon Skip] 이미지가 아닌 파일입니다: {instance.title} ({ext})")
         return
 
+    # 4. 방금 업로드된 파일이면 원본 보관 경로로 바로 저장 (공개 경로에 원본을 남기지 않음)
+    if not instance.file._committed:
+        original_name = f"original_{os.path.basename(instance.file.name)}"
+        instance.original_file.save(original_name, instance.file.file, save=False)
+        instance.file = None
+        logger.info(f"💾 [Original Saved] 원본 보존 완료: {instance.original_file.name}")
+
+    instance.conversion_status = 'PROCESSING'
+    instance._enqueue_webtoon = True
+
+
+@receiver(post_save, sender=MediaPost)
+def enqueue_webtoon_conversion(sender, instance, **kwargs):
+    """DB에 저장된 뒤(pk 확정) 변환 작업을 큐에 등록"""
+    if getattr(instance, '_enqueue_webtoon', False):
+        instance._enqueue_webtoon = False
+        enqueue('webtoon', {'post_id': instance.pk})
+        WEBTOON_CONVERSIONS.inc(outcome='queued')
+        logger.info(f"🎨 [Webtoon Queued] 웹툰 변환 대기열 등록: {instance.title}")
+
+
+@receiver(post_save, sender=MediaPost)
+def enqueue_derivatives(sender, instance, update_fields=None, **kwargs):
+    """게시 이미지가 새로 정해지면 (업로드 / 변환 완료 / 변환 실패 후 원본 게시) 썸네일 생성 등록"""
+    if update_fields is not None and 'file' not in update_fields:
+        return
+    if needs_derivatives(instance):
+        enqueue('derivatives', {'post_id': instance.pk})
+
+
+@receiver(post_save, sender=MediaPost)
+def enqueue_perceptual_hash(sender, instance, update_fields=None, **kwargs):
+    """업로드 시 계산하지 못한 사진(직접 업로드, 기존 게시물)은 작업 큐에서 해시 계산"""
+    if update_fields is not None and not {'file', 'original_file'} & set(update_fields):
+        return
+    if dedup.needs_hash(instance):
+        enqueue('phash', {'post_id': instance.pk})
+
+
+@receiver(post_save, sender=MediaPost)
+def enqueue_video_processing(sender, instance, update_fields=None, **kwargs):
+    """영상이 새로 올라오거나 바뀌면 포스터/영상 정보/웹 재생용 사본 작업 등록"""
+    if update_fields is not None and 'file' not in update_fields:
+        return
+    if needs_video_processing(instance):
+        enqueue('video', {'post_id': instance.pk})
+
+
+# ----------------------------
+# 🔍 전문 검색 색인 동기화
+# ----------------------------
+SEARCH_DOC_TYPES = {MediaPost: 'media', TextPost: 'text', CodeLink: 'code'}
+
+
+@receiver(post_save, sender=MediaPost)
+@receiver(post_save, sender=TextPost)
+@receiver(post_save, sender=CodeLink)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    doc_type = SEARCH_DOC_TYPES[sender]
+    # 변환 상태/해시/썸네일처럼 색인 텍스트와 상관없는 필드만 저장한 경우는 건너뜀
+    if not search.needs_reindex(doc_type, update_fields):
+        return
     try:
-        logger.info(f"🎨 [Webtoon Filter] 웹툰 필터 적용 시작: {instance.title}")
-
-        # 4. 원본 파일 읽기
-        instance.file.open()
-        original_data = instance.file.read()
-        instance.file.close()
-
-        # 5. 원본을 original_file에 별도 저장
-        original_name = f"original_{instance.file.name.split('/')[-1]}"
-        instance.original_file.save(
-            original_name,
-            ContentFile(original_data),
-            save=False  # 아직 DB에 저장하지 않음
-        )
-        logger.info(f"💾 [Original Saved] 원본 보존 완료: {original_name}")
-
-        # 6. 원본 이미지 데이터를 처리할 수 있도록 전달
-        logger.info("🎨 [Webtoon Filter] Fal AI로 웹툰 스타일 변환 진행")
-        webtoon_image = apply_webtoon_filter(original_data)
-
-        # 7. 변환된 이미지를 file 필드에 저장 (기존 파일 교체)
-        webtoon_name = f"webtoon_{instance.file.name.split('/')[-1]}"
-        webtoon_data = webtoon_image.read()
-
-        instance.file.save(
-            webtoon_name,
-            ContentFile(webtoon_data),
-            save=False  # 아직 DB에 저장하지 않음
-        )
-
-        logger.info(f"✅ [Webtoon Applied] 웹툰 필터 적용 완료: {webtoon_name}")
+        search.index_document(doc_type, instance)
+    except Exception as e:
+        logger.error(f"❌ [Search Index] 색인 갱신 실패 ({instance}): {e}")
+
 
+@receiver(post_delete, sender=MediaPost)
+@receiver(post_delete, sender=TextPost)
+@receiver(post_delete, sender=CodeLink)
+def remove_from_search_index(sender, instance, **kwargs):
+    try:
+        search.remove_document(SEARCH_DOC_TYPES[sender], instance.pk)
     except Exception as e:
-        logger.error(f"❌ [Webtoon Error] 웹툰 필터 적용 중 오류 발생: {str(e)}")
-        # 오류 발생 시 변환 포기하고 원본으로 저장됨 (이전 필드 값 유지)
+        logger.error(f"❌ [Search Index] 색인 삭제 실패 ({instance}): {e}")
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def update_search_index_for_comment(sender, instance, **kwargs):
+    """댓글은 해당 사진 문서의 본문에 포함되어 있으므로 사진 문서를 다시 색인"""
+    post = MediaPost.objects.filter(pk=instance.post_id).first()
+    if post is None:  # 게시물 삭제로 인한 연쇄 삭제
+        return
+    try:
+        search.index_document('media', post)
+    except Exception as e:
+        logger.error(f"❌ [Search Index] 댓글 색인 갱신 실패 ({post}): {e}")
+
+
+# ----------------------------
+# 🧊 HTML 조각 캐시 무효화
+# ----------------------------
+CACHE_SECTIONS = {TextPost: 'text', CodeLink: 'code', OfficialLink: 'links'}
+
+
+@receiver(post_save, sender=TextPost)
+@receiver(post_save, sender=CodeLink)
+@receiver(post_save, sender=OfficialLink)
+@receiver(post_delete, sender=TextPost)
+@receiver(post_delete, sender=CodeLink)
+@receiver(post_delete, sender=OfficialLink)
+def invalidate_section_cache(sender, instance, **kwargs):
+    fragment_cache.bump(CACHE_SECTIONS[sender])
+
+
+@receiver(post_save, sender=MediaPost)
+@receiver(post_delete, sender=MediaPost)
+def invalidate_media_card_cache(sender, instance, **kwargs):
+    fragment_cache.bump(f'post:{instance.pk}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_media_card_cache_for_comment(sender, instance, **kwargs):
+    fragment_cache.bump(f'post:{instance.post_id}')
+
+
+# ----------------------------
+# ❤️ 좋아요 수(like_count) 동기화
+# ----------------------------
+
+@receiver(m2m_changed, sender=MediaPost.likes.through)
+def sync_like_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """관리자 화면 등에서 likes를 직접 수정한 경우 (toggle_like는 through 모델을 직접 다루므로 해당 없음)"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # user.liked_posts 쪽에서 바뀐 경우: 해당 게시물들만 다시 계산 (clear는 reconcile_like_counts로)
+        posts = MediaPost.objects.filter(pk__in=pk_set or [])
+    else:
+        posts = MediaPost.objects.filter(pk=instance.pk)
+    for post in posts:
+        MediaPost.objects.filter(pk=post.pk).update(like_count=post.likes.count())
+
+
+@receiver(pre_delete, sender=User)
+def release_likes_of_deleted_user(sender, instance, **kwargs):
+    """사용자 삭제 시 연쇄 삭제될 좋아요만큼 게시물의 좋아요 수 차감"""
+    MediaPost.objects.filter(likes=instance).update(like_count=Greatest(F('like_count') - 1, 0))
+
+
+# ----------------------------
+# 📈 운영 지표
+# ----------------------------
+
+@receiver(post_save, sender=Comment)
+def count_comment_added(sender, instance, created, **kwargs):
+    if created:
+        COMMENTS.inc(action='add')
 
 
+@receiver(post_delete, sender=Comment)
+def count_comment_deleted(sender, instance, **kwargs):
+    COMMENTS.inc(action='delete')
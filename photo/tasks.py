@@ -0,0 +1,180 @@
+"""
+[파일 경로] photo/tasks.py
+[설명]
+작업 큐(photo/jobs.py)에서 실행되는 실제 작업들입니다.
+- webtoon: 업로드된 사진을 AI 웹툰체로 변환한 뒤 file 필드를 변환본으로 교체
+  (해시가 똑같은 사진이 이미 변환되어 있으면 AI를 부르지 않고 그 변환본을 복사해 사용, photo/dedup.py)
+- derivatives: 갤러리용 썸네일(AVIF/WebP 여러 크기)과 흐린 미리보기 생성
+- video: 영상 정보(길이/해상도/코덱) 기록, 포스터/썸네일, 웹 재생용 사본 생성
+- phash: 업로드 시 계산하지 못한 사진의 지각 해시 계산
+- direct_upload_cleanup: 브라우저 직접 업로드 중 완료 요청 없이 만료된 객체/PAR 정리
+"""
+import os
+import time
+import logging
+from django.conf import settings
+from django.core.files.base import ContentFile
+from .models import MediaPost
+from .filters import convert_to_webtoon
+from .derivatives import build_derivatives, needs_derivatives
+from .video import process_video, needs_video_processing
+from .jobs import job_handler
+from .signals import WEBTOON_CONVERSIONS
+from . import direct_upload
+from . import dedup
+from . import metrics
+
+logger = logging.getLogger('django')
+
+WEBTOON_CONVERSION_SECONDS = metrics.histogram(
+    'photo_webtoon_conversion_seconds', "게시물 1건 웹툰 변환 소요 시간(초)", ['outcome']
+)
+
+
+def mark_conversion_failed(payload):
+    """재시도를 모두 소진한 경우: 원본을 그대로 게시 (예전 '오류 시 원본 저장' 동작과 동일)"""
+    post = MediaPost.objects.filter(pk=payload['post_id']).first()
+    if post is None:
+        return
+    if not post.file and post.original_file:
+        post.file = post.original_file.name
+    post.conversion_status = 'FAILED'
+    post.save(update_fields=['file', 'conversion_status'])
+    WEBTOON_CONVERSIONS.inc(outcome='fallback_original')
+    logger.warning(f"⚠️ [Webtoon Failed] 변환 실패로 원본을 게시합니다: {post.title}")
+
+
+@job_handler('webtoon', on_failure=mark_conversion_failed)
+def convert_media_post(payload, ctx):
+    """작업 큐에서 MediaPost 하나를 웹툰체로 변환"""
+    post = MediaPost.objects.filter(pk=payload['post_id']).first()
+    if post is None:
+        logger.info(f"⏭️ [Webtoon Skip] 게시물이 삭제되었습니다: #{payload['post_id']}")
+        return
+    convert_post(post, check=ctx.check, timeout=ctx.remaining)
+
+
+def convert_post(post, check=None, timeout=None):
+    """
+    MediaPost 하나를 웹툰체로 변환 (작업 큐 / convert_webtoons 명령 공용)
+    - 새 업로드: 원본은 이미 original_file에 있고 file은 비어 있음
+    - 기존 게시물(나중에 변환 체크): file의 원본을 original_file로 옮긴 뒤 변환
+
+    check : callable
+        결과를 반영하기 직전에 호출 (제한 시간 초과 시 예외)
+    timeout : float
+        AI 변환에 쓸 수 있는 시간(초, 작업 큐의 남은 시간) - 외부 호출 대기 시간을 이 안으로 제한
+    """
+    started = time.monotonic()
+    try:
+        _convert_post(post, check, timeout)
+    except Exception:
+        WEBTOON_CONVERSIONS.inc(outcome='error')
+        WEBTOON_CONVERSION_SECONDS.observe(time.monotonic() - started, outcome='error')
+        raise
+    WEBTOON_CONVERSIONS.inc(outcome='success')
+    WEBTOON_CONVERSION_SECONDS.observe(time.monotonic() - started, outcome='success')
+
+
+def _reusable_conversion(post, original_data):
+    """
+    같은 사진(해시 완전 일치 + 원본 바이트 일치)이 이미 변환되어 있으면 그 게시물 (해시가 없으면 여기서 계산)
+    해시만 같고 내용이 다른 사진은 재사용하지 않고 새로 변환
+    """
+    if not getattr(settings, 'DUPLICATE_REUSE_CONVERSION', True):
+        return None
+    if post.phash is None:
+        try:
+            dedup.set_hash(post, dedup.dhash(original_data))
+        except Exception as e:
+            logger.warning(f"⚠️ [Dedup] 지각 해시 계산 실패: {e}")
+            return None
+    return dedup.find_reusable_conversion(post.phash, original_data, exclude_pk=post.pk)
+
+
+def _read(field):
+    field.open('rb')
+    try:
+        return field.read()
+    finally:
+        field.close()
+
+
+def _convert_post(post, check, timeout=None):
+    source = post.original_file or post.file
+    original_data = _read(source)
+
+    reusable = _reusable_conversion(post, original_data)
+    webtoon_data = None
+    if reusable is not None:
+        # AI는 부르지 않고 변환본 내용만 복사 (파일은 게시물마다 따로 - 한쪽을 지우거나 다시 변환해도 서로 영향 없음)
+        try:
+            webtoon_data = _read(reusable.file)
+        except Exception as e:
+            logger.warning(f"⚠️ [Dedup] 재사용할 변환본을 읽지 못해 새로 변환: {reusable.file.name} ({e})")
+    if webtoon_data is not None:
+        dedup.NEAR_DUPLICATES.inc(action='reused')
+        logger.info(f"👯 [Webtoon Reused] 같은 사진의 변환본 재사용: {post.title} <- {reusable.title}")
+    else:
+        logger.info(f"🎨 [Webtoon Filter] 웹툰 필터 적용 시작: {post.title}")
+        webtoon_data = convert_to_webtoon(original_data, timeout=timeout).read()
+
+    # 제한 시간을 넘겼다면 결과를 반영하지 않음 (다른 워커가 이미 재시도 중일 수 있음)
+    if check:
+        check()
+
+    base_name = os.path.basename(source.name)
+    if not post.original_file:
+        post.original_file.save(f"original_{base_name}", ContentFile(original_data), save=False)
+        logger.info(f"💾 [Original Saved] 원본 보존 완료: {post.original_file.name}")
+
+    replaced_name = post.file.name if post.file and post.file.name != post.original_file.name else None
+
+    webtoon_name = f"webtoon_{base_name.removeprefix('original_')}"
+    post.file.save(webtoon_name, ContentFile(webtoon_data), save=False)
+    post.conversion_status = 'DONE'
+    post.apply_webtoon_filter = True
+    post.save(update_fields=['file', 'original_file', 'conversion_status', 'apply_webtoon_filter', *dedup.HASH_FIELDS])
+
+    # 기존 게시물의 공개 경로에 남아 있던 원본(또는 이전 변환본) 정리
+    if replaced_name and replaced_name != post.file.name:
+        post.file.storage.delete(replaced_name)
+
+    logger.info(f"✅ [Webtoon Applied] 웹툰 필터 적용 완료: {post.file.name}")
+
+
+@job_handler('derivatives')
+def generate_derivatives(payload, ctx):
+    """게시 중인 file 기준으로 썸네일 파생본 생성 (이미 최신이면 건너뜀)"""
+    post = MediaPost.objects.filter(pk=payload['post_id']).first()
+    if post is None or not needs_derivatives(post):
+        return
+    build_derivatives(post)
+
+
+@job_handler('video')
+def process_media_video(payload, ctx):
+    """영상 게시물 처리 (이미 최신이면 건너뜀, ffmpeg 변환은 작업 제한 시간 안에서만)"""
+    post = MediaPost.objects.filter(pk=payload['post_id']).first()
+    if post is None or not needs_video_processing(post):
+        return
+    process_video(post, check=ctx.check, timeout=ctx.remaining)
+
+
+@job_handler('phash')
+def compute_perceptual_hash(payload, ctx):
+    """사진 게시물의 지각 해시 계산 (원본 기준, 이미 있으면 건너뜀)"""
+    post = MediaPost.objects.filter(pk=payload['post_id']).first()
+    if post is None or not dedup.needs_hash(post):
+        return
+    try:
+        dedup.update_hash(post)
+    except Exception as e:
+        # 열 수 없는 이미지(HEIC 등)는 재시도해도 같으므로 실패로 남기지 않음
+        logger.warning(f"⚠️ [Dedup] 지각 해시 계산 불가: {post.title} ({e})")
+
+
+@job_handler('direct_upload_cleanup')
+def cleanup_direct_upload(payload, ctx):
+    """직접 업로드 시작 후 완료되지 않은 객체 삭제 (photo/direct_upload.py)"""
+    direct_upload.cleanup(payload['name'], payload.get('par_id'))
@@ -0,0 +1,43 @@
+"""
+[파일 경로] photo/templatetags/photo_extras.py
+[설명] 템플릿 전용 필터 모음
+- highlight: 검색어와 일치하는 부분을 <mark>로 감싸 강조 표시합니다.
+- duration: 영상 길이(초)를 '1:05', '1:02:03' 형식으로 표시합니다.
+"""
+import re
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+
+@register.filter
+def highlight(text, search_term):
+    """
+    {{ post.title|highlight:search_term }} -> 일치 구간을 <mark>로 감싼 안전한 HTML
+    원문에서 검색어를 찾은 뒤 조각마다 escape (escape된 '&amp;' 같은 엔티티 안을 잘라 먹지 않도록)
+    """
+    text = str(text or '')
+    words = [re.escape(word) for word in (search_term or '').split() if word]
+    if not words:
+        return escape(text)
+
+    # 캡처 그룹으로 나누면 홀수 번째 조각이 일치 구간
+    pattern = re.compile('(' + '|'.join(sorted(words, key=len, reverse=True)) + ')', re.IGNORECASE)
+    parts = pattern.split(text)
+    return mark_safe(''.join(
+        f'<mark class="px-0">{escape(part)}</mark>' if i % 2 else escape(part)
+        for i, part in enumerate(parts)
+    ))
+
+
+@register.filter
+def duration(seconds):
+    """{{ post.duration|duration }} -> 65.2초는 '1:05'"""
+    if seconds is None:
+        return ''
+    total = int(round(seconds))
+    hours, rest = divmod(total, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
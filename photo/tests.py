@@ -0,0 +1,564 @@
+"""
+[파일 경로] photo/tests.py
+[설명]
+photo 앱 테스트입니다.
+1. 카드가 1장이든 여러 장이든 메인 페이지/무한 스크롤 응답의 쿼리 수가 같아야 합니다. (N+1 방지)
+2. 다른 프로세스(run_jobs 워커)가 바꾼 카드 내용이 캐시 때문에 가려지지 않아야 합니다.
+3. /metrics 접근 제한과 끝난 프로세스의 지표 파일 정리
+4. 외부 API 호출: POST 재시도 여부, 서킷 브레이커 시험 호출 해제, 작업의 남은 시간 안에서만 AI 호출
+   웹툰 변환 캐시 키(메타데이터 무시, 원본 크기 구분)와 적중/실패 지표
+5. 작업 큐: 살아 있는 워커의 작업은 다시 가져가지 않고, 죽은 워커의 작업만 이어받음
+6. 검색어 강조(highlight) 필터가 HTML 엔티티를 깨뜨리지 않음
+7. 커서 페이지네이션, CSV 사용자 일괄 등록, 비슷한 사진 찾기
+8. convert_webtoons 대상 선택 (변환을 선택하지 않은 게시물 제외)
+9. 영상이 바뀌었는데 웹 사본을 만들지 않는 경우 이전 영상의 사본/포스터 정리
+10. 검색 색인: 문서마다 고정 rowid로 갱신/삭제, 색인 텍스트와 상관없는 저장은 다시 색인하지 않음
+11. 브라우저 직접 업로드 완료 요청이 겹쳐도 게시물은 하나만 생성
+실행: python manage.py test photo  (DEBUG/OCI 설정과 상관없이 임시 로컬 스토리지 사용)
+"""
+import os
+import sys
+import time
+import json
+import atexit
+import shutil
+import tempfile
+import subprocess
+from io import BytesIO
+from datetime import timedelta
+from unittest import mock
+import requests
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from .models import MediaPost, TextPost, Comment, Job
+from .jobs import enqueue, claim_jobs, heartbeat, run_job, job_handler
+from .pagination import encode_cursor, decode_cursor, normalize_cursor, paginate
+from .user_import import import_users
+from . import metrics, http, dedup, video, search, filters, conversion_cache, fragment_cache, direct_upload
+from .management.commands import convert_webtoons
+from .templatetags.photo_extras import highlight
+
+# 실제 조각 캐시(.cache 폴더/Redis)를 건드리지 않도록 테스트마다 프로세스 메모리 캐시 사용
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'photo-tests'}}
+
+# DEBUG 여부와 상관없이(운영 설정은 OCIStorage) 임시 폴더의 로컬 스토리지 사용
+TEST_MEDIA_ROOT = tempfile.mkdtemp(prefix='photo-tests-')
+atexit.register(shutil.rmtree, TEST_MEDIA_ROOT, ignore_errors=True)
+TEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(
+    CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT, MEDIA_URL='/media/', METRICS_DIR='',
+)
+class PhotoTestCase(TestCase):
+    """공통 테스트 설정 (로컬 스토리지, 메모리 캐시, 지표 파일 저장 안 함)"""
+
+
+class GalleryQueryCountTests(PhotoTestCase):
+    MANY = 8
+
+    def setUp(self):
+        self.user = User.objects.create_user('viewer', password='pw')
+        self.other = User.objects.create_user('writer', password='pw')
+        self.client.force_login(self.user)
+
+    def _add_posts(self, count):
+        start = MediaPost.objects.count()
+        for i in range(start, start + count):
+            post = MediaPost.objects.create(title=f"행사 사진 {i}", file=f"media_posts/photo_{i}.jpg", is_public=True)
+            post.likes.add(self.user, self.other)
+            Comment.objects.create(post=post, author=self.other, content=f"댓글 {i}")
+
+    def _clear_caches(self):
+        # 카드/구역 조각 캐시가 남아 있으면 두 번째 요청의 쿼리가 줄어드므로 매번 비움
+        for alias in caches:
+            caches[alias].clear()
+
+    def _count_queries(self, path, data=None):
+        self._clear_caches()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(path, data)
+        self.assertEqual(response.status_code, 200)
+        return len(captured)
+
+    def _assert_same_count(self, path, data=None):
+        self._add_posts(1)
+        single = self._count_queries(path, data)
+
+        self._add_posts(self.MANY - 1)
+        self._clear_caches()
+        with self.assertNumQueries(single):
+            response = self.client.get(path, data)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_index_query_count_is_constant(self):
+        response = self._assert_same_count('/')
+        self.assertContains(response, f"행사 사진 {self.MANY - 1}")
+
+    def test_feed_query_count_is_constant(self):
+        response = self._assert_same_count('/feed/media/')
+        self.assertIn(f"행사 사진 {self.MANY - 1}", response.json()['html'])
+
+    def test_search_feed_query_count_is_constant(self):
+        # 검색 중에는 카드 캐시를 쓰지 않으므로 매번 렌더링 경로 그대로 측정
+        self._assert_same_count('/feed/media/', {'q': '행사'})
+
+
+class GalleryCardCacheTests(PhotoTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('viewer', password='pw')
+        self.client.force_login(self.user)
+        for alias in caches:
+            caches[alias].clear()
+
+    def test_card_reflects_changes_made_without_version_bump(self):
+        # run_jobs 워커처럼 이 프로세스의 캐시 버전을 올리지 못한 변경도 다음 요청에 보여야 함
+        post = MediaPost.objects.create(title="행사 사진", file="media_posts/photo.jpg", is_public=True)
+        html = self.client.get('/feed/media/').json()['html']
+        self.assertNotIn('image/webp', html)
+
+        MediaPost.objects.filter(pk=post.pk).update(derivatives={
+            'source': post.file.name,
+            'webp': {'320': 'media_posts/derivatives/photo_abc_w320.webp'},
+        })
+        html = self.client.get('/feed/media/').json()['html']
+        self.assertIn('photo_abc_w320.webp', html)
+
+
+@override_settings(METRICS_TOKEN='secret-token')
+class MetricsAccessTests(PhotoTestCase):
+    def test_local_requests_are_not_trusted(self):
+        # nginx 뒤에서는 모든 요청이 127.0.0.1에서 오므로 접속 IP만으로는 허용하지 않음
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 404)
+
+    def test_bearer_token(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 404)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret-token')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_empty_token_is_never_accepted(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 404)
+
+    def test_staff(self):
+        self.client.force_login(User.objects.create_user('admin', password='pw', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+class MetricsFileTests(PhotoTestCase):
+    def test_files_of_finished_processes_are_pruned(self):
+        finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+        finished.wait()
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            dump = {'photo_test_total': {
+                'kind': 'counter', 'help': '', 'labelnames': [], 'buckets': [], 'values': [[[], 3]],
+            }}
+            for pid in (finished.pid, os.getpid()):
+                with open(os.path.join(directory, f"{pid}_1.json"), 'w', encoding='utf-8') as f:
+                    json.dump(dump, f)
+
+            merged = metrics.collect()
+            self.assertEqual(merged['photo_test_total']['values'][()], 3)
+            self.assertNotIn(f"{finished.pid}_1.json", os.listdir(directory))
+            self.assertIn(f"{os.getpid()}_1.json", os.listdir(directory))
+
+
+@override_settings(OUTBOUND_RETRY_BASE_DELAY=0.001, OUTBOUND_RETRY_MAX_DELAY=0.001)
+class OutboundRetryTests(PhotoTestCase):
+    def _provider(self, name):
+        http.PROVIDERS.pop(name, None)
+        provider = http.get_provider(name)
+        provider.max_retries = 2
+        return provider
+
+    def _response(self, status):
+        response = requests.Response()
+        response.status_code = status
+        return response
+
+    def test_post_is_not_retried_by_default(self):
+        provider = self._provider('test-post')
+        with mock.patch.object(provider.session, 'request', return_value=self._response(503)) as send:
+            self.assertEqual(http.post('test-post', 'https://example.invalid/').status_code, 503)
+        self.assertEqual(send.call_count, 1)
+
+    def test_post_retry_opt_in_and_get_retried(self):
+        provider = self._provider('test-retry')
+        with mock.patch.object(provider.session, 'request', return_value=self._response(503)) as send:
+            http.post('test-retry', 'https://example.invalid/', retry=True)
+            http.get('test-retry', 'https://example.invalid/')
+        self.assertEqual(send.call_count, 6)
+
+    def test_half_open_trial_released_after_unexpected_error(self):
+        provider = self._provider('test-breaker')
+        provider.breaker._opened_at = time.monotonic() - provider.breaker.reset_timeout
+        with mock.patch.object(provider.session, 'request', side_effect=ValueError("bad body")):
+            with self.assertRaises(ValueError):
+                http.get('test-breaker', 'https://example.invalid/')
+        self.assertEqual(provider.breaker.state, 'HALF_OPEN')
+        with mock.patch.object(provider.session, 'request', return_value=self._response(200)):
+            self.assertEqual(http.get('test-breaker', 'https://example.invalid/').status_code, 200)
+        self.assertEqual(provider.breaker.state, 'CLOSED')
+
+
+@job_handler('test-noop')
+def _noop_job(payload, ctx):
+    ctx.check()
+
+
+
+@override_settings(WEBTOON_ENGINE='remote', WEBTOON_INPUT_TRANSPORT='data_url', FAL_TIMEOUT=120)
+class WebtoonDeadlineTests(PhotoTestCase):
+    def setUp(self):
+        buffer = BytesIO()
+        Image.new('RGB', (32, 32), 'blue').save(buffer, 'JPEG')
+        self.image = buffer.getvalue()
+        self.client_mock = mock.Mock()
+        self.client_mock.subscribe.return_value = {'images': [{'url': 'https://example.invalid/out.jpg'}]}
+        response = requests.Response()
+        response.status_code, response._content = 200, b'converted'
+        patches = [
+            mock.patch.dict(os.environ, {'FAL_API_KEY': 'test'}),
+            mock.patch.object(filters, '_get_fal_client', return_value=self.client_mock),
+            mock.patch.object(http, 'get', return_value=response),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_remaining_time_bounds_ai_call_and_download(self):
+        self.assertEqual(filters.convert_to_webtoon(self.image, timeout=5).read(), b'converted')
+        self.assertLessEqual(self.client_mock.subscribe.call_args.kwargs['client_timeout'], 5)
+        connect, read = http.get.call_args.kwargs['timeout']
+        self.assertLessEqual(max(connect, read), 5)
+
+    def test_expired_deadline_skips_ai_call(self):
+        with self.assertRaises(filters.WebtoonConversionError):
+            filters.convert_to_webtoon(self.image, timeout=0)
+        self.client_mock.subscribe.assert_not_called()
+
+
+class ConversionCacheKeyTests(PhotoTestCase):
+    def _jpeg(self, size, color='green', **options):
+        buffer = BytesIO()
+        Image.new('RGB', size, color).save(buffer, 'JPEG', quality=90, **options)
+        return buffer.getvalue()
+
+    def test_key_ignores_metadata_but_not_size(self):
+        key = conversion_cache.make_key(self._jpeg((1200, 800)), 'prompt', 'model')
+        exif = Image.Exif()
+        exif[0x010F] = 'camera'  # 제조사 (회전과 상관없는 메타데이터)
+        self.assertEqual(conversion_cache.make_key(self._jpeg((1200, 800), exif=exif), 'prompt', 'model'), key)
+        self.assertNotEqual(conversion_cache.make_key(self._jpeg((1210, 800)), 'prompt', 'model'), key)
+        self.assertNotEqual(conversion_cache.make_key(self._jpeg((1200, 800), 'red'), 'prompt', 'model'), key)
+        self.assertNotEqual(conversion_cache.make_key(self._jpeg((1200, 800)), 'prompt', 'other'), key)
+
+    def test_lookups_are_exported_as_metrics(self):
+        before = conversion_cache.CACHE_EVENTS.snapshot().get(('misses',), 0)
+        self.assertIsNone(conversion_cache.get('missing-key'))
+        self.assertEqual(conversion_cache.CACHE_EVENTS.snapshot()[('misses',)], before + 1)
+
+class JobReclaimTests(PhotoTestCase):
+    def _claim(self, worker_id):
+        claimed = claim_jobs(1, worker_id)
+        return claimed[0] if claimed else None
+
+    def test_long_running_job_with_live_worker_is_not_reclaimed(self):
+        job = enqueue('test-noop')
+        self._claim('worker-a')
+        # 시작한 지 오래됐어도 생존 신호가 최근이면 다른 워커가 가져가지 않음
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        heartbeat([job], 'worker-a')
+        self.assertIsNone(self._claim('worker-b'))
+
+    def test_dead_worker_job_is_reclaimed_and_old_owner_cannot_finish_it(self):
+        job = enqueue('test-noop')
+        stale = self._claim('worker-a')
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        reclaimed = self._claim('worker-b')
+        self.assertEqual(reclaimed.locked_by, 'worker-b')
+
+        # 예전 워커가 뒤늦게 끝내도 결과를 기록하지 못함 (ctx.check()에서 중단)
+        run_job(stale)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), ('RUNNING', 'worker-b'))
+
+        run_job(reclaimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'DONE')
+
+
+class HighlightFilterTests(PhotoTestCase):
+    def test_terms_inside_entities_are_not_split(self):
+        self.assertEqual(highlight('Tom & "Jerry" <3', 'amp'), 'Tom &amp; &quot;Jerry&quot; &lt;3')
+        self.assertEqual(highlight('a < b', 'lt'), 'a &lt; b')
+
+    def test_matches_are_escaped_and_marked(self):
+        self.assertEqual(
+            highlight('<b>AI</b> 사진', 'ai <b>'),
+            '<mark class="px-0">&lt;b&gt;</mark><mark class="px-0">AI</mark>&lt;/b&gt; 사진',
+        )
+
+    def test_no_term_returns_escaped_text(self):
+        self.assertEqual(highlight('<script>', ''), '&lt;script&gt;')
+
+
+class CursorCodecTests(PhotoTestCase):
+    def test_round_trip_and_invalid_values(self):
+        post = MediaPost.objects.create(title="사진", file="media_posts/a.jpg")
+        cursor = encode_cursor(post)
+        self.assertNotIn('=', cursor)
+        self.assertEqual(decode_cursor(cursor), (post.created_at, post.pk))
+        for bad in ('', None, '!!!', 'bm90LWEtY3Vyc29y', encode_cursor(post)[:-3]):
+            self.assertIsNone(decode_cursor(bad), bad)
+
+    def test_pages_do_not_overlap_with_equal_timestamps(self):
+        posts = [MediaPost.objects.create(title=f"사진 {i}", file=f"media_posts/{i}.jpg") for i in range(5)]
+        MediaPost.objects.update(created_at=posts[0].created_at)  # 같은 시각이면 id로 순서 결정
+
+        seen, cursor = [], None
+        while True:
+            items, cursor = paginate(MediaPost.objects.all(), cursor, page_size=2)
+            seen += [item.pk for item in items]
+            if cursor is None:
+                break
+        self.assertEqual(seen, sorted((post.pk for post in posts), reverse=True))
+
+
+    def test_page_cache_keyed_by_decoded_cursor(self):
+        self.client.force_login(User.objects.create_user('reader', password='pw'))
+        post = TextPost.objects.create(title='글', content='본문', author_name='학생')
+        cursor = encode_cursor(post)
+        self.assertEqual(normalize_cursor(cursor + '=='), cursor)
+
+        with mock.patch.object(fragment_cache, 'get_or_render', wraps=fragment_cache.get_or_render) as cached:
+            for value in ('!!!', 'garbage', '', cursor, cursor + '=='):
+                self.assertEqual(self.client.get('/feed/text/', {'cursor': value}).status_code, 200)
+        keys = [call.args[1] for call in cached.call_args_list]
+        self.assertEqual(keys, ['page:first'] * 3 + [f'page:{cursor}'] * 2)
+
+class UserImportTests(PhotoTestCase):
+    def _csv(self, text):
+        return BytesIO(text.encode('utf-8-sig'))
+
+    def test_import_report(self):
+        User.objects.create_user('old@school.com', email='old@school.com')
+        report = import_users(self._csv(
+            "email, name\n"
+            "new1@school.com,홍길동\n"
+            "old@school.com,기존\n"
+            "new1@school.com,중복\n"
+            "not-an-email,오류\n"
+            ",빈칸\n"
+            "new2@school.com,\n"
+        ), batch_size=2)
+        self.assertEqual((report.created, report.skipped, report.failed), (2, 2, 2))
+        user = User.objects.get(username='new1@school.com')
+        self.assertEqual(user.first_name, "홍길동")
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual({row[2] for row in report.rows}, {'skip', 'error'})
+
+    def test_dry_run_does_not_write(self):
+        report = import_users(self._csv("email\na@school.com\nb@school.com\n"), dry_run=True)
+        self.assertEqual(report.created, 2)
+        self.assertFalse(User.objects.filter(email__endswith='@school.com').exists())
+
+    def test_missing_email_header(self):
+        with self.assertRaises(ValueError):
+            import_users(self._csv("name\n홍길동\n"))
+
+
+class DedupLookupTests(PhotoTestCase):
+    def _post(self, title, value):
+        post = MediaPost(title=title, file=f"media_posts/{title}.jpg")
+        dedup.set_hash(post, value)
+        post.save()
+        return post
+
+    def test_hash_survives_signed_storage(self):
+        value = (1 << 64) - 1
+        post = self._post('max', value)
+        post.refresh_from_db()
+        self.assertLess(post.phash, 0)
+        self.assertEqual(dedup.distance(post.phash, value), 0)
+
+    def test_find_similar_uses_segments_and_distance(self):
+        base = 0x0123_4567_89AB_CDEF
+        exact = self._post('exact', base)
+        near = self._post('near', base ^ 0b111)                  # 3비트 차이 (마지막 조각만 다름)
+        spread = self._post('spread', base ^ (1 | 1 << 20 | 1 << 40 | 1 << 60))  # 4조각 모두 다름
+        self._post('far', base ^ 0b1111)                         # 4비트 차이
+
+        matches = dedup.find_similar(base)
+        self.assertEqual([(post.pk, bits) for post, bits in matches], [(exact.pk, 0), (near.pk, 3)])
+        self.assertNotIn(spread.pk, [post.pk for post, _ in matches])
+        self.assertEqual([post for post, _ in dedup.find_similar(base, exclude_pk=exact.pk, max_bits=0)], [])
+
+    def test_clusters(self):
+        base = 0xFFFF_0000_FFFF_0000
+        a, b = self._post('a', base), self._post('b', base ^ 1)
+        self._post('c', ~base & ((1 << 64) - 1))
+        groups = dedup.clusters(MediaPost.objects.all())
+        self.assertEqual([{post.pk for post in group} for group in groups], [{a.pk, b.pk}])
+
+
+    def test_reuse_requires_identical_original(self):
+        value = 0x0F0F_0F0F_0F0F_0F0F
+        donor = self._post('donor', value)
+        donor.original_file.save('original_donor.jpg', ContentFile(b'donor-bytes'), save=False)
+        donor.conversion_status = 'DONE'
+        donor.save()
+
+        # 해시만 같고 내용이 다르면 재사용하지 않음
+        self.assertIsNone(dedup.find_reusable_conversion(value, b'other-bytes'))
+        self.assertEqual(dedup.find_reusable_conversion(value, b'donor-bytes'), donor)
+        self.assertIsNone(dedup.find_reusable_conversion(value, b'donor-bytes', exclude_pk=donor.pk))
+
+class ConvertWebtoonsSelectionTests(PhotoTestCase):
+    def _post(self, title, status, opted_in, name=None):
+        post = MediaPost.objects.create(title=title, file=name or f"media_posts/{title}.jpg")
+        MediaPost.objects.filter(pk=post.pk).update(conversion_status=status, apply_webtoon_filter=opted_in)
+        return post.pk
+
+    def _select(self, **options):
+        command = convert_webtoons.Command()
+        parser = command.create_parser('manage.py', 'convert_webtoons')
+        args = []
+        for key, value in options.items():
+            args += [f"--{key.replace('_', '-')}"] + ([] if value is True else [str(v) for v in value])
+        parsed = vars(parser.parse_args(args))
+        with tempfile.TemporaryDirectory() as directory:
+            return command._select(parsed, convert_webtoons.Checkpoint(os.path.join(directory, 'checkpoint.json')))
+
+    def test_default_selects_only_opted_in_posts(self):
+        failed = self._post('failed', 'FAILED', True)
+        pending = self._post('pending', 'NONE', True)
+        self._post('opted-out', 'NONE', False)
+        self._post('done', 'DONE', True)
+        self._post('video', 'NONE', True, name="media_posts/clip.mp4")
+        self.assertEqual(self._select(), [failed, pending])
+
+    def test_opted_out_posts_need_explicit_flag(self):
+        opted_out = self._post('opted-out', 'NONE', False)
+        self.assertEqual(self._select(include_opted_out=True), [opted_out])
+        self.assertEqual(self._select(ids=[opted_out]), [])
+
+
+@override_settings(VIDEO_WEB_RENDITION='off')
+class VideoNoRenditionTests(PhotoTestCase):
+    def setUp(self):
+        # 이전 영상(old.mp4)으로 만든 웹 사본/포스터가 남아 있는 게시물의 파일만 new.mp4로 교체
+        post = MediaPost.objects.create(title='clip', file='media_posts/old.mp4')
+        post.file.save('new.mp4', ContentFile(b'new-video'), save=False)
+        post.web_file.save('old_web.mp4', ContentFile(b'old-web'), save=False)
+        post.poster.save('old_poster.jpg', ContentFile(b'old-poster'), save=False)
+        post.derivatives = {'source': 'media_posts/old.mp4'}
+        post.save()
+        self.post = post
+        self.old_web, self.old_poster = post.web_file.name, post.poster.name
+
+    def _process(self, poster):
+        info = {'duration': 2.0, 'width': 64, 'height': 48, 'codec': 'mp4v', 'poster': poster}
+        with mock.patch.object(video, 'probe', return_value=info), \
+                mock.patch.object(video, 'build_derivatives'):
+            video.process_video(self.post)
+        self.post.refresh_from_db()
+
+    def _exists(self, name):
+        return self.post.file.storage.exists(name)
+
+    def test_stale_rendition_and_poster_are_replaced(self):
+        self._process(Image.new('RGB', (64, 48), 'red'))
+        self.assertFalse(self.post.web_file)
+        self.assertEqual(self.post.playback_url, self.post.file.url)
+        self.assertTrue(self.post.poster)
+        self.assertNotEqual(self.post.poster.name, self.old_poster)
+        self.assertFalse(self._exists(self.old_web))
+        self.assertFalse(self._exists(self.old_poster))
+
+    def test_missing_poster_frame_clears_old_poster(self):
+        self._process(None)
+        self.assertFalse(self.post.web_file)
+        self.assertFalse(self.post.poster)
+        self.assertIsNone(self.post.phash)
+        self.assertFalse(self._exists(self.old_web))
+        self.assertFalse(self._exists(self.old_poster))
+
+
+class SearchIndexTests(PhotoTestCase):
+    def _rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT rowid, doc_type, doc_id FROM {search.TABLE_NAME} ORDER BY rowid")
+            return cursor.fetchall()
+
+    def test_documents_keyed_by_rowid(self):
+        post = TextPost.objects.create(title='운동회 사진', content='본문', author_name='학생')
+        media = MediaPost.objects.create(title='운동회 영상', file='media_posts/a.jpg')
+        self.assertEqual(search.search('운동회', 'text'), [post.pk])
+
+        post.title = '합창 대회'
+        post.save()
+        self.assertEqual(search.search('운동회', 'text'), [])
+        self.assertEqual(search.search('합창', 'text'), [post.pk])
+        self.assertEqual(self._rows(), sorted([
+            (search.doc_rowid('text', post.pk), 'text', post.pk),
+            (search.doc_rowid('media', media.pk), 'media', media.pk),
+        ]))
+
+        post.delete()
+        self.assertEqual(self._rows(), [(search.doc_rowid('media', media.pk), 'media', media.pk)])
+
+    def test_unrelated_update_fields_skip_reindex(self):
+        post = MediaPost.objects.create(title='졸업식', file='media_posts/b.jpg')
+        with mock.patch.object(search, 'index_document') as index_document:
+            post.conversion_status = 'DONE'
+            post.save(update_fields=['conversion_status'])
+            index_document.assert_not_called()
+            post.save(update_fields=['title', 'conversion_status'])
+            index_document.assert_called_once_with('media', post)
+
+
+class DirectUploadFinishTests(PhotoTestCase):
+    NAME = 'media_posts/direct.jpg'
+
+    def setUp(self):
+        self.user = User.objects.create_user('uploader', password='pw')
+        self.token = signing.dumps({
+            'user': self.user.pk, 'name': self.NAME, 'par': 'par-1', 'size': 32,
+            'content_type': 'image/jpeg', 'original': False,
+            'title': '직접 업로드', 'description': '', 'webtoon': False,
+        }, salt=direct_upload.TOKEN_SALT, compress=True)
+        self.storage = mock.Mock()
+        self.storage.head.return_value = {'content-length': '32', 'content-type': 'image/jpeg'}
+        self.storage.read_range.return_value = b'\xff\xd8\xff' + b'\0' * 29
+
+    def test_second_finish_is_rejected(self):
+        direct_upload.finish(self.user, self.token, storage=self.storage)
+        with self.assertRaises(direct_upload.DirectUploadError) as raised:
+            direct_upload.finish(self.user, self.token, storage=self.storage)
+        self.assertEqual(raised.exception.status, 409)
+        self.assertEqual(MediaPost.objects.filter(file=self.NAME).count(), 1)
+
+    def test_concurrent_finish_creates_one_post(self):
+        # 첫 확인 뒤 객체를 검사하는 사이에 다른 요청이 먼저 게시물을 만든 경우
+        def finish_elsewhere(name):
+            MediaPost.objects.create(title='먼저 완료', file=self.NAME)
+            return {'content-length': '32', 'content-type': 'image/jpeg'}
+
+        self.storage.head.side_effect = finish_elsewhere
+        with self.assertRaises(direct_upload.DirectUploadError) as raised:
+            direct_upload.finish(self.user, self.token, storage=self.storage)
+        self.assertEqual(raised.exception.status, 409)
+        self.assertEqual(MediaPost.objects.filter(file=self.NAME).count(), 1)
+        self.storage.delete.assert_not_called()
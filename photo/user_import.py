@@ -0,0 +1,153 @@
+"""
+[파일 경로] photo/user_import.py
+[설명]
+관리자 화면의 CSV 사용자 일괄 등록 로직입니다. (CustomUserAdmin.upload_csv에서 사용)
+1. 업로드 파일을 통째로 메모리에 올리지 않고 한 줄씩 읽습니다. (utf-8 BOM 자동 처리)
+2. BATCH_SIZE 줄마다 이미 있는 이메일/아이디를 한 번의 쿼리로 확인하고,
+   새 사용자는 bulk_create로 한 번에 넣습니다. (배치마다 트랜잭션 하나)
+3. 줄 번호별 오류/건너뜀 사유를 ImportReport에 모아 화면에 보여줍니다.
+4. dry_run=True면 DB에 쓰지 않고 결과만 미리 봅니다.
+"""
+import io
+import csv
+import logging
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+logger = logging.getLogger('django')
+
+BATCH_SIZE = 1000
+
+# 화면에 보여줄 최대 오류 줄 수 (전체 건수는 별도로 집계)
+MAX_REPORTED_ROWS = 500
+
+USERNAME_MAX_LENGTH = User._meta.get_field('username').max_length
+
+
+class ImportReport:
+    """CSV 등록 결과 (등록/건너뜀/오류 건수와 줄별 사유)"""
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.rows = []  # (줄 번호, 이메일, 구분, 사유)
+
+    def add(self, line, email, kind, reason):
+        if kind == 'skip':
+            self.skipped += 1
+        else:
+            self.failed += 1
+        if len(self.rows) < MAX_REPORTED_ROWS:
+            self.rows.append((line, email, kind, reason))
+
+    @property
+    def truncated(self):
+        return self.skipped + self.failed > len(self.rows)
+
+    @property
+    def total(self):
+        return self.created + self.skipped + self.failed
+
+
+def _flush(batch, report):
+    """배치 하나 처리: 기존 계정 확인(쿼리 2회) -> bulk_create (트랜잭션 1개)"""
+    emails = [email for _, email, _ in batch]
+    existing = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+    existing |= set(User.objects.filter(username__in=emails).values_list('username', flat=True))
+
+    # 비밀번호 없는 계정 (구글 로그인 전용) - 해시 계산 없이 같은 값 재사용
+    unusable_password = make_password(None)
+    new_users = []
+    for line, email, name in batch:
+        if email in existing:
+            report.add(line, email, 'skip', "이미 등록된 계정")
+            continue
+        new_users.append(User(
+            username=email, email=email, first_name=name,
+            password=unusable_password, is_active=True,
+        ))
+
+    if report.dry_run:
+        report.created += len(new_users)
+        return
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(new_users, batch_size=BATCH_SIZE)
+        report.created += len(new_users)
+    except IntegrityError as e:
+        # 확인과 저장 사이에 다른 경로(구글 가입 등)로 같은 계정이 생긴 경우: 배치 전체 롤백
+        logger.warning(f"⚠️ [CSV Import] 배치 저장 충돌로 {len(new_users)}건을 건너뜁니다: {e}")
+        for user in new_users:
+            report.add('-', user.email, 'error', "저장 중 충돌 (다시 업로드하면 처리됩니다)")
+
+
+def import_users(uploaded_file, dry_run=False, batch_size=BATCH_SIZE):
+    """
+    CSV(email,name)로 사용자 일괄 등록
+
+    Parameters:
+    -----------
+    uploaded_file : UploadedFile
+        바이너리 파일 객체 (request.FILES)
+    dry_run : bool
+        True면 저장하지 않고 결과만 계산
+
+    Returns:
+    --------
+    ImportReport
+    """
+    report = ImportReport(dry_run=dry_run)
+    text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.DictReader(text)
+        if not reader.fieldnames or 'email' not in [f.strip() for f in reader.fieldnames]:
+            raise ValueError("첫 줄(헤더)에 email 열이 없습니다.")
+        reader.fieldnames = [f.strip() for f in reader.fieldnames]
+
+        seen = set()
+        batch = []
+        for row in reader:
+            line = reader.line_num
+            email = (row.get('email') or '').strip()
+            name = (row.get('name') or '').strip()
+
+            if not email:
+                report.add(line, '', 'error', "이메일 없음")
+                continue
+            try:
+                validate_email(email)
+            except ValidationError:
+                report.add(line, email, 'error', "이메일 형식 오류")
+                continue
+            if len(email) > USERNAME_MAX_LENGTH:
+                report.add(line, email, 'error', f"이메일이 너무 김 (최대 {USERNAME_MAX_LENGTH}자)")
+                continue
+            if email in seen:
+                report.add(line, email, 'skip', "파일 안에서 중복")
+                continue
+            seen.add(email)
+
+            batch.append((line, email, name[:150]))
+            if len(batch) >= batch_size:
+                _flush(batch, report)
+                batch = []
+
+        if batch:
+            _flush(batch, report)
+    except UnicodeDecodeError:
+        raise ValueError("UTF-8 인코딩 CSV만 지원합니다. (엑셀에서 'CSV UTF-8'로 저장해 주세요)")
+    finally:
+        # TextIOWrapper가 업로드 파일을 닫지 않도록 분리
+        text.detach()
+
+    mode = "미리보기" if dry_run else "등록"
+    logger.info(
+        f"👥 [CSV Import] {mode} 완료: 등록 {report.created} / 건너뜀 {report.skipped} / 오류 {report.failed}"
+    )
+    return report
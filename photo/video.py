@@ -0,0 +1,281 @@
+"""
+[파일 경로] photo/video.py
+[설명]
+갤러리 영상 처리 단계입니다. (작업 큐의 'video' 작업, photo/tasks.py)
+1. OpenCV로 영상 정보(길이, 해상도, 코덱)를 읽어 MediaPost에 기록합니다.
+2. 앞부분(VIDEO_POSTER_SECOND초)의 한 장면을 포스터 JPEG로 저장하고,
+   사진과 같은 방식으로 AVIF/WebP 썸네일과 흐린 미리보기를 만듭니다. (photo/derivatives.py)
+   비슷한 영상 찾기용 지각 해시도 이 포스터로 계산합니다. (photo/dedup.py)
+   -> 갤러리는 포스터만 보여 주고, 재생을 누를 때만 영상을 받습니다.
+3. ffmpeg가 있으면 웹 재생용 사본(web_file)을 만듭니다. (VIDEO_WEB_RENDITION='auto')
+   - H.264이고 VIDEO_WEB_MAX_HEIGHT 이하: 다시 인코딩하지 않고 moov 상자만 앞으로 옮김 (faststart)
+   - 그 밖의 코덱/큰 해상도: H.264 + AAC로 줄여서 인코딩
+   - 이미 faststart인 H.264 MP4면 원본을 그대로 재생
+"""
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+import subprocess
+from contextlib import contextmanager
+from io import BytesIO
+import cv2
+from PIL import Image
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from .derivatives import build_derivatives, delete_derivatives
+from . import dedup
+
+logger = logging.getLogger('django')
+
+VIDEO_EXTENSIONS = ['.mp4', '.mov', '.m4v', '.webm', '.mkv', '.avi', '.3gp']
+
+POSTER_MAX_WIDTH = 1280
+POSTER_QUALITY = 85
+
+# 다시 인코딩 없이 브라우저가 재생할 수 있는 코덱 (OpenCV FOURCC 기준)
+H264_CODECS = {'avc1', 'h264', 'x264', 'H264', 'AVC1'}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def is_video(name):
+    return os.path.splitext(name or '')[1].lower() in VIDEO_EXTENSIONS
+
+
+def needs_video_processing(post):
+    """영상인데 포스터가 없거나 다른 파일로 만들어진 경우 (파생본의 source로 판단)"""
+    if not post.file or not is_video(post.file.name):
+        return False
+    return not post.poster or (post.derivatives or {}).get('source') != post.file.name
+
+
+@contextmanager
+def local_copy(field):
+    """
+    OpenCV/ffmpeg에 넘길 로컬 파일 경로
+    로컬 스토리지면 원래 경로를 그대로, OCI면 임시 파일로 청크 단위로 받음 (메모리에 전체를 올리지 않음)
+    """
+    storage = field.storage
+    try:
+        path = storage.path(field.name)
+    except NotImplementedError:
+        path = None
+    if path and os.path.isfile(path):
+        yield path
+        return
+
+    suffix = os.path.splitext(field.name)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix) as tmp:
+        if hasattr(storage, 'open_stream'):
+            data = storage.open_stream(field.name).data
+            try:
+                for chunk in data.raw.stream(CHUNK_SIZE, decode_content=False):
+                    tmp.write(chunk)
+            finally:
+                close = getattr(data, 'close', None)
+                if close:
+                    close()
+        else:
+            with storage.open(field.name, 'rb') as f:
+                shutil.copyfileobj(f, tmp, CHUNK_SIZE)
+        tmp.flush()
+        yield tmp.name
+
+
+def _fourcc(value):
+    code = int(value)
+    text = ''.join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip('\x00 ')
+    return text if text.isprintable() else ''
+
+
+def probe(path):
+    """
+    영상 정보 + 포스터 장면
+
+    Returns:
+    --------
+    dict
+        duration(초, 알 수 없으면 None), width, height, codec, poster(PIL Image 또는 None)
+    """
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"영상을 열 수 없습니다: {os.path.basename(path)}")
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0
+        frames = capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+        duration = round(frames / fps, 3) if fps > 0 and frames > 0 else None
+        info = {
+            'duration': duration,
+            'width': int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)) or None,
+            'height': int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)) or None,
+            'codec': _fourcc(capture.get(cv2.CAP_PROP_FOURCC)),
+        }
+
+        # 첫 프레임은 검은 화면인 경우가 많아 조금 뒤의 장면을 사용 (짧은 영상은 가운데)
+        second = getattr(settings, 'VIDEO_POSTER_SECOND', 1.0)
+        if duration:
+            second = min(second, duration / 2)
+        capture.set(cv2.CAP_PROP_POS_MSEC, second * 1000)
+        ok, frame = capture.read()
+        if not ok:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = capture.read()
+        info['poster'] = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)) if ok else None
+        return info
+    finally:
+        capture.release()
+
+
+def _poster_jpeg(image):
+    if image.width > POSTER_MAX_WIDTH:
+        height = max(round(image.height * POSTER_MAX_WIDTH / image.width), 1)
+        image = image.resize((POSTER_MAX_WIDTH, height), Image.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=POSTER_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def _is_faststart(path):
+    """MP4/MOV의 최상위 상자 중 moov가 mdat보다 앞에 있으면 True (다 받기 전에 재생 시작 가능)"""
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    return False
+                size = int.from_bytes(header[:4], 'big')
+                kind = header[4:8]
+                if kind == b'moov':
+                    return True
+                if kind == b'mdat':
+                    return False
+                if size == 1:
+                    size = int.from_bytes(f.read(8), 'big')
+                    f.seek(size - 16, os.SEEK_CUR)
+                elif size < 8:
+                    return False
+                else:
+                    f.seek(size - 8, os.SEEK_CUR)
+    except OSError:
+        return False
+
+
+def _ffmpeg():
+    if getattr(settings, 'VIDEO_WEB_RENDITION', 'auto') != 'auto':
+        return None
+    return shutil.which(getattr(settings, 'FFMPEG_BINARY', 'ffmpeg'))
+
+
+def make_web_rendition(path, info, ffmpeg, timeout=None):
+    """
+    웹 재생용 MP4 사본 경로 (필요 없으면 None, 호출 측이 임시 파일 삭제)
+    """
+    max_height = getattr(settings, 'VIDEO_WEB_MAX_HEIGHT', 720)
+    h264 = info['codec'] in H264_CODECS
+    small = not info['height'] or info['height'] <= max_height
+    ext = os.path.splitext(path)[1].lower()
+    if h264 and small and ext in ('.mp4', '.m4v') and _is_faststart(path):
+        return None
+
+    fd, out_path = tempfile.mkstemp(suffix='.mp4')
+    os.close(fd)
+    if h264 and small:
+        # 다시 인코딩하지 않고 컨테이너만 다시 씀 (수 초 이내)
+        args = ['-c', 'copy']
+    else:
+        args = [
+            '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23', '-pix_fmt', 'yuv420p',
+            '-vf', f"scale=-2:'min({max_height},ih)'",
+            '-c:a', 'aac', '-b:a', '128k',
+        ]
+    command = [ffmpeg, '-y', '-loglevel', 'error', '-i', path, *args, '-movflags', '+faststart', out_path]
+    try:
+        subprocess.run(command, check=True, capture_output=True, timeout=timeout)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        os.remove(out_path)
+        stderr = getattr(e, 'stderr', b'') or b''
+        raise RuntimeError(f"ffmpeg 변환 실패: {stderr.decode('utf-8', 'replace')[-300:] or e}")
+    return out_path
+
+
+def process_video(post, check=None, timeout=None):
+    """
+    영상 게시물 하나 처리: 정보 기록 + 포스터/썸네일 + (가능하면) 웹 재생용 사본
+
+    check : callable
+        결과를 반영하기 직전에 호출 (작업 제한 시간 초과 시 예외)
+    """
+    source_name = post.file.name
+    # 다른 영상으로 바뀌었으면 이전 영상에서 만든 포스터/웹 사본은 새로 만들지 못해도 버림
+    source_changed = (post.derivatives or {}).get('source') != source_name
+    previous_web = post.web_file.name if post.web_file else None
+    previous_poster = post.poster.name if post.poster else None
+    stale_derivatives = None
+    web_path = None
+    with local_copy(post.file) as path:
+        info = probe(path)
+        ffmpeg = _ffmpeg()
+        if ffmpeg:
+            try:
+                web_path = make_web_rendition(path, info, ffmpeg, timeout=timeout)
+            except RuntimeError as e:
+                # 사본이 없어도 원본으로 재생은 되므로 실패로 처리하지 않음
+                logger.warning(f"⚠️ [Video] 웹 재생용 사본 생성 실패, 원본으로 재생: {e}")
+
+    try:
+        if check:
+            check()
+
+        post.duration = info['duration']
+        post.width = info['width']
+        post.height = info['height']
+        post.video_codec = info['codec'][:20]
+
+        stem = os.path.splitext(os.path.basename(source_name))[0]
+        if info['poster'] is not None:
+            poster = _poster_jpeg(info['poster'])
+            digest = hashlib.sha256(poster).hexdigest()[:12]
+            post.poster.save(f"{stem}_{digest}.jpg", ContentFile(poster), save=False)
+            dedup.set_hash(post, dedup.dhash(info['poster']))
+        elif source_changed:
+            post.poster = None
+            for name in dedup.HASH_FIELDS:
+                setattr(post, name, None)
+            stale_derivatives, post.derivatives, post.placeholder = post.derivatives, {}, ''
+
+        if web_path:
+            with open(web_path, 'rb') as f:
+                post.web_file.save(f"{stem}_web.mp4", File(f), save=False)
+        elif source_changed:
+            post.web_file = None
+        post.save(update_fields=[
+            'duration', 'width', 'height', 'video_codec', 'poster', 'web_file',
+            'derivatives', 'placeholder', *dedup.HASH_FIELDS,
+        ])
+    finally:
+        if web_path and os.path.exists(web_path):
+            os.remove(web_path)
+
+    if previous_web and previous_web != (post.web_file.name if post.web_file else None):
+        post.web_file.storage.delete(previous_web)
+    if previous_poster and previous_poster != (post.poster.name if post.poster else None):
+        post.poster.storage.delete(previous_poster)
+    if stale_derivatives:
+        delete_derivatives(stale_derivatives, post.file.storage)
+
+    # 포스터로 갤러리 썸네일(AVIF/WebP)과 흐린 미리보기 생성 (source는 영상 파일 이름)
+    if post.poster:
+        post.poster.open('rb')
+        try:
+            build_derivatives(post, data=post.poster.read())
+        finally:
+            post.poster.close()
+
+    logger.info(
+        f"🎬 [Video] 처리 완료: {post.title} ({info['width']}x{info['height']}, "
+        f"{info['codec'] or '?'}, {info['duration'] or '?'}초, 웹 사본 {'있음' if post.web_file else '없음'})"
+    )
+    return info
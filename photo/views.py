@@ -3,50 +3,197 @@
 [설명] 검색 기능(q)이 고도화된 뷰입니다.
 사용자 입력(제목, 사용자 설명)과 AI 분석(AI 설명)을 동시에 검색(OR 조건)합니다.
 """
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.db.models import Q  # 검색 기능을 위해 추가 (OR 연산)
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, OuterRef
+from django.db.models.functions import Greatest
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, Http404
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.safestring import mark_safe
 from .models import MediaPost, TextPost, CodeLink, OfficialLink, Comment
-from .forms import MediaPostForm, TextPostForm, CodeLinkForm
+from .forms import MediaPostForm, TextPostForm, CodeLinkForm, DirectUploadForm
+from .pagination import paginate, paginate_ranked, normalize_cursor
+from . import search
+from . import fragment_cache
+from . import metrics
+from . import direct_upload
 import json
+import hashlib
+import logging
+
+logger = logging.getLogger('django')
+
+# 탭 이름 -> (조각 템플릿 context 변수명, 카드 조각 템플릿)
+# 갤러리는 카드 한 장 단위 템플릿 (게시물별로 캐시)
+FEED_TABS = {
+    'media': ('post', 'partials/media_card.html'),
+    'text': ('text_posts', 'partials/text_cards.html'),
+    'code': ('code_links', 'partials/code_cards.html'),
+}
+
+
+def _media_queryset(user):
+    """
+    갤러리 카드 한 장을 그리는 데 필요한 데이터를 한 번에 가져오는 쿼리셋
+    - like_count: 좋아요 수는 모델에 저장된 값을 그대로 사용 (COUNT 집계 없음)
+    - liked_by_me: 현재 사용자가 눌렀는지 여부 (EXISTS 서브쿼리)
+    댓글 개수는 카드 캐시가 없을 때만 _render_media_cards에서 집계합니다. (본문은 /comment/list/)
+    게시물 수와 상관없이 쿼리 수가 고정됩니다.
+    """
+    my_like = MediaPost.likes.through.objects.filter(mediapost_id=OuterRef('pk'), user_id=user.pk)
+    return MediaPost.objects.annotate(liked_by_me=Exists(my_like))
+
+
+def _with_comment_counts(queryset):
+    """카드 렌더링용: 댓글 본문은 펼칠 때 /comment/list/에서 받으므로 개수만 집계"""
+    return queryset.annotate(comment_count=Count('comments'))
+
+
+def _tab_querysets(user):
+    """탭별 기본 쿼리셋"""
+    return {
+        'media': _media_queryset(user),
+        'text': TextPost.objects.all(),
+        'code': CodeLink.objects.all(),
+    }
+
+
+def _like_filter(tab, queryset, query):
+    """전문 검색 색인을 쓸 수 없을 때의 예비 검색 (제목/설명 LIKE)"""
+    if tab == 'media':
+        return queryset.filter(Q(title__icontains=query) | Q(description__icontains=query))
+    return queryset.filter(title__icontains=query)
+
+
+def _tab_page(tab, queryset, query, cursor=None):
+    """
+    탭 하나의 한 페이지 분량을 가져옵니다.
+    - 검색어 없음: 최신순 키셋 페이지네이션
+    - 검색어 있음: FTS5 색인(제목/설명/본문/댓글)으로 관련도순 정렬 (Triple Hybrid Search)
+    """
+    if not query:
+        return paginate(queryset, cursor)
+
+    ranked_ids = search.search(query, tab)
+    if ranked_ids is None:
+        return paginate(_like_filter(tab, queryset, query), cursor)
+    return paginate_ranked(queryset, ranked_ids, cursor)
+
+
+def _card_key(post):
+    """
+    카드 캐시 키: run_jobs 워커가 바꾸는 값(변환 결과, 썸네일 파생본, 영상 포스터/재생 사본)을 모두 포함
+    버전 번호는 캐시를 공유하지 않는 프로세스(CACHE_BACKEND=locmem)에는 전달되지 않으므로,
+    목록 쿼리로 이미 가져온 값만으로도 바뀐 카드를 알아볼 수 있게 함
+    """
+    state = json.dumps([
+        post.conversion_status, post.file.name, post.derivatives,
+        post.poster.name, post.web_file.name, post.duration,
+    ], sort_keys=True, default=str)
+    return f"card:{post.pk}:{hashlib.sha256(state.encode()).hexdigest()[:16]}"
 
-def index(request):
-    # 1. 검색어 가져오기 (GET 파라미터 'q')
-    query = request.GET.get('q', '')
 
-    # 2. 모델별 데이터 가져오기 (기본: 최신순 정렬)
-    media_posts = MediaPost.objects.all().order_by('-created_at')
-    text_posts = TextPost.objects.all().order_by('-created_at')
-    code_links = CodeLink.objects.all().order_by('-created_at')
-    official_links = OfficialLink.objects.all() # 링크는 순서 상관 없음
+def _render_media_cards(posts, query=''):
+    """
+    갤러리 카드 HTML
+    - 카드 본문: 게시물 버전별 캐시 (검색 중에는 강조 표시가 달라지므로 캐시하지 않음)
+    - 좋아요 버튼: 사용자마다 다르므로 요청마다 채움
+    """
+    template = get_template(FEED_TABS['media'][1])
+
+    def render_many(missing):
+        full = _with_comment_counts(MediaPost.objects.all()).in_bulk([post.pk for post in missing])
+        return {
+            pk: template.render({'post': post, 'search_term': query})
+            for pk, post in full.items()
+        }
 
-    # 3. 검색어가 있는 경우 필터링 (Triple Hybrid Search)
     if query:
-        # [핵심] 이미지 갤러리 검색: 제목 OR 사용자 설명 OR AI 설명
-        # 이 세 가지 필드 중 하나라도 검색어를 포함하면 결과에 나옵니다.
-        media_posts = media_posts.filter(
-            Q(title__icontains=query) | 
-            Q(description__icontains=query)  # <--- 사용자 설명 추가됨
+        cards = render_many(posts)
+    else:
+        cards = fragment_cache.get_or_render_many(
+            [(f'post:{post.pk}', post) for post in posts],
+            key_func=_card_key,
+            render_many=render_many,
         )
-        
-        # [보너스] 게시판과 코드 자료실도 제목으로 검색되도록 유지
-        text_posts = text_posts.filter(title__icontains=query)
-        code_links = code_links.filter(title__icontains=query)
 
-    # 4. 하나의 context 꾸러미에 담기
+    like_button = get_template('partials/like_button.html')
+    html = []
+    for post in posts:
+        if post.pk not in cards:
+            continue
+        html.append(cards[post.pk].replace(
+            fragment_cache.LIKE_BUTTON_SLOT, like_button.render({'post': post}), 1
+        ))
+    return mark_safe(''.join(html))
+
+
+def _render_tab(tab, user, query='', cursor=None):
+    """
+    탭 한 페이지 분량의 카드 HTML과 다음 페이지 커서
+    - 갤러리: 목록 쿼리 + 카드별 캐시
+    - 게시판/자료실: 검색어가 없으면 페이지 조각 전체를 구역 버전별로 캐시 (캐시 적중 시 쿼리 없음)
+    """
+    name, template_name = FEED_TABS[tab]
+
+    if tab == 'media':
+        items, next_cursor = _tab_page(tab, _media_queryset(user), query, cursor)
+        return _render_media_cards(items, query), next_cursor
+
+    def render():
+        items, next_cursor = _tab_page(tab, _tab_querysets(user)[tab], query, cursor)
+        return render_to_string(template_name, {name: items, 'search_term': query}), next_cursor
+
+    if query:
+        html, next_cursor = render()
+    else:
+        # 커서를 해석해 같은 위치면 같은 키로 (잘못된 커서는 첫 페이지와 같은 항목 사용)
+        cursor = normalize_cursor(cursor)
+        html, next_cursor = fragment_cache.get_or_render(tab, f"page:{cursor or 'first'}", render)
+    return mark_safe(html), next_cursor
+
+
+def _official_links_html():
+    return mark_safe(fragment_cache.get_or_render(
+        'links', 'all',
+        lambda: render_to_string('partials/official_links.html', {'official_links': OfficialLink.objects.all()}),
+    ))
+
+
+def index(request):
+    # 1. 검색어 가져오기 (GET 파라미터 'q')
+    query = request.GET.get('q', '')
+
     context = {
-        'media_posts': media_posts,
-        'text_posts': text_posts,
-        'code_links': code_links,
-        'official_links': official_links,
-        'search_term': query, # 검색어를 템플릿 검색창에 남겨두기 위해 전달
+        'official_links_html': _official_links_html(),  # 링크는 순서 상관 없음 (캐시)
+        'search_term': query,  # 검색어를 템플릿 검색창에 남겨두기 위해 전달
     }
 
-    # 5. HTML 렌더링
-    # 5. HTML 렌더링
+    # 2. 탭별 첫 페이지만 가져오기 (최신순, 나머지는 무한 스크롤로 /feed/에서 받아감)
+    # 갤러리/게시판/자료실은 로그인 사용자에게만 보이므로 비로그인 시 쿼리 생략
+    if request.user.is_authenticated:
+        for tab in FEED_TABS:
+            context[f'{tab}_cards'], context[f'{tab}_next_cursor'] = _render_tab(tab, request.user, query)
+
+    # 3. HTML 렌더링
     return render(request, 'index.html', context)
 
+
+@login_required
+def feed(request, tab):
+    """무한 스크롤용 다음 카드 묶음 (HTML 조각 + 다음 커서)"""
+    if tab not in FEED_TABS:
+        raise Http404
+
+    query = request.GET.get('q', '')
+    html, next_cursor = _render_tab(tab, request.user, query, request.GET.get('cursor'))
+    return JsonResponse({'status': 'success', 'html': html, 'next_cursor': next_cursor})
+
 # ----------------------------
 # 📝 작성 기능 (Views) 
 # 모델별로 별도 페이지 없이 처리하거나, 리디렉션만 함
@@ -63,13 +210,74 @@ def media_create(request):
             post.is_public = True # 기본적으로 공개 (관리자가 추후 숨김 가능)
             post.save()
             if is_ajax:
-                return JsonResponse({"status": "success", "message": "사진이 업로드 되었습니다."})
+                return JsonResponse({
+                    "status": "success",
+                    "message": _conversion_message(post),
+                    "conversion_status": post.conversion_status,
+                    "duplicates": _duplicate_summary(post),
+                })
             return redirect('/?tab=media') # 갤러리 탭으로 복귀
         else:
             if is_ajax:
                 return JsonResponse({"status": "error", "message": "입력값이 올바르지 않습니다.", "errors": form.errors}, status=400)
     return redirect('/')
 
+
+def _conversion_message(post):
+    message = "영상이 업로드 되었습니다." if post.is_video else "사진이 업로드 되었습니다."
+    if post.conversion_status == 'PROCESSING':
+        message += " AI 웹툰 변환이 끝나면 갤러리에 표시됩니다."
+    duplicates = getattr(post, '_near_duplicates', None)
+    if duplicates:
+        message += f" 비슷한 사진이 이미 {len(duplicates)}건 있습니다. (예: {duplicates[0].title})"
+    return message
+
+
+def _duplicate_summary(post):
+    """업로드 시 찾은 비슷한 게시물 (photo/signals.compute_perceptual_hash)"""
+    return [{"id": dup.pk, "title": dup.title} for dup in getattr(post, '_near_duplicates', None) or []]
+
+
+@login_required
+def upload_init(request):
+    """
+    브라우저 직접 업로드 시작 (photo/direct_upload.py)
+    파일 내용은 받지 않고 PAR URL과 토큰만 돌려줌 -> 브라우저가 버킷에 직접 PUT
+    직접 업로드를 쓸 수 없으면 status='unavailable' (브라우저는 기존 media_create로 업로드)
+    """
+    if request.method != 'POST':
+        return JsonResponse({"status": "error", "message": "POST 요청만 가능합니다."}, status=405)
+    if not direct_upload.is_available():
+        return JsonResponse({"status": "unavailable"})
+
+    form = DirectUploadForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({"status": "error", "message": "입력값이 올바르지 않습니다.", "errors": form.errors}, status=400)
+    try:
+        upload = direct_upload.start(request.user, form.cleaned_data)
+    except direct_upload.DirectUploadError as e:
+        return JsonResponse({"status": "unavailable", "message": e.message}, status=e.status)
+    except Exception as e:
+        logger.error(f"❌ [Direct Upload] PAR 발급 실패: {e}")
+        return JsonResponse({"status": "unavailable"}, status=503)
+    return JsonResponse({"status": "success", **upload})
+
+
+@login_required
+def upload_finalize(request):
+    """브라우저 직접 업로드 완료 -> 올라간 파일 검사 후 MediaPost 생성"""
+    if request.method != 'POST':
+        return JsonResponse({"status": "error", "message": "POST 요청만 가능합니다."}, status=405)
+    try:
+        post = direct_upload.finish(request.user, request.POST.get('token', ''))
+    except direct_upload.DirectUploadError as e:
+        return JsonResponse({"status": "error", "message": e.message}, status=e.status)
+    return JsonResponse({
+        "status": "success",
+        "message": _conversion_message(post),
+        "conversion_status": post.conversion_status,
+    })
+
 @login_required
 def text_create(request):
     if request.method == 'POST':
@@ -92,19 +300,81 @@ def code_create(request):
 # ❤️ 좋아요 & 💬 댓글 기능
 # ----------------------------
 
+LIKES = metrics.counter('photo_likes_total', "좋아요 누름/취소 수", ['action'])
+
+
 @login_required
 def toggle_like(request, post_id):
+    """
+    좋아요 토글 (좋아요 수와 상관없이 쿼리 수 고정)
+    - 먼저 내 좋아요 행을 지워 보고, 지워진 게 없으면 새로 추가 (확인 + 변경을 쿼리 하나로)
+    - like_count는 같은 트랜잭션에서 F()로 증감 -> 더블클릭 등 동시 요청에도 실제 행 수와 일치
+    """
     if request.method == 'POST':
-        post = get_object_or_404(MediaPost, id=post_id)
-        if request.user in post.likes.all():
-            post.likes.remove(request.user)
-            liked = False
-        else:
-            post.likes.add(request.user)
-            liked = True
-        return JsonResponse({'status': 'success', 'liked': liked, 'likes_count': post.likes.count()})
+        if not MediaPost.objects.filter(id=post_id).exists():
+            raise Http404
+        Like = MediaPost.likes.through
+        posts = MediaPost.objects.filter(id=post_id)
+
+        with transaction.atomic():
+            removed, _ = Like.objects.filter(mediapost_id=post_id, user_id=request.user.pk).delete()
+            if removed:
+                posts.update(like_count=Greatest(F('like_count') - 1, 0))
+                liked = False
+            else:
+                try:
+                    with transaction.atomic():
+                        Like.objects.create(mediapost_id=post_id, user_id=request.user.pk)
+                except IntegrityError:
+                    pass  # 동시에 들어온 다른 요청이 이미 추가함 (카운트도 그쪽에서 증가)
+                else:
+                    posts.update(like_count=F('like_count') + 1)
+                liked = True
+            like_count = posts.values_list('like_count', flat=True).get()
+
+        LIKES.inc(action='like' if liked else 'unlike')
+
+        return JsonResponse({'status': 'success', 'liked': liked, 'likes_count': like_count})
     return JsonResponse({'status': 'error'}, status=400)
 
+# 댓글 목록 한 번에 내려보내는 개수
+COMMENT_PAGE_SIZE = 20
+
+
+def _comment_time(comment):
+    return timezone.localtime(comment.created_at).strftime('%m.%d %H:%M')
+
+
+@login_required
+def comment_list(request, post_id):
+    """
+    댓글 목록 (오래된 순, 커서 페이지네이션)
+    카드의 댓글 영역을 펼칠 때만 불러오므로 메인 페이지 HTML에는 댓글 개수만 들어갑니다.
+    """
+    if not MediaPost.objects.filter(id=post_id).exists():
+        raise Http404
+
+    queryset = Comment.objects.filter(post_id=post_id).select_related('author')
+    comments, next_cursor = paginate(
+        queryset, request.GET.get('cursor'), page_size=COMMENT_PAGE_SIZE, ascending=True
+    )
+
+    user = request.user
+    return JsonResponse({
+        'status': 'success',
+        'comments': [
+            {
+                'id': comment.id,
+                'author': comment.author.username,
+                'content': comment.content,
+                'created_at': _comment_time(comment),
+                'can_delete': comment.author_id == user.id or user.is_superuser,
+            }
+            for comment in comments
+        ],
+        'next_cursor': next_cursor,
+    })
+
 @login_required
 def add_comment(request, post_id):
     if request.method == 'POST':
@@ -126,7 +396,7 @@ def add_comment(request, post_id):
                     'comment_id': comment.id,
                     'author': comment.author.username,
                     'content': comment.content,
-                    'created_at': comment.created_at.strftime('%m.%d %H:%M')
+                    'created_at': _comment_time(comment)
                 })
             return redirect('/?tab=media')
     return JsonResponse({'status': 'error'}, status=400)
@@ -141,4 +411,26 @@ def delete_comment(request, comment_id):
             if is_ajax:
                 return JsonResponse({'status': 'success'})
             return redirect('/?tab=media')
-    return JsonResponse({'status': 'error'}, status=403)
\ No newline at end of file
+    return JsonResponse({'status': 'error'}, status=403)
+
+# ----------------------------
+# 📈 운영 지표 (Prometheus)
+# ----------------------------
+
+def _metrics_allowed(request):
+    """
+    스태프 로그인 사용자, 또는 METRICS_TOKEN을 Bearer 토큰으로 보낸 요청(Prometheus)만 허용
+    gunicorn은 nginx 뒤에서 127.0.0.1로만 요청을 받으므로 접속 IP로는 외부 요청을 구별할 수 없음
+    """
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    scheme, _, value = request.headers.get('Authorization', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and constant_time_compare(value.strip(), token)
+
+
+def metrics_view(request):
+    """업로드/변환/스토리지/좋아요/댓글 지표 (모든 워커 프로세스 합산, Prometheus 텍스트 형식)"""
+    if not _metrics_allowed(request):
+        raise Http404
+    return HttpResponse(metrics.render_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
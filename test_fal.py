@@ -1,12 +1,12 @@
 import os
 import fal_client
 from dotenv import load_dotenv
+from photo import http
 
 load_dotenv('c:/jungho_webhome/school_cloud/.env')
 
 api_key = os.getenv('FAL_API_KEY')
-if api_key:
-    os.environ['FAL_KEY'] = api_key
+client = fal_client.SyncClient(key=api_key)
 
 sample_image_url = "https://upload.wikimedia.org/wikipedia/commons/thumb/3/3a/Cat03.jpg/320px-Cat03.jpg"
 
@@ -39,8 +39,8 @@ candidates = [
 for model_id, arguments in candidates:
     print(f"▶️  Testing: {model_id}")
     try:
-        handler = fal_client.submit(model_id, arguments=arguments)
-        result = handler.get()
+        # 서킷 브레이커 + 응답 시간 기록 (photo/http.py), 전체 대기 120초 제한
+        result = http.call('fal', client.subscribe, model_id, arguments=arguments, client_timeout=120)
         if 'images' in result and result['images']:
             print(f"  ✅ 성공! URL: {result['images'][0].get('url', '?')[:80]}...")
         elif 'image' in result:
@@ -50,3 +50,7 @@ for model_id, arguments in candidates:
     except Exception as e:
         print(f"  ❌ 실패: {str(e)[:120]}")
     print()
+
+latency = http.REQUEST_SECONDS.snapshot()
+for (provider, outcome), entry in latency.items():
+    print(f"⏱️ {provider}/{outcome}: {entry['count']}건, 평균 {entry['sum'] / entry['count']:.1f}s")
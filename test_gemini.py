@@ -1,6 +1,7 @@
 import os
 import google.generativeai as genai
 from dotenv import load_dotenv
+from photo import http
 
 # .env 파일 로드
 load_dotenv()
@@ -24,7 +25,8 @@ try:
     
     print("📋 [gemini] 사용 가능한 모델 목록 조회 중...")
     available_models = []
-    for m in genai.list_models():
+    # 서킷 브레이커 + 응답 시간 기록 (photo/http.py)
+    for m in http.call('gemini', lambda: list(genai.list_models(request_options={'timeout': 30}))):
         if 'generateContent' in m.supported_generation_methods:
             # 모델 이름에서 'models/' 접두사 제거
             name = m.name.replace('models/', '')
@@ -1,8 +1,8 @@
 import os
-import requests
 import json
 import base64
 from dotenv import load_dotenv
+from photo import http
 
 load_dotenv('c:/jungho_webhome/school_cloud/.env')
 
@@ -23,7 +23,8 @@ def test_openai_image_generation():
 
     try:
         print("🚀 Sending request to OpenAI API...")
-        response = requests.post(url, headers=headers, json=data)
+        # 공용 연결 풀 + 제한 시간 (photo/http.py, 유료 생성 POST라 중복 과금을 막으려고 재시도하지 않음)
+        response = http.post('openai', url, headers=headers, json=data, timeout=(5, 180))
         
         if response.status_code == 200:
             result = response.json()
@@ -47,3 +48,4 @@ def test_openai_image_generation():
 
 if __name__ == "__main__":
     test_openai_image_generation()
+    print(f"⏱️ 응답 시간 p50 {http.REQUEST_SECONDS.quantile(0.5, provider='openai', outcome='success')}s")